@@ -0,0 +1,304 @@
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = "10000,100000,1000000"
+BACKENDS = "sqlite"
+RUNS = 5
+TOLERANCE = 0.25
+PASSWORD = "benchmark-password"
+# Rows generated by the seed command for each unit of --scale, approximately.
+ROWS_PER_SCALE = 4200
+MANAGEMENT_DEPARTMENT_ID = 1
+SALES_DEPARTMENT_ID = 2
+SUPPORT_DEPARTMENT_ID = 3
+
+# (principal, arguments) of the benchmarked commands, "{event_id}" being
+# replaced with an event of the support principal.
+COMMANDS = [
+    (None, ["collaborators", "login", "--email", "{email}", "--password", PASSWORD]),
+    ("management", ["clients", "list", "--limit", "100"]),
+    ("management", ["clients", "list", "--format", "jsonl"]),
+    ("sales", ["contracts", "filter", "-ns", "--limit", "100"]),
+    ("sales", ["contracts", "filter", "-u", "--format", "jsonl"]),
+    ("support", ["events", "filter", "-s", "--limit", "100"]),
+    ("management", ["events", "update", "{event_id}", "Lyon", "-l"]),
+]
+# Measures compared with the baseline, with the tolerance they get.
+COMPARED_MEASURES = {"total_ms": TOLERANCE, "peak_kib": TOLERANCE, "queries": 0}
+
+
+def _create_sqlite_database(directory, rows):
+    from peewee import SqliteDatabase
+
+    return contextlib.nullcontext(
+        SqliteDatabase(
+            os.path.join(directory, f"benchmark-{rows}.sqlite3"),
+            pragmas={"journal_mode": "wal"},
+        )
+    )
+
+
+@contextlib.contextmanager
+def _create_postgresql_database(options, rows):
+    """Creates a PostgreSQL database on the local server, dropped at the end."""
+    from playhouse.postgres_ext import PostgresqlExtDatabase
+    from pytest_postgresql.janitor import DatabaseJanitor
+
+    name = f"epicevents_benchmark_{rows}"
+    with DatabaseJanitor(
+        options.pg_user,
+        options.pg_host,
+        options.pg_port,
+        options.pg_version,
+        dbname=name,
+        password=options.pg_password,
+    ):
+        yield PostgresqlExtDatabase(
+            name,
+            host=options.pg_host,
+            port=options.pg_port,
+            user=options.pg_user,
+            password=options.pg_password,
+        )
+
+
+def _models():
+    from epicevents.data_access_layer.client import Client
+    from epicevents.data_access_layer.collaborator import Collaborator
+    from epicevents.data_access_layer.company import Company
+    from epicevents.data_access_layer.contract import Contract
+    from epicevents.data_access_layer.department import Department
+    from epicevents.data_access_layer.event import Event
+
+    return [Department, Collaborator, Company, Client, Contract, Event]
+
+
+def _principals():
+    """Returns the collaborators the commands run as, and an event to update."""
+    from epicevents.data_access_layer.collaborator import Collaborator
+    from epicevents.data_access_layer.event import Event
+
+    principals = {
+        name: Collaborator.select()
+        .where(Collaborator.department == department_id)
+        .order_by(Collaborator.id)
+        .first()
+        for name, department_id in (
+            ("management", MANAGEMENT_DEPARTMENT_ID),
+            ("sales", SALES_DEPARTMENT_ID),
+            ("support", SUPPORT_DEPARTMENT_ID),
+        )
+    }
+    event = (
+        Event.select(Event.id)
+        .where(Event.support == principals["support"])
+        .order_by(Event.id)
+        .first()
+    )
+    return principals, event.id
+
+
+def _run_command(app, args):
+    """Runs a command as the CLI does, its output being discarded."""
+    from epicevents.data_access_layer import cache, database
+
+    cache.get_cache().clear()
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        try:
+            with database.command_context():
+                app(args, prog_name="epicevents")
+        except SystemExit as exit_request:
+            if exit_request.code:
+                raise RuntimeError(f"{' '.join(args)} a échoué.")
+
+
+def _measure(app, args, timer, runs):
+    """
+    Runs a command and returns the median of its timings over the runs.
+
+    The peak memory is measured by one more run, as tracing allocations
+    slows the command down.
+    """
+    totals, phases, queries = [], [], []
+
+    for _ in range(runs):
+        timer.reset()
+        start = time.perf_counter()
+        _run_command(app, args)
+        totals.append((time.perf_counter() - start) * 1000)
+        phases.append({**timer.durations})
+        queries.append(timer.counts.get("query", 0))
+
+    tracemalloc.start()
+    _run_command(app, args)
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    return {
+        "total_ms": round(statistics.median(totals), 1),
+        "phases_ms": {
+            phase: round(
+                statistics.median(durations.get(phase, 0) for durations in phases)
+                * 1000,
+                1,
+            )
+            for phase in ("auth", "query", "render")
+        },
+        "queries": max(queries),
+        "peak_kib": round(peak),
+    }
+
+
+def run_benchmark(backend, database, rows, runs=RUNS):
+    """Seeds a database with about the given number of rows and measures the commands."""
+    from argon2 import PasswordHasher
+    from epicevents.__main__ import create_app
+    from epicevents.cli import collaborator as clicollaborator
+    from epicevents.cli import listing
+    from epicevents.data_access_layer import database as data_access_layer
+    from epicevents.data_access_layer.seed import Seeder
+    from epicevents.profiling import PhaseTimer
+
+    models = _models()
+    database.bind(models, bind_refs=False, bind_backrefs=False)
+    data_access_layer.psql_db = database
+    database.connect(reuse_if_open=True)
+    database.create_tables(models)
+
+    seed_start = time.perf_counter()
+    with database.atomic():
+        Seeder(rows / ROWS_PER_SCALE, password=PASSWORD).run()
+    print(
+        f"{backend} {rows} : jeu de données généré en "
+        f"{time.perf_counter() - seed_start:.1f} s",
+        file=sys.stderr,
+    )
+
+    principals, event_id = _principals()
+    timer = PhaseTimer()
+    timer.wrap(clicollaborator, "_verify_token", "auth")
+    timer.wrap(PasswordHasher, "verify", "auth")
+    timer.wrap(database, "execute_sql", "query")
+    timer.wrap(listing, "print_table", "render")
+    timer.wrap(listing, "write_rows", "render")
+    results = {}
+
+    try:
+        for principal, args in COMMANDS:
+            if principal:
+                clicollaborator._memorize_token(
+                    clicollaborator._generate_token(principals[principal])
+                )
+            args = [
+                arg.format(email=principals["sales"].email, event_id=event_id)
+                for arg in args
+            ]
+            command = " ".join(args).replace(PASSWORD, "***")
+            results[f"{backend} {rows} {command}"] = _measure(
+                create_app(args), args, timer, runs
+            )
+    finally:
+        timer.restore()
+        database.close()
+
+    return results
+
+
+def compare(results, baseline):
+    """Returns the measures exceeding their baseline by more than their tolerance."""
+    regressions = []
+    for command, measures in results.items():
+        for measure, tolerance in COMPARED_MEASURES.items():
+            reference = baseline.get(command, {}).get(measure)
+            if reference is not None and measures[measure] > reference * (
+                1 + tolerance
+            ):
+                regressions.append(
+                    f"{command} : {measure} {measures[measure]} > {reference}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Mesure les commandes de bout en bout et par phase (authentification, "
+            "requêtes, affichage) sur des jeux de données de plusieurs tailles."
+        )
+    )
+    parser.add_argument(
+        "--rows",
+        default=ROWS,
+        help="Tailles des jeux de données, en lignes - Exemple : 10000,100000",
+    )
+    parser.add_argument(
+        "--backends",
+        default=BACKENDS,
+        help="Bases mesurées - Choix : sqlite, postgresql",
+    )
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument(
+        "--save-baseline", metavar="FICHIER", help="Enregistre les mesures"
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FICHIER",
+        help="Compare les mesures à une référence et échoue en cas de régression",
+    )
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--pg-host", default="127.0.0.1")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--pg-user", default=os.getenv("DB_USER") or "postgres")
+    parser.add_argument("--pg-password", default=os.getenv("DB_PASSWORD"))
+    parser.add_argument("--pg-version", default="14")
+    options = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    for path in ("save_baseline", "compare"):
+        if getattr(options, path):
+            setattr(options, path, os.path.abspath(getattr(options, path)))
+    COMPARED_MEASURES.update(total_ms=options.tolerance, peak_kib=options.tolerance)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Commands keep their token in the .env file of the working directory.
+        os.chdir(directory)
+        from epicevents import audit
+
+        audit.DSN = None
+
+        for backend in options.backends.split(","):
+            for rows in (int(rows) for rows in options.rows.split(",")):
+                if backend == "postgresql":
+                    database = _create_postgresql_database(options, rows)
+                else:
+                    database = _create_sqlite_database(directory, rows)
+                with database as database:
+                    results.update(run_benchmark(backend, database, rows, options.runs))
+
+    print(json.dumps(results, indent=2))
+
+    if options.save_baseline:
+        with open(options.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        for regression in regressions:
+            print(f"Régression : {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 100000
+SALES_DEPARTMENT_ID = 2
+SUPPORT_DEPARTMENT_ID = 3
+
+SEED_STATEMENTS = [
+    "INSERT INTO company (name) "
+    "SELECT 'bench-company-' || i FROM generate_series(1, 100) i",
+    "INSERT INTO collaborator (first_name, name, email, password, department_id) "
+    "SELECT 'Bench', 'Bench', 'bench-' || i || '@bench.fr', 'x', "
+    f"CASE WHEN i %% 2 = 0 THEN {SALES_DEPARTMENT_ID} ELSE {SUPPORT_DEPARTMENT_ID} END "
+    "FROM generate_series(1, 100) i",
+    "WITH companies AS ("
+    "SELECT array_agg(id) AS ids FROM company WHERE name LIKE 'bench-company-%%'), "
+    "sales AS (SELECT array_agg(id) AS ids FROM collaborator "
+    f"WHERE email LIKE 'bench-%%' AND department_id = {SALES_DEPARTMENT_ID}) "
+    "INSERT INTO client "
+    "(first_name, name, email, phone, company_id, creation_date, collaborator_id) "
+    "SELECT 'Bench', 'Bench', 'bench-client-' || i || '@bench.fr', 'bench-' || i, "
+    "companies.ids[1 + i %% array_length(companies.ids, 1)], now(), "
+    "sales.ids[1 + i %% array_length(sales.ids, 1)] "
+    "FROM generate_series(1, %s) i, companies, sales",
+    "INSERT INTO contract "
+    "(client_id, collaborator_id, total_sum, amount_due, creation_date, signed) "
+    "SELECT client.id, client.collaborator_id, 1000, "
+    "CASE WHEN (client.id + g) %% 100 = 0 THEN 1000 ELSE 0 END, now(), "
+    "(client.id + g) %% 100 <> 1 "
+    "FROM client CROSS JOIN generate_series(1, 10) g "
+    "WHERE client.email LIKE 'bench-client-%%'",
+    "WITH supports AS (SELECT array_agg(id) AS ids FROM collaborator "
+    f"WHERE email LIKE 'bench-%%' AND department_id = {SUPPORT_DEPARTMENT_ID}) "
+    "INSERT INTO event "
+    "(contract_id, start_date, end_date, location, attendees, support_id) "
+    "SELECT contract.id, now(), now(), 'Bench', 10, "
+    "CASE WHEN contract.id %% 100 = 0 THEN NULL "
+    "ELSE supports.ids[1 + contract.id %% array_length(supports.ids, 1)] END "
+    "FROM contract JOIN client ON client.id = contract.client_id, supports "
+    "WHERE client.email LIKE 'bench-client-%%'",
+]
+
+
+def _hot_queries(sales_id, support_id):
+    """Returns the queries of the filter commands and the index each should use."""
+    from epicevents.data_access_layer.client import Client
+    from epicevents.data_access_layer.contract import Contract
+    from epicevents.data_access_layer.event import Event
+    from epicevents.data_access_layer.pagination import paginate
+
+    return [
+        (
+            "contracts filter -ns",
+            paginate(
+                Contract.select_with_relations().where(Contract.signed == False),
+                limit=50,
+            ),
+            "contract_unsigned_id",
+        ),
+        (
+            "contracts filter -u",
+            paginate(
+                Contract.select_with_relations().where(
+                    (Contract.amount_due > 0) | (Contract.amount_due == None)
+                ),
+                limit=50,
+            ),
+            "contract_unpaid_id",
+        ),
+        (
+            "events filter -s (management)",
+            paginate(
+                Event.select_with_relations().where(Event.support == None), limit=50
+            ),
+            "event_unassigned_id",
+        ),
+        (
+            "events filter -s (support)",
+            paginate(
+                Event.select_with_relations().where(Event.support == support_id),
+                limit=50,
+            ),
+            "event_support_id_id",
+        ),
+        (
+            "clients of a sales collaborator",
+            paginate(Client.select().where(Client.collaborator == sales_id), limit=50),
+            "client_collaborator_id_id",
+        ),
+    ]
+
+
+def _index_names(plan):
+    """Collects the names of the indexes read by a JSON query plan."""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def explain(database, query):
+    """Returns the names of the indexes PostgreSQL uses to run a query."""
+    sql, params = query.sql()
+    plan = database.execute_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _index_names(plan[0]["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Seeds a PostgreSQL database with synthetic rows, applies the index "
+            "migration and checks with EXPLAIN that the filter commands use "
+            "their indexes. Everything is rolled back at the end."
+        )
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=ROWS,
+        help="number of synthetic clients, ten contracts and events each",
+    )
+    arguments = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from epicevents.data_access_layer.database import get_migrator, psql_db
+    from epicevents.data_access_layer.migrations import m0001_indexes
+
+    failures = 0
+    psql_db.connect(reuse_if_open=True)
+
+    with psql_db.atomic() as transaction:
+        for statement in SEED_STATEMENTS:
+            psql_db.execute_sql(
+                statement, (arguments.rows,) if "%s" in statement else ()
+            )
+        m0001_indexes.upgrade(get_migrator())
+
+        sales_id, support_id = [
+            psql_db.execute_sql(
+                "SELECT min(id) FROM collaborator "
+                "WHERE email LIKE 'bench-%%' AND department_id = %s",
+                (department_id,),
+            ).fetchone()[0]
+            for department_id in (SALES_DEPARTMENT_ID, SUPPORT_DEPARTMENT_ID)
+        ]
+
+        for name, query, expected_index in _hot_queries(sales_id, support_id):
+            used_indexes = explain(psql_db, query)
+            ok = expected_index in used_indexes
+            failures += not ok
+            print(
+                f"{'OK  ' if ok else 'FAIL'} {name:<34} "
+                f"{expected_index:<28} {', '.join(sorted(used_indexes)) or '-'}"
+            )
+
+        transaction.rollback()
+
+    psql_db.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = [
+    ["--help"],
+    ["collaborators", "login", "--help"],
+    ["clients", "list", "--help"],
+    ["contracts", "list", "--help"],
+    ["events", "list", "--help"],
+]
+IMPORT_SCRIPT = "from epicevents.__main__ import create_app; create_app({args!r})"
+RUNS = 5
+TOLERANCE = 0.25
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(arguments):
+    """Runs a Python interpreter from the project root and returns its stderr."""
+    environment = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    environment.setdefault("SECRET_KEY", "benchmark")
+    completed_process = subprocess.run(
+        [sys.executable, *arguments],
+        cwd=ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return completed_process.stderr
+
+
+def measure_cold_start(args, runs=RUNS):
+    """Returns the median wall time in milliseconds of a command in a new interpreter."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(["-m", "epicevents", *args])
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def measure_imports(args):
+    """
+    Returns the time in milliseconds spent importing the modules of a command.
+
+    The top-level imports reported by "python -X importtime" are summed, and
+    the slowest of them are returned along with the total.
+    """
+    report = _run(["-X", "importtime", "-c", IMPORT_SCRIPT.format(args=args)])
+    top_level_imports = {}
+
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        if not name.startswith("  "):
+            top_level_imports[name.strip()] = int(cumulative) / 1000
+
+    slowest_imports = sorted(
+        top_level_imports.items(), key=lambda item: item[1], reverse=True
+    )[:5]
+
+    return sum(top_level_imports.values()), dict(slowest_imports)
+
+
+def run_benchmark(runs=RUNS):
+    """Measures the cold start and the import time of every benchmarked command."""
+    results = {}
+    for args in COMMANDS:
+        import_time, slowest_imports = measure_imports(args)
+        results[" ".join(args)] = {
+            "cold_start_ms": round(measure_cold_start(args, runs), 1),
+            "import_ms": round(import_time, 1),
+            "slowest_imports_ms": {
+                name: round(duration, 1) for name, duration in slowest_imports.items()
+            },
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Returns the measures exceeding their baseline by more than the tolerance."""
+    regressions = []
+    for command, measures in results.items():
+        for measure in ("cold_start_ms", "import_ms"):
+            reference = baseline.get(command, {}).get(measure)
+            if reference and measures[measure] > reference * (1 + tolerance):
+                regressions.append(
+                    f"{command} : {measure} {measures[measure]} > {reference}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mesure le temps de démarrage à froid et d'import des commandes."
+    )
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument(
+        "--save-baseline", metavar="FICHIER", help="Enregistre les mesures"
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FICHIER",
+        help="Compare les mesures à une référence et échoue en cas de régression",
+    )
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    options = parser.parse_args()
+
+    results = run_benchmark(options.runs)
+    print(json.dumps(results, indent=2))
+
+    if options.save_baseline:
+        with open(options.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), options.tolerance)
+        for regression in regressions:
+            print(f"Régression : {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,247 @@
-import typer
-import sentry_sdk
-from rich import print
-from .cli.client import app as app_client
-from .cli.collaborator import app as app_collaborator
-from .cli.contract import app as app_contract
-from .cli.event import app as app_event
+import sys
+from contextlib import nullcontext
+from importlib import import_module
+from .profiling import command_args, command_name
 
-app = typer.Typer()
+COMMAND_GROUPS = {
+    "collaborators": ("epicevents.cli.collaborator", "Manages collaborators."),
+    "clients": ("epicevents.cli.client", "Manages clients."),
+    "contracts": ("epicevents.cli.contract", "Manages contracts."),
+    "events": ("epicevents.cli.event", "Manages events."),
+    "audit": ("epicevents.cli.audit", "Manages the audit trail."),
+    "admin": ("epicevents.cli.admin", "Administers the software."),
+}
 
-app.add_typer(app_collaborator, name="collaborators", help="Manages collaborators.")
-app.add_typer(app_client, name="clients", help="Manages clients.")
-app.add_typer(app_contract, name="contracts", help="Manages contracts.")
-app.add_typer(app_event, name="events", help="Manages events.")
+HELP_OPTIONS = ("--help", "--install-completion", "--show-completion")
+
+
+def _runs_a_command(app, args):
+    """
+    Tells whether the arguments invoke a command rather than only printing help.
+
+    The arguments are resolved against the commands of the application, so
+    that a command without options, such as seed, counts as much as a
+    command of a group, whereas a group alone only prints its help.
+    """
+    import click
+    import typer
+
+    if any(arg in HELP_OPTIONS for arg in args):
+        return False
+
+    command = typer.main.get_command(app)
+    for name in command_args(args):
+        if not isinstance(command, click.Group) or name.startswith("-"):
+            break
+        command = command.get_command(click.Context(command), name)
+        if command is None:
+            return False
+
+    return not isinstance(command, click.Group)
+
+
+def create_app(args):
+    """
+    Creates the application with the command groups needed by the arguments.
+
+    Only the module of the invoked command group is imported, along with its
+    own dependencies. Every group is registered when none is invoked, so that
+    the general help and the shell offer them all.
+    """
+    import typer
+    from typing_extensions import Annotated
+
+    app = typer.Typer()
+
+    @app.callback()
+    def root(
+        ctx: typer.Context,
+        profile: Annotated[
+            bool,
+            typer.Option(
+                "--profile",
+                help="Affiche le profil de la commande : requêtes SQL, durées et pic de mémoire",
+            ),
+        ] = False,
+        profile_dump: Annotated[
+            str,
+            typer.Option(
+                "--profile-dump",
+                help="Dossier où écrire le cProfile et les allocations de la commande - Exemple : profil",
+            ),
+        ] = None,
+    ):
+        """Manages the clients, contracts and events of Epic Events."""
+        if profile or profile_dump:
+            from .profiling import Profiler
+
+            profiler = Profiler(profile_dump)
+            # Resources are released in reverse order, the profiler first.
+            ctx.call_on_close(profiler.print_summary)
+            ctx.with_resource(profiler)
+
+    @app.command()
+    def shell():
+        """Opens an interactive shell running commands in a single process."""
+        from .cli.shell import run_shell
+
+        run_shell(app)
+
+    @app.command()
+    def serve(
+        socket_path: Annotated[
+            str,
+            typer.Option(
+                "--socket",
+                help="Chemin du socket Unix du démon - Exemple : /tmp/epicevents.sock",
+            ),
+        ] = None,
+    ):
+        """Runs a daemon answering the commands sent on a Unix socket."""
+        from .daemon import serve as serve_requests
+
+        serve_requests(app, socket_path)
+
+    @app.command("serve-api")
+    def serve_api(
+        host: Annotated[
+            str, typer.Option(help="Adresse d'écoute de l'API - Exemple : 127.0.0.1")
+        ] = None,
+        port: Annotated[
+            int, typer.Option(help="Port d'écoute de l'API - Exemple : 8000")
+        ] = None,
+    ):
+        """Runs the HTTP/JSON API."""
+        from .api.server import serve as serve_api_requests
+
+        serve_api_requests(host, port)
+
+    @app.command()
+    def migrate(
+        list_migrations: Annotated[
+            bool,
+            typer.Option(
+                "--list", help="Affiche les migrations appliquées et en attente"
+            ),
+        ] = False,
+    ):
+        """Applies the pending schema migrations."""
+        from rich import print
+        from .data_access_layer import migrations
+
+        if list_migrations:
+            for name, applied_at in migrations.status():
+                print(
+                    f"{name} : appliquée le {applied_at:%d/%m/%Y %H:%M}"
+                    if applied_at
+                    else f"{name} : en attente"
+                )
+            return
+
+        try:
+            applied = migrations.run(
+                on_applied=lambda name: print(f"Migration {name} appliquée.")
+            )
+        except migrations.MigrationError as e:
+            print(e)
+            raise typer.Exit(code=1)
+
+        if not applied:
+            print("Aucune migration en attente.")
+
+    @app.command()
+    def seed(
+        scale: Annotated[
+            float,
+            typer.Option(
+                help="Taille du jeu de données, en milliers de clients - Exemple : 100"
+            ),
+        ] = 1,
+        random_seed: Annotated[
+            int,
+            typer.Option(
+                "--seed", help="Graine du générateur aléatoire - Exemple : 12"
+            ),
+        ] = None,
+        password: Annotated[
+            str,
+            typer.Option(
+                help="Mot de passe des collaborateurs générés (par défaut, aucune connexion possible)"
+            ),
+        ] = None,
+    ):
+        """Generates a large synthetic dataset for performance testing."""
+        from rich import print
+        from .data_access_layer.seed import RANDOM_SEED, Seeder
+
+        if scale <= 0:
+            print("Erreur : Veuillez entrer une taille positive.")
+            raise typer.Exit(code=1)
+
+        def print_progress(report):
+            print(f"{report.clients}/{report.total_clients} client(s) générés.")
+
+        report = Seeder(
+            scale, RANDOM_SEED if random_seed is None else random_seed, password
+        ).run(on_progress=print_progress)
+
+        print(
+            f"{report.collaborators} collaborateur(s), {report.companies} entreprise(s), "
+            f"{report.clients} client(s), {report.contracts} contrat(s) et "
+            f"{report.events} évènement(s) générés."
+        )
+
+    command = command_args(args)
+
+    if command and command[0] in COMMAND_GROUPS:
+        names = [command[0]]
+    else:
+        names = [*COMMAND_GROUPS]
+
+    for name in names:
+        module_name, help_text = COMMAND_GROUPS[name]
+        app.add_typer(import_module(module_name).app, name=name, help=help_text)
+
+    return app
+
+
+def main(args=None):
+    """
+    Runs the command given on the command line.
+
+    The command is sent to the daemon when one is running, and runs
+    in-process otherwise.
+    """
+    from .daemon import forward
+
+    args = sys.argv[1:] if args is None else args
+    code = forward(args)
+
+    if code is not None:
+        sys.exit(code)
+
+    app = create_app(args)
+
+    if _runs_a_command(app, args):
+        from .data_access_layer.database import UNMANAGED_COMMANDS, command_context
+
+        if command_args(args)[0] in UNMANAGED_COMMANDS:
+            context = nullcontext()
+        else:
+            context = command_context(command=command_name(args))
+    else:
+        context = nullcontext()
 
-if __name__ == "__main__":
     try:
-        app()
+        with context:
+            app(args)
     except Exception as e:
+        from rich import print
+        from .sentry import sentry_sdk
+
         print(e)
         sentry_sdk.capture_exception(e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from peewee import IntegrityError, PostgresqlDatabase
+from epicevents.data_access_layer import row_security
+from epicevents.settings import get_settings
+
+# Collaborator authenticated by the token of the request being handled.
+request_principal = ContextVar("request_principal", default=None)
+
+
+def _rows(description, rows):
+    """Turns the rows read from a cursor into dictionaries keyed by column name."""
+    names = [column[0] for column in description]
+    return [dict(zip(names, row)) for row in rows]
+
+
+class InlineExecutor:
+    """
+    Runs the queries of the API on the peewee connection of the event loop.
+
+    Used for embedded databases such as SQLite, whose queries do not wait on
+    a server, and by the tests.
+    """
+
+    def __init__(self, database):
+        self.database = database
+
+    async def fetch(self, query):
+        """Runs a select query and returns its rows as dictionaries."""
+        cursor = self.database.execute_sql(*query.sql())
+        return _rows(cursor.description, cursor.fetchall())
+
+    async def insert(self, query):
+        """Runs an insert query and returns the primary key of the new row."""
+        cursor = self.database.execute_sql(*query.sql())
+        if cursor.description:
+            return cursor.fetchone()[0]
+        return cursor.lastrowid
+
+    async def execute(self, query):
+        """Runs an update or delete query and returns the number of rows changed."""
+        return self.database.execute_sql(*query.sql()).rowcount
+
+    async def close(self):
+        """Nothing to release, the connection belongs to peewee."""
+
+
+class PsycopgExecutor:
+    """
+    Runs the queries of the API on asynchronous psycopg 3 connections.
+
+    Queries are still built with the peewee models, whose SQL and parameters
+    are sent as they are, so that the API and the CLI share the same schema
+    and the same expressions. At most max_connections connections are open,
+    the requests beyond it waiting for one to be released. Connections are
+    kept open between requests and run in autocommit mode.
+
+    In row-level security mode, each query runs in a transaction on which
+    the collaborator of the request is set, as row_security does for the
+    commands, so that the policies apply to the API as well.
+    """
+
+    def __init__(self, max_connections, **connect_kwargs):
+        self.connect_kwargs = connect_kwargs
+        self.slots = asyncio.Semaphore(max_connections)
+        self.idle_connections = []
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrows an open connection, opening one if none is idle."""
+        import psycopg
+
+        async with self.slots:
+            if self.idle_connections:
+                connection = self.idle_connections.pop()
+            else:
+                connection = await psycopg.AsyncConnection.connect(
+                    autocommit=True, **self.connect_kwargs
+                )
+
+            try:
+                yield connection
+            except psycopg.IntegrityError as error:
+                raise IntegrityError(*error.args) from error
+            finally:
+                if connection.broken or connection.closed:
+                    await connection.close()
+                else:
+                    self.idle_connections.append(connection)
+
+    @asynccontextmanager
+    async def session(self):
+        """Borrows a connection carrying the collaborator of the request, if any."""
+        principal = request_principal.get()
+
+        async with self.connection() as connection:
+            if not row_security.ENABLED or principal is None:
+                yield connection
+                return
+
+            # The settings are local to the transaction, which ends with the query.
+            async with connection.transaction():
+                await connection.execute(
+                    row_security.SET_PRINCIPAL_SQL,
+                    row_security.principal_parameters(principal),
+                )
+                yield connection
+
+    async def fetch(self, query):
+        """Runs a select query and returns its rows as dictionaries."""
+        async with self.session() as connection:
+            cursor = await connection.execute(*query.sql())
+            return _rows(cursor.description, await cursor.fetchall())
+
+    async def insert(self, query):
+        """Runs an insert query and returns the primary key of the new row."""
+        async with self.session() as connection:
+            cursor = await connection.execute(*query.sql())
+            return (await cursor.fetchone())[0]
+
+    async def execute(self, query):
+        """Runs an update or delete query and returns the number of rows changed."""
+        async with self.session() as connection:
+            cursor = await connection.execute(*query.sql())
+            return cursor.rowcount
+
+    async def close(self):
+        """Closes the idle connections."""
+        while self.idle_connections:
+            await self.idle_connections.pop().close()
+
+
+def create_executor(database):
+    """
+    Creates the executor of the queries sent to a peewee database.
+
+    PostgreSQL is reached through psycopg 3, whose connections do not block
+    the event loop. Other databases run their queries inline.
+    """
+    if isinstance(database, PostgresqlDatabase):
+        settings = get_settings()
+        return PsycopgExecutor(
+            settings.db_pool_max_connections,
+            dbname=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+        )
+
+    return InlineExecutor(database)
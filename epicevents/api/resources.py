@@ -0,0 +1,611 @@
+import re
+import jwt
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from peewee import ForeignKeyField
+from epicevents import audit
+from epicevents.data_access_layer import passwords, policy
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.department import Department
+from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.pagination import paginate
+from epicevents.data_access_layer.policy import (
+    MANAGEMENT_DEPARTMENT_ID,
+    SALES_DEPARTMENT_ID,
+    SUPPORT_DEPARTMENT_ID,
+    Principal,
+)
+from epicevents.settings import get_settings
+from .executor import request_principal
+from .server import HTTPError
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+TRUE_VALUES = ("true", "1", "yes", "oui")
+HIDDEN_FIELDS = ("password",)
+
+ORDER_FIELDS = {
+    Collaborator: {
+        "id": Collaborator.id,
+        "name": Collaborator.name,
+        "email": Collaborator.email,
+    },
+    Client: {
+        "id": Client.id,
+        "name": Client.name,
+        "creation_date": Client.creation_date,
+    },
+    Contract: {
+        "id": Contract.id,
+        "creation_date": Contract.creation_date,
+        "total_sum": Contract.total_sum,
+    },
+    Event: {
+        "id": Event.id,
+        "start_date": Event.start_date,
+        "end_date": Event.end_date,
+    },
+}
+
+COLLABORATOR_FIELDS = ("first_name", "name", "email", "password", "department")
+CLIENT_FIELDS = (
+    "first_name",
+    "name",
+    "email",
+    "phone",
+    "company",
+    "creation_date",
+    "last_update",
+)
+CONTRACT_FIELDS = (
+    "client",
+    "collaborator",
+    "total_sum",
+    "amount_due",
+    "creation_date",
+    "signed",
+)
+EVENT_FIELDS = (
+    "contract",
+    "start_date",
+    "end_date",
+    "location",
+    "attendees",
+    "notes",
+    "support",
+)
+
+
+def authenticate(request, *departments):
+    """
+    Verifies the bearer token of a request, as issued by the login command.
+
+    The collaborator becomes the principal of the request, set on its queries
+    in row-level security mode.
+
+    Raises:
+        HTTPError: If the token is missing, invalid or expired, or if the
+            collaborator does not belong to one of the given departments.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPError(401, "Veuillez vous authentifier et réessayer.")
+
+    try:
+        payload = jwt.decode(
+            token.strip(), key=get_settings().secret_key, algorithms=["HS256"]
+        )
+        identity = Principal.from_payload(payload)
+    except ExpiredSignatureError:
+        raise HTTPError(401, "Token expiré, veuillez vous réauthentifier.")
+    except (InvalidTokenError, KeyError, TypeError, ValueError):
+        raise HTTPError(401, "Le token n'est pas valide, veuillez vous réauthentifier.")
+
+    if departments and identity.department_id not in departments:
+        raise HTTPError(403, "Action restreinte.")
+
+    request_principal.set(identity)
+    return identity
+
+
+def _columns(model):
+    """Selects the fields of a model, named after the fields rather than the columns."""
+    return [
+        field.alias(field.name)
+        for field in model._meta.sorted_fields
+        if field.name not in HIDDEN_FIELDS
+    ]
+
+
+def _python_values(model, row):
+    """Converts the values of a row read by an executor as peewee would."""
+    fields = model._meta.fields
+    return {name: fields[name].python_value(value) for name, value in row.items()}
+
+
+def _instance(model, values):
+    """
+    Builds a model instance from the values of a row.
+
+    Related rows are set as instances holding only their primary key, so that
+    validate() checks them without querying the database.
+    """
+    instance = model()
+    for name, value in values.items():
+        field = model._meta.fields[name]
+        if isinstance(field, ForeignKeyField) and value is not None:
+            value = field.rel_model(id=value)
+        setattr(instance, name, value)
+    return instance
+
+
+def _validate(instance):
+    """Validates an instance with the rules of its model."""
+    try:
+        instance.validate()
+    except (ValueError, TypeError) as error:
+        raise HTTPError(400, str(error))
+
+
+def _to_int(value, message):
+    """Converts a value sent by the client to an integer."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, message)
+
+
+def _changes(data, fields, required=()):
+    """Keeps the fields of a request body, checking that they are all known."""
+    unknown_fields = [name for name in data if name not in fields]
+    if unknown_fields:
+        raise HTTPError(
+            400,
+            f"Champ inconnu : {', '.join(unknown_fields)}. Choisissez parmi : {', '.join(fields)}.",
+        )
+
+    for name in required:
+        if data.get(name) is None:
+            raise HTTPError(400, f"Veuillez renseigner le champ '{name}'.")
+
+    return data
+
+
+async def _fetch(application, model, query):
+    """Runs a select query of a model and converts its rows."""
+    rows = await application.executor.fetch(query)
+    return [_python_values(model, row) for row in rows]
+
+
+async def _get(application, model, object_id, message, status=404, condition=None):
+    """
+    Fetches a row by primary key, or answers with the given status and message.
+
+    A condition of the policy module restricts the rows which may be fetched.
+    """
+    object_id = _to_int(object_id, message)
+    query = model.select(*_columns(model)).where(model.id == object_id)
+    if condition is not None:
+        query = query.where(condition)
+    rows = await _fetch(application, model, query)
+    if not rows:
+        raise HTTPError(status, message)
+    return rows[0]
+
+
+async def _get_restricted(
+    application,
+    model,
+    object_id,
+    condition,
+    message,
+    status=404,
+    restricted_message="Action restreinte.",
+):
+    """
+    Fetches a row by primary key among the rows matching a condition of the
+    policy module, None matching every row.
+
+    Raises:
+        HTTPError: With the given status if the row does not exist, or a 403
+            if it exists but does not match the condition.
+    """
+    try:
+        return await _get(application, model, object_id, message, status, condition)
+    except HTTPError:
+        if condition is None:
+            raise
+
+    await _get(application, model, object_id, message, status)
+    raise HTTPError(403, restricted_message)
+
+
+async def _get_editable(application, model, object_id, principal, message):
+    """Fetches a row the authenticated collaborator may change, or answers with a 404 or a 403."""
+    try:
+        condition = policy.editable(model, principal)
+    except PermissionError as error:
+        await _get(application, model, object_id, message)
+        raise HTTPError(403, str(error))
+
+    return await _get_restricted(application, model, object_id, condition, message)
+
+
+async def _list(application, request, model):
+    """
+    Lists a page of the rows of a model.
+
+    The query string accepts order_by, desc, after and limit, as the list
+    commands do. The page is read with a keyset pagination, the next one
+    starting after the returned "next" primary key.
+    """
+    order_fields = ORDER_FIELDS[model]
+    order_by = request.query.get("order_by", "id")
+    if order_by not in order_fields:
+        raise HTTPError(
+            400, f"Veuillez choisir un champ de tri parmi : {', '.join(order_fields)}."
+        )
+
+    limit = _to_int(
+        request.query.get("limit", PAGE_SIZE),
+        "Veuillez entrer un nombre de lignes valide.",
+    )
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPError(
+            400, f"Le nombre de lignes doit être compris entre 1 et {MAX_PAGE_SIZE}."
+        )
+
+    after = request.query.get("after")
+    if after is not None:
+        after = _to_int(after, "Veuillez entrer un identifiant de départ valide.")
+
+    query = paginate(
+        model.select(*_columns(model)),
+        order_fields[order_by],
+        after=after,
+        limit=limit,
+        descending=request.query.get("desc", "").lower() in TRUE_VALUES,
+    )
+    rows = await _fetch(application, model, query)
+
+    return 200, {
+        "results": rows,
+        "next": rows[-1]["id"] if len(rows) == limit else None,
+    }
+
+
+async def _create(application, model, values):
+    """Validates and inserts a new row, then answers with its primary key."""
+    instance = _instance(model, values)
+    _validate(instance)
+    object_id = await application.executor.insert(model.insert(instance.__data__))
+    return 201, {"id": object_id}
+
+
+async def _update(application, model, row, changes, message):
+    """Validates the changes of a row, saves them and answers with the updated row."""
+    if not changes:
+        raise HTTPError(400, "Vous n'avez pas sélectionné d'attribut à modifier.")
+
+    instance = _instance(model, {**row, **changes})
+    _validate(instance)
+
+    await application.executor.execute(
+        model.update(
+            {getattr(model, name): instance.__data__[name] for name in changes}
+        ).where(model.id == row["id"])
+    )
+    return 200, await _get(application, model, row["id"], message)
+
+
+def _check_password(password_hash, password):
+    """
+    Verifies a password against its hash, in the worker pool.
+
+    Returns whether the password matches, along with a new hash when the
+    stored one was made with outdated argon2 parameters.
+    """
+    from argon2.exceptions import InvalidHashError, VerificationError
+
+    hasher = passwords.get_password_hasher()
+    try:
+        hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+
+    if hasher.check_needs_rehash(password_hash):
+        return True, hasher.hash(password)
+
+    return True, None
+
+
+def _hash_password(password):
+    """Hashes a password, in the worker pool."""
+    return passwords.get_password_hasher().hash(password)
+
+
+async def login(application, request):
+    """Verifies the credentials of a collaborator and returns a token."""
+    data = request.json()
+    email, password = data.get("email"), data.get("password")
+    if not (isinstance(email, str) and isinstance(password, str)):
+        raise HTTPError(400, "Veuillez renseigner un email et un mot de passe.")
+
+    rows = await application.executor.fetch(
+        Collaborator.select(
+            Collaborator.id,
+            Collaborator.email,
+            Collaborator.password,
+            Collaborator.department.alias("department"),
+        ).where(Collaborator.email == email)
+    )
+    if not rows:
+        raise HTTPError(401, "Nom d'utilisateur ou mot de passe incorrect.")
+
+    row = rows[0]
+    matches, new_hash = await application.run_in_hash_pool(
+        _check_password, row["password"], password
+    )
+    if not matches:
+        raise HTTPError(401, "Nom d'utilisateur ou mot de passe incorrect.")
+
+    if new_hash is not None:
+        await application.executor.execute(
+            Collaborator.update(password=new_hash).where(Collaborator.id == row["id"])
+        )
+
+    collaborator = Collaborator(
+        id=row["id"], email=row["email"], department=row["department"]
+    )
+    token = jwt.encode(
+        collaborator.get_data(), key=get_settings().secret_key, algorithm="HS256"
+    )
+    return 200, {"token": token}
+
+
+async def list_collaborators(application, request):
+    """Lists the collaborators, for the management department."""
+    authenticate(request, MANAGEMENT_DEPARTMENT_ID)
+    return await _list(application, request, Collaborator)
+
+
+async def create_collaborator(application, request):
+    """Creates a collaborator, for the management department."""
+    identity = authenticate(request, MANAGEMENT_DEPARTMENT_ID)
+    values = _changes(request.json(), COLLABORATOR_FIELDS, COLLABORATOR_FIELDS)
+    department = _to_int(
+        values["department"], "Veuillez entrer un numéro de département valide."
+    )
+    await _get(
+        application,
+        Department,
+        department,
+        f"Aucun département trouvé avec l'ID n°{department}.",
+        400,
+    )
+
+    instance = _instance(Collaborator, {**values, "department": department})
+    _validate(instance)
+    instance.password = await application.run_in_hash_pool(
+        _hash_password, str(values["password"])
+    )
+    object_id = await application.executor.insert(
+        Collaborator.insert(instance.__data__)
+    )
+
+    audit.record(
+        f"[CREATION COLLABORATEUR PAR COLLABORATEUR N°{identity.collaborator_id}] >> Prénom : {instance.first_name} - Nom : {instance.name} - Email : {instance.email} - Département : {department}"
+    )
+    return 201, {"id": object_id}
+
+
+async def list_clients(application, request):
+    """Lists the clients, for every authenticated collaborator."""
+    authenticate(request)
+    return await _list(application, request, Client)
+
+
+async def create_client(application, request):
+    """Creates a client assigned to the sales collaborator creating it."""
+    identity = authenticate(request, SALES_DEPARTMENT_ID)
+    values = _changes(request.json(), CLIENT_FIELDS, ("company",))
+    company = _to_int(
+        values["company"], "Veuillez entrer un numéro d'entreprise valide."
+    )
+    await _get(
+        application,
+        Company,
+        company,
+        f"Aucune entreprise trouvée avec l'ID n°{company}.",
+        400,
+    )
+
+    return await _create(
+        application,
+        Client,
+        {**values, "company": company, "collaborator": identity.collaborator_id},
+    )
+
+
+async def update_client(application, request, client_id):
+    """Updates a client, for the sales collaborator in charge of it."""
+    identity = authenticate(request)
+    changes = _changes(request.json(), CLIENT_FIELDS)
+    message = f"Aucun client trouvé avec l'ID n°{client_id}."
+    row = await _get_editable(application, Client, client_id, identity, message)
+
+    if "company" in changes:
+        changes["company"] = (
+            await _get(
+                application,
+                Company,
+                changes["company"],
+                "Veuillez entrer un numéro d'entreprise valide.",
+                400,
+            )
+        )["id"]
+
+    return await _update(application, Client, row, changes, message)
+
+
+async def list_contracts(application, request):
+    """Lists the contracts, for every authenticated collaborator."""
+    authenticate(request)
+    return await _list(application, request, Contract)
+
+
+async def create_contract(application, request):
+    """Creates a contract assigned to the sales collaborator of its client."""
+    authenticate(request, MANAGEMENT_DEPARTMENT_ID)
+    values = _changes(request.json(), CONTRACT_FIELDS, ("client", "total_sum"))
+    values.pop("collaborator", None)
+    client = await _get(
+        application,
+        Client,
+        values["client"],
+        f"Aucun client trouvé avec l'ID n°{values['client']}.",
+        400,
+    )
+
+    return await _create(
+        application,
+        Contract,
+        {**values, "client": client["id"], "collaborator": client["collaborator"]},
+    )
+
+
+async def update_contract(application, request, contract_id):
+    """Updates a contract, for the management or the sales collaborator of its client."""
+    identity = authenticate(request)
+    changes = _changes(request.json(), CONTRACT_FIELDS)
+    message = f"Aucun contrat trouvé avec l'ID n°{contract_id}."
+    row = await _get_editable(application, Contract, contract_id, identity, message)
+
+    if "client" in changes:
+        changes["client"] = (
+            await _get(
+                application,
+                Client,
+                changes["client"],
+                "Veuillez entrer un numéro de client valide.",
+                400,
+            )
+        )["id"]
+
+    if "collaborator" in changes:
+        changes["collaborator"] = (
+            await _get(
+                application,
+                Collaborator,
+                changes["collaborator"],
+                "Veuillez entrer un numéro de collaborateur valide.",
+                400,
+            )
+        )["id"]
+
+    response = await _update(application, Contract, row, changes, message)
+
+    if "signed" in changes:
+        audit.record(
+            f"[SIGNATURE CONTRAT N°{row['id']} PAR COLLABORATEUR N°{identity.collaborator_id}]"
+        )
+
+    return response
+
+
+async def list_events(application, request):
+    """Lists the events, for every authenticated collaborator."""
+    authenticate(request)
+    return await _list(application, request, Event)
+
+
+async def create_event(application, request):
+    """Creates an event of a signed contract, for the sales collaborator of its client."""
+    identity = authenticate(request, SALES_DEPARTMENT_ID)
+    values = _changes(
+        request.json(),
+        EVENT_FIELDS,
+        ("contract", "start_date", "end_date", "location", "attendees"),
+    )
+    contract = await _get_restricted(
+        application,
+        Contract,
+        values["contract"],
+        policy.owned(Contract, identity),
+        "Veuillez entrer un numéro de contrat valide.",
+        400,
+        "Vous ne pouvez pas créer d'évènement pour un client qui ne vous est pas affecté.",
+    )
+
+    if not contract["signed"]:
+        raise HTTPError(
+            400,
+            "Vous ne pouvez pas créer d'évènement pour un contrat qui n'est pas signé.",
+        )
+
+    if values.get("support") is not None:
+        values["support"] = (
+            await _get(
+                application,
+                Collaborator,
+                values["support"],
+                "Veuillez entrer un numéro de support valide.",
+                400,
+            )
+        )["id"]
+
+    return await _create(application, Event, {**values, "contract": contract["id"]})
+
+
+async def update_event(application, request, event_id):
+    """Updates an event, for the management or the support collaborator in charge of it."""
+    identity = authenticate(request)
+    changes = _changes(request.json(), EVENT_FIELDS)
+    message = f"Aucun évènement trouvé avec l'ID n°{event_id}."
+    row = await _get_editable(application, Event, event_id, identity, message)
+
+    if "contract" in changes:
+        changes["contract"] = (
+            await _get(
+                application,
+                Contract,
+                changes["contract"],
+                "Veuillez entrer un numéro de contrat valide.",
+                400,
+            )
+        )["id"]
+
+    if "support" in changes:
+        support = await _get(
+            application,
+            Collaborator,
+            changes["support"],
+            "Veuillez entrer un numéro de collaborateur valide et faisant partie du département Support.",
+            400,
+        )
+        if support["department"] != SUPPORT_DEPARTMENT_ID:
+            raise HTTPError(
+                400,
+                "Veuillez entrer un numéro de collaborateur valide et faisant partie du département Support.",
+            )
+        changes["support"] = support["id"]
+
+    return await _update(application, Event, row, changes, message)
+
+
+ROUTES = [
+    ("POST", re.compile(r"/login"), login),
+    ("GET", re.compile(r"/collaborators"), list_collaborators),
+    ("POST", re.compile(r"/collaborators"), create_collaborator),
+    ("GET", re.compile(r"/clients"), list_clients),
+    ("POST", re.compile(r"/clients"), create_client),
+    ("PATCH", re.compile(r"/clients/(\d+)"), update_client),
+    ("GET", re.compile(r"/contracts"), list_contracts),
+    ("POST", re.compile(r"/contracts"), create_contract),
+    ("PATCH", re.compile(r"/contracts/(\d+)"), update_contract),
+    ("GET", re.compile(r"/events"), list_events),
+    ("POST", re.compile(r"/events"), create_event),
+    ("PATCH", re.compile(r"/events/(\d+)"), update_event),
+]
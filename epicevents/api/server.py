@@ -0,0 +1,279 @@
+import asyncio
+import json
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+from peewee import IntegrityError
+from epicevents import audit
+from epicevents.settings import get_settings
+from .executor import request_principal
+
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 30
+
+
+class HTTPError(Exception):
+    """Raised to answer a request with an error status and a message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """Holds an HTTP request read from a connection."""
+
+    def __init__(self, method, path, query, headers, body, version="HTTP/1.1"):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.version = version
+
+    @property
+    def keep_alive(self):
+        """Tells whether the connection stays open after the response."""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        """
+        Decodes the body of the request.
+
+        Raises:
+            HTTPError: If the body is not a JSON object.
+        """
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            data = None
+
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Le corps de la requête doit être un objet JSON.")
+
+        return data
+
+
+async def read_request(reader):
+    """
+    Reads the next request sent on a connection.
+
+    Returns None when the client closed the connection between two requests.
+
+    Raises:
+        HTTPError: If the request is malformed or too large.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if not error.partial.strip():
+            return None
+        raise HTTPError(400, "Requête invalide.")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "Les en-têtes de la requête sont trop volumineux.")
+
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        raise HTTPError(400, "Requête invalide.")
+
+    headers = {}
+    for line in header_lines:
+        name, separator, value = line.partition(":")
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise HTTPError(501, "Les requêtes découpées ne sont pas prises en charge.")
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Requête invalide.")
+
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, "Le corps de la requête est trop volumineux.")
+
+    body = await reader.readexactly(length) if length > 0 else b""
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+    return Request(method, url.path, query, headers, body, version)
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    """Writes a JSON response on a connection."""
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class Application:
+    """
+    Answers the requests of the HTTP API.
+
+    At most max_concurrency requests are handled at a time, the others
+    waiting for a slot, and the queries they send are bounded by the
+    connections of the executor. Password hashes are computed in a pool of
+    hash_workers threads, argon2 releasing the GIL, so that logins do not
+    stall the event loop.
+    """
+
+    def __init__(self, executor, routes, max_concurrency, hash_workers):
+        self.executor = executor
+        self.routes = routes
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.hash_pool = ThreadPoolExecutor(
+            max_workers=hash_workers, thread_name_prefix="argon2"
+        )
+
+    async def run_in_hash_pool(self, function, *args):
+        """Runs a password hashing function in the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.hash_pool, function, *args)
+
+    async def dispatch(self, request):
+        """
+        Runs the handler matching a request.
+
+        Returns the status and the payload of the response.
+
+        Raises:
+            HTTPError: If no handler matches or if the handler refuses the request.
+        """
+        path_found = False
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            path_found = True
+            if method == request.method:
+                async with self.slots:
+                    # Set by the handler once the token of the request is verified.
+                    principal_token = request_principal.set(None)
+                    try:
+                        return await handler(self, request, *match.groups())
+                    except IntegrityError:
+                        raise HTTPError(
+                            409, "Cette valeur est déjà utilisée par un autre élément."
+                        )
+                    finally:
+                        request_principal.reset(principal_token)
+
+        if path_found:
+            raise HTTPError(405, "Méthode non autorisée.")
+        raise HTTPError(404, "Ressource introuvable.")
+
+    async def handle_connection(self, reader, writer):
+        """Answers the requests sent on a connection until it is closed."""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader), REQUEST_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as error:
+                    write_response(
+                        writer, error.status, {"detail": error.message}, False
+                    )
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                try:
+                    status, payload = await self.dispatch(request)
+                except HTTPError as error:
+                    status, payload = error.status, {"detail": error.message}
+                except Exception as e:
+                    from epicevents.sentry import sentry_sdk
+
+                    sentry_sdk.capture_exception(e)
+                    status, payload = 500, {"detail": "Erreur interne du serveur."}
+
+                write_response(writer, status, payload, request.keep_alive)
+                await writer.drain()
+
+                # The queries of the request are committed by now, and the
+                # server never exits, so its audit events are flushed at once.
+                audit.flush_in_background()
+
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def close(self):
+        """Releases the database connections and the hash workers."""
+        await self.executor.close()
+        self.hash_pool.shutdown()
+
+
+def create_application(database=None):
+    """Creates the API application on the database of the data access layer."""
+    from epicevents.data_access_layer import database as data_access_layer
+    from .executor import create_executor
+    from .resources import ROUTES
+
+    settings = get_settings()
+    return Application(
+        create_executor(database or data_access_layer.psql_db),
+        ROUTES,
+        settings.api_max_concurrency,
+        settings.api_hash_workers,
+    )
+
+
+async def _serve(application, host, port):
+    """Listens on a TCP port until the server is stopped."""
+    from rich import print
+
+    server = await asyncio.start_server(
+        application.handle_connection, host, port, limit=MAX_HEADER_SIZE
+    )
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    print(f"API à l'écoute sur http://{host}:{port}.")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await application.close()
+
+
+def serve(host=None, port=None):
+    """Runs the HTTP API until the process is stopped."""
+    settings = get_settings()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(
+            _serve(
+                create_application(),
+                host or settings.api_host,
+                port or settings.api_port,
+            )
+        )
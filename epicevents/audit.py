@@ -0,0 +1,328 @@
+import atexit
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+from epicevents.settings import get_settings
+
+settings = get_settings()
+DSN = settings.dsn
+SPOOL_PATH = settings.audit_spool_path
+SAMPLE_RATE = settings.audit_sample_rate
+BATCH_SIZE = settings.audit_batch_size
+BACKGROUND_FLUSH = settings.audit_background_flush
+
+DELIVERY_TIMEOUT = 10
+RETRY_BACKOFF = 30
+MAX_RETRY_DELAY = 3600
+LOCK_TIMEOUT = 600
+
+_flush_scheduled = False
+# Whether events were spooled since the last background flush was started.
+_spooled_since_flush = False
+
+# Events recorded by the running command, held until its transaction commits.
+held = {"events": None}
+
+
+class DeliveryError(Exception):
+    """Raised when the collector does not accept an audit event."""
+
+
+class AuditSpool:
+    """
+    Keeps the audit events waiting to be delivered in a local SQLite file.
+
+    Events are appended by the commands and removed once the collector has
+    accepted them, so that they survive the exit of the command and the
+    unavailability of the collector.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or SPOOL_PATH
+
+    def _connect(self):
+        """Opens the spool, creating its table on first use."""
+        connection = sqlite3.connect(self.path, timeout=DELIVERY_TIMEOUT)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS audit_event ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "event_id TEXT NOT NULL, "
+            "message TEXT NOT NULL, "
+            "level TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt REAL NOT NULL DEFAULT 0)"
+        )
+        return connection
+
+    def append(self, message, level="info"):
+        """Adds an event at the end of the spool."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO audit_event (event_id, message, level, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (uuid.uuid4().hex, message, level, time.time()),
+            )
+
+    def pending(self, limit, force=False):
+        """Returns the oldest events due for delivery, or all of them when forced."""
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT id, event_id, message, level, created_at, attempts "
+                "FROM audit_event WHERE next_attempt <= ? ORDER BY id LIMIT ?",
+                (float("inf") if force else time.time(), limit),
+            ).fetchall()
+
+    def acknowledge(self, spool_id):
+        """Removes an event accepted by the collector."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM audit_event WHERE id = ?", (spool_id,))
+
+    def postpone(self, events):
+        """Schedules a new attempt for events, with an exponential backoff."""
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "UPDATE audit_event SET attempts = ?, next_attempt = ? WHERE id = ?",
+                [
+                    (
+                        attempts + 1,
+                        now + min(RETRY_BACKOFF * 2**attempts, MAX_RETRY_DELAY),
+                        spool_id,
+                    )
+                    for spool_id, _, _, _, _, attempts in events
+                ],
+            )
+
+    def count(self):
+        """Returns the number of events waiting to be delivered."""
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM audit_event").fetchone()[0]
+
+
+class SentryCollector:
+    """Delivers audit events to the envelope endpoint of a Sentry project."""
+
+    def __init__(self, dsn, timeout=DELIVERY_TIMEOUT):
+        parts = urlsplit(dsn)
+        path, _, project_id = parts.path.rpartition("/")
+        self.connection_class = (
+            HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.url = f"{path}/api/{project_id}/envelope/"
+        self.headers = {
+            "Content-Type": "application/x-sentry-envelope",
+            "X-Sentry-Auth": f"Sentry sentry_version=7, sentry_key={parts.username}, sentry_client=epicevents-audit/1.0",
+        }
+
+    def _envelope(self, event):
+        """Builds the envelope of an event, its id letting Sentry drop duplicates."""
+        _, event_id, message, level, created_at, _ = event
+        payload = json.dumps(
+            {
+                "event_id": event_id,
+                "message": message,
+                "level": level,
+                "timestamp": created_at,
+                "platform": "python",
+                "logger": "epicevents.audit",
+            }
+        ).encode("utf-8")
+        headers = [
+            {
+                "event_id": event_id,
+                "sent_at": datetime.now(timezone.utc).isoformat(),
+            },
+            {"type": "event", "length": len(payload)},
+        ]
+        return b"\n".join(
+            [*[json.dumps(header).encode("utf-8") for header in headers], payload]
+        )
+
+    def deliver(self, events):
+        """
+        Sends events over a single connection.
+
+        Yields the spool id of each event accepted by Sentry.
+
+        Raises:
+            DeliveryError: If Sentry rejects an event.
+            OSError: If Sentry cannot be reached.
+        """
+        connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        try:
+            for event in events:
+                connection.request(
+                    "POST", self.url, self._envelope(event), self.headers
+                )
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 300:
+                    raise DeliveryError(
+                        f"Sentry a refusé l'évènement (code {response.status})."
+                    )
+                yield event[0]
+        finally:
+            connection.close()
+
+
+class DrainReport:
+    """Sums up the outcome of a drain."""
+
+    def __init__(self, delivered=0, postponed=0):
+        self.delivered = delivered
+        self.postponed = postponed
+
+
+def _acquire_lock(lock_path):
+    """Takes the drain lock, unless a drain started less than LOCK_TIMEOUT ago holds it."""
+    try:
+        if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+            os.remove(lock_path)
+    except OSError:
+        pass
+
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+
+    return True
+
+
+def drain(spool=None, collector=None, batch_size=None, force=False):
+    """
+    Delivers the pending audit events in batches.
+
+    Delivery stops at the first failure, the undelivered events of the batch
+    being postponed with an exponential backoff. Returns a DrainReport, or
+    None when another drain is already running.
+    """
+    spool = spool or AuditSpool()
+    collector = collector or SentryCollector(DSN)
+    lock_path = f"{spool.path}.lock"
+    report = DrainReport()
+
+    if not _acquire_lock(lock_path):
+        return None
+
+    try:
+        while True:
+            events = spool.pending(batch_size or BATCH_SIZE, force)
+            if not events:
+                break
+
+            delivered_ids = set()
+            try:
+                for spool_id in collector.deliver(events):
+                    spool.acknowledge(spool_id)
+                    delivered_ids.add(spool_id)
+            except (DeliveryError, OSError):
+                undelivered_events = [
+                    event for event in events if event[0] not in delivered_ids
+                ]
+                spool.postpone(undelivered_events)
+                report.postponed += len(undelivered_events)
+                break
+            finally:
+                report.delivered += len(delivered_ids)
+    finally:
+        os.remove(lock_path)
+
+    return report
+
+
+def _start_background_flush():
+    """Drains the spool in a detached process, so that the command does not wait."""
+    subprocess.Popen(
+        [sys.executable, "-m", "epicevents.audit"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def flush_in_background():
+    """
+    Starts draining the spool in the background, if events were spooled since
+    the last flush.
+
+    Long-lived processes, such as the daemon, the shell and the API, call it
+    once each command or request has committed, so that their events do not
+    wait for the process to end. Short-lived commands rely on the flush
+    registered at exit, which also delivers the last events of the others.
+    """
+    global _spooled_since_flush
+
+    if BACKGROUND_FLUSH and _spooled_since_flush:
+        _spooled_since_flush = False
+        _start_background_flush()
+
+
+def _spool(message, level):
+    """Appends an event to the spool and schedules its delivery."""
+    global _flush_scheduled, _spooled_since_flush
+
+    AuditSpool().append(message, level)
+    _spooled_since_flush = True
+
+    if BACKGROUND_FLUSH and not _flush_scheduled:
+        atexit.register(flush_in_background)
+        _flush_scheduled = True
+
+
+def record(message, level="info"):
+    """
+    Records an audit event in the spool.
+
+    Only a SAMPLE_RATE share of the events is kept, and nothing is recorded
+    when no Sentry DSN is configured. Within a command, the event is held
+    until the transaction of the command commits, so that a rolled back
+    change is never audited. The events are delivered in the background once
+    the command has ended.
+    """
+    if not DSN or random.random() >= SAMPLE_RATE:
+        return
+
+    if held["events"] is not None:
+        held["events"].append((message, level))
+    else:
+        _spool(message, level)
+
+
+def hold():
+    """Holds the events recorded from now on, until they are released or discarded."""
+    held["events"] = []
+
+
+def release():
+    """Spools the held events, their transaction being committed."""
+    if held["events"] is None:
+        return
+
+    events, held["events"] = held["events"], []
+    for message, level in events:
+        _spool(message, level)
+
+
+def discard():
+    """Drops the held events and stops holding the new ones."""
+    held["events"] = None
+
+
+if __name__ == "__main__":
+    drain()
@@ -0,0 +1,97 @@
+import typer
+from rich import print
+from rich.console import Console
+from rich.table import Table
+from typing_extensions import Annotated
+from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli.collaborator import MANAGEMENT_DEPARTMENT_ID
+from epicevents.data_access_layer import slow_queries
+
+
+app = typer.Typer()
+
+SLOW_QUERY_ORDERS = ("total", "p95")
+
+
+def _create_slow_queries_table(order_by):
+    """Creates a table structure for displaying the slow-query report."""
+    title = "durée totale" if order_by == "total" else "95e centile"
+    table = Table(title=f"Requêtes lentes par {title}")
+    table.add_column("[Requête]", justify="left", style="cyan")
+    table.add_column("[Commande]", justify="center", no_wrap=True, style="orange_red1")
+    table.add_column("[Origine]", justify="left", style="yellow")
+    table.add_column("[Nombre]", justify="right", no_wrap=True)
+    table.add_column("[Total (ms)]", justify="right", no_wrap=True)
+    table.add_column("[p95 (ms)]", justify="right", no_wrap=True)
+    table.add_column("[Max (ms)]", justify="right", no_wrap=True)
+    return table
+
+
+@app.command("slow-queries")
+def slow_queries_report(
+    top: Annotated[
+        int, typer.Option(help="Nombre de requêtes affichées - Exemple : 20")
+    ] = 10,
+    order_by: Annotated[
+        str,
+        typer.Option("--by", help="Classement des requêtes - Choix : total, p95"),
+    ] = "total",
+    command: Annotated[
+        str,
+        typer.Option(
+            help='Commande dont afficher les requêtes - Exemple : "clients list"'
+        ),
+    ] = None,
+    clear: Annotated[
+        bool, typer.Option("--clear", help="Vide le journal des requêtes lentes")
+    ] = False,
+):
+    """Displays the slowest SQL statements recorded by the slow-query log."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            log = slow_queries.SlowQueryLog()
+
+            if clear:
+                log.clear()
+                print("Le journal des requêtes lentes a été vidé.")
+                raise typer.Exit()
+
+            if order_by not in SLOW_QUERY_ORDERS:
+                print(
+                    f"Veuillez choisir un classement parmi : {', '.join(SLOW_QUERY_ORDERS)}."
+                )
+                raise typer.Exit(code=1)
+
+            rows = log.report(order_by, top, command)
+
+            if not rows:
+                print("Aucune requête lente n'a été enregistrée.")
+                raise typer.Exit()
+
+            table = _create_slow_queries_table(order_by)
+            for row in rows:
+                table.add_row(
+                    row["sql"],
+                    row["command"] or "",
+                    row["call_site"],
+                    str(row["count"]),
+                    f"{row['total'] * 1000:.1f}",
+                    f"{row['p95'] * 1000:.1f}",
+                    f"{row['max'] * 1000:.1f}",
+                )
+            Console().print(table)
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+if __name__ == "__main__":
+    app()
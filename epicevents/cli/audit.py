@@ -0,0 +1,73 @@
+import typer
+from rich import print
+from typing_extensions import Annotated
+from epicevents import audit
+from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli.collaborator import MANAGEMENT_DEPARTMENT_ID
+
+
+app = typer.Typer()
+
+
+@app.command()
+def drain(
+    force: Annotated[
+        bool,
+        typer.Option(
+            "--force",
+            help="Envoie aussi les évènements dont la nouvelle tentative n'est pas encore due",
+        ),
+    ] = False,
+):
+    """Delivers the pending audit events to Sentry."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            if not audit.DSN:
+                print("Aucun DSN Sentry n'est configuré.")
+                raise typer.Exit(code=1)
+
+            report = audit.drain(force=force)
+
+            if report is None:
+                print("Un envoi du journal d'audit est déjà en cours.")
+                raise typer.Exit()
+
+            print(
+                f"{report.delivered} évènement(s) d'audit envoyé(s), {report.postponed} reporté(s)."
+            )
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command()
+def status():
+    """Displays the number of audit events waiting to be delivered."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            print(
+                f"{audit.AuditSpool().count()} évènement(s) d'audit en attente d'envoi."
+            )
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+if __name__ == "__main__":
+    app()
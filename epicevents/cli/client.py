@@ -1,18 +1,52 @@
 import typer
 from rich import print
-from rich.console import Console
 from rich.table import Table
-from peewee import DoesNotExist
+from epicevents import audit
 from datetime import datetime
 from typing_extensions import Annotated
 from epicevents.data_access_layer.client import Client
 from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.collaborator import Collaborator
 from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli import listing, transfer, updates
+from epicevents.data_access_layer.bulk import ClientImporter
 from epicevents.cli.collaborator import SALES_DEPARTMENT_ID
 
 
 app = typer.Typer()
 
+ORDER_FIELDS = {
+    "id": Client.id,
+    "name": Client.name,
+    "creation_date": Client.creation_date,
+}
+
+UPDATE_FIELDS = {
+    "company": "Entreprise",
+    "first_name": "Prénom",
+    "name": "Nom",
+    "email": "Email",
+    "phone": "Téléphone",
+    "creation_date": "Date de création",
+    "last_update": "Dernier contact",
+}
+
+FILTER_FIELDS = {"id": "ID", **UPDATE_FIELDS}
+
+EXPORT_COLUMNS = {
+    "id": Client.id,
+    "first_name": Client.first_name,
+    "name": Client.name,
+    "email": Client.email,
+    "phone": Client.phone,
+    "company": Company.name,
+    "creation_date": Client.creation_date,
+    "last_update": Client.last_update,
+    "collaborator_id": Client.collaborator,
+    "collaborator_first_name": Collaborator.first_name,
+    "collaborator_name": Collaborator.name,
+}
+
 
 def _create_clients_table():
     """Creates a table structure for displaying client information."""
@@ -51,29 +85,49 @@ def _add_rows_in_clients_table(client, table):
     )
 
 
-def _print_table(queryset):
+def _print_table(rows, stream=False):
     """Prints the clients list table."""
-    table = _create_clients_table()
+    listing.print_table(rows, _create_clients_table, _add_rows_in_clients_table, stream)
 
-    for client in queryset:
-        _add_rows_in_clients_table(client, table)
 
-    console = Console()
-    console.print(table)
+def _display(queryset, empty_message, output_format="table", stream=False):
+    """Displays the clients of a queryset in the requested output format."""
+    listing.display(
+        queryset, empty_message, _print_table, EXPORT_COLUMNS, output_format, stream
+    )
 
 
 @app.command()
-def list():
-    """Lists all clients."""
+def list(
+    order_by: Annotated[
+        str,
+        typer.Option(
+            "--order-by", help="Champ de tri - Choix : id, name, creation_date"
+        ),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
+    mine: listing.MineOption = False,
+):
+    """Lists all clients, or only those owned by the collaborator."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        queryset = Client.select()
+        queryset = Client.select_with_relations()
+        empty_message = "La base de donnée ne contient aucun client."
+        if mine:
+            empty_message = "Vous n'avez aucun client à votre charge."
+            queryset = listing.only_owned(
+                queryset, Client, token_check[1], empty_message
+            )
 
-        if len(queryset) == 0:
-            print("La base de donnée ne contient aucun client.")
-            raise typer.Exit()
+        queryset = listing.paginate_queryset(
+            queryset, ORDER_FIELDS, order_by, after, limit, desc
+        )
 
-        _print_table(queryset)
+        _display(queryset, empty_message, output_format, stream)
 
     else:
         print("Veuillez vous authentifier et réessayer.")
@@ -125,7 +179,7 @@ def create(
         collaborator_id = token_check[1]["collaborator_id"]
 
         if int(collaborator_department) == SALES_DEPARTMENT_ID:
-            company_check = Company.get_or_none(Company.id == company)
+            company_check = Company.get_cached(company)
 
             if company_check is None:
                 print(f"Aucune entreprise trouvée avec l'ID n°{company}.")
@@ -152,6 +206,13 @@ def create(
         raise typer.Exit()
 
 
+def _check_references(changes):
+    """Exits when the changes of a client reference an unknown company."""
+    if "company" in changes and not Company.get_cached(changes["company"]):
+        print("Veuillez entrer un numéro d'entreprise valide.")
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def update(
     client_id: Annotated[
@@ -162,7 +223,7 @@ def update(
         typer.Argument(
             help="Nouvelle valeur à appliquer - La valeur doit être compatible avec le champ modifié !"
         ),
-    ],
+    ] = None,
     first_name: Annotated[
         bool, typer.Option("-fn", help="Modifier le prénom - Exemple : Alain")
     ] = False,
@@ -192,82 +253,94 @@ def update(
             "-u", help="Modifier la date du dernier contact - Exemple : 2023-12-24"
         ),
     ] = False,
+    assignments: updates.SetOption = None,
 ):
-    """Updates a given client."""
+    """Updates one or several fields of a given client."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        client = updates.get_editable(
+            Client,
+            client_id,
+            token_check[1],
+            f"Aucun client trouvé avec l'ID n°{client_id}.",
+        )
+
+        changes = updates.selected_changes(
+            assignments,
+            new_value,
+            UPDATE_FIELDS,
+            {
+                "company": company,
+                "first_name": first_name,
+                "name": name,
+                "email": email,
+                "phone": phone,
+                "creation_date": creation_date,
+                "last_update": last_update,
+            },
+        )
+
+        _check_references(changes)
+        updates.save_changes(client, changes)
+        updates.print_updated(changes, UPDATE_FIELDS, f"du client n°{client_id}")
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command("bulk-update")
+def bulk_update(
+    filters: updates.WhereOption,
+    assignments: updates.SetOption,
+    dry_run: updates.DryRunOption = False,
+    batch_size: updates.BatchSizeOption = None,
+):
+    """Updates every client matching the conditions with set-based UPDATEs."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        collaborator_department = token_check[1]["department_id"]
         collaborator_id = token_check[1]["collaborator_id"]
-        try:
-            client = Client.get(Client.id == client_id)
+        scope = updates.editable_condition(Client, token_check[1])
 
-        except DoesNotExist:
-            print(f"Aucun évènement trouvé avec l'ID n°{client_id}.")
-            raise typer.Exit()
+        condition = updates.parse_filters(Client, filters, FILTER_FIELDS)
+        if scope is not None:
+            condition &= scope
 
-        if (
-            int(collaborator_department) == SALES_DEPARTMENT_ID
-            and int(collaborator_id) == client.collaborator.id
-        ):
-            if company:
-                company_check = Company.get_or_none(Company.id == new_value)
-
-                if company_check:
-                    client.company = new_value
-                    client.save()
-                    print(
-                        f"Le champ 'Entreprise' du client n°{client_id} a été mis à jour avec succès."
-                    )
-
-                else:
-                    print("Veuillez entrer un numéro d'entreprise valide.")
-                    raise typer.Exit(code=1)
-
-            elif first_name:
-                client.first_name = new_value
-                client.save()
-                print(
-                    f"Le champ 'Prénom' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            elif name:
-                client.name = new_value
-                client.save()
-                print(
-                    f"Le champ 'Nom' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            elif email:
-                client.email = new_value
-                client.save()
-                print(
-                    f"Le champ 'Email' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            elif phone:
-                client.phone = new_value
-                client.save()
-                print(
-                    f"Le champ 'Téléphone' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            elif creation_date:
-                client.creation_date = new_value
-                client.save()
-                print(
-                    f"Le champ 'Date de création' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            elif last_update:
-                client.last_update = new_value
-                client.save()
-                print(
-                    f"Le champ 'Dernier contact' du client n°{client_id} a été mis à jour avec succès."
-                )
-
-            else:
-                print("Vous n'avez pas sélectionné d'attribut à modifier.")
-                raise typer.Exit()
+        values = updates.column_values(
+            Client, updates.selected_changes(assignments, None, UPDATE_FIELDS, {})
+        )
+        _check_references(values)
+
+        count = updates.run_bulk_update(
+            Client, condition, values, dry_run, batch_size, "client(s)"
+        )
+
+        if count:
+            audit.record(
+                f"[MAJ GROUPÉE DE {count} CLIENT(S) PAR COLLABORATEUR N°{collaborator_id}] >> Conditions : {', '.join(filters)} >> Valeurs : {', '.join(assignments)}"
+            )
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command("import")
+def import_(
+    file: transfer.ImportFileArgument,
+    batch_size: transfer.BatchSizeOption = transfer.BATCH_SIZE,
+    resume: transfer.ResumeOption = False,
+):
+    """Imports clients from a CSV or JSONL file."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+        collaborator_id = token_check[1]["collaborator_id"]
+
+        if int(collaborator_department) == SALES_DEPARTMENT_ID:
+            transfer.run_import(
+                ClientImporter(collaborator_id, batch_size), file, resume
+            )
 
         else:
             print("Action restreinte.")
@@ -276,3 +349,26 @@ def update(
     else:
         print("Veuillez vous authentifier et réessayer.")
         raise typer.Exit()
+
+
+@app.command()
+def export(
+    columns: transfer.ColumnsOption = None,
+    where: listing.WhereOption = None,
+    output_format: transfer.ExportFormatOption = "csv",
+    output: transfer.OutputOption = None,
+    compression: transfer.CompressionOption = None,
+):
+    """Exports the clients to CSV or JSONL."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        queryset = listing.filter_queryset(
+            Client.select_with_relations().order_by(Client.id), where, EXPORT_COLUMNS
+        )
+        transfer.run_export(
+            queryset, EXPORT_COLUMNS, columns, output_format, output, compression
+        )
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
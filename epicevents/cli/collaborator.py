@@ -1,30 +1,69 @@
-import os, jwt, typer
+import os, jwt, time, typer
 from rich import print
-from rich.console import Console
 from rich.table import Table
+from typing import List
 from typing_extensions import Annotated
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from peewee import DoesNotExist
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-from dotenv import load_dotenv, set_key, get_key
-from epicevents.sentry import sentry_sdk
+from dotenv import set_key, get_key
+from epicevents import audit
 from epicevents.data_access_layer.collaborator import Collaborator
 from epicevents.data_access_layer.department import Department
-
-dotenv_file = load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY")
+from epicevents.data_access_layer import passwords, row_security, slow_queries
+from epicevents.data_access_layer.policy import (
+    MANAGEMENT_DEPARTMENT_ID,
+    SALES_DEPARTMENT_ID,
+    SUPPORT_DEPARTMENT_ID,
+)
+from epicevents.cli import listing, transfer, updates
+from epicevents.settings import get_settings
+
+settings = get_settings()
+dotenv_file = settings.dotenv_loaded
+
+SECRET_KEY = settings.secret_key
 if os.getenv("TOKEN"):
     TOKEN = os.getenv("TOKEN")
 
-MANAGEMENT_DEPARTMENT_ID = 1
-SALES_DEPARTMENT_ID = 2
-SUPPORT_DEPARTMENT_ID = 3
+ORDER_FIELDS = {
+    "id": Collaborator.id,
+    "name": Collaborator.name,
+    "email": Collaborator.email,
+}
+
+UPDATE_FIELDS = {
+    "first_name": "Prénom",
+    "name": "Nom",
+    "email": "Email",
+    "password": "Mot de passe",
+    "department": "Département",
+}
+
+EXPORT_COLUMNS = {
+    "id": Collaborator.id,
+    "first_name": Collaborator.first_name,
+    "name": Collaborator.name,
+    "email": Collaborator.email,
+    "department": Department.name,
+}
 
 app = typer.Typer()
 
-ph = PasswordHasher()
+
+class ShellSession:
+    """
+    Keeps the token and the verified principal across the commands of a shell.
+
+    The token is read from the .env file and decoded once, then reused until
+    it expires or a new one is memorized by a login.
+    """
+
+    def __init__(self):
+        self.token = None
+        self.payload = None
+
+
+shell_session = None
 
 
 def _generate_token(collaborator):
@@ -37,19 +76,42 @@ def _memorize_token(token):
     """Stores an authentication token on the .env file."""
     set_key(".env", "TOKEN", token)
 
+    if shell_session is not None:
+        shell_session.token = token
+        shell_session.payload = None
+
 
 def _read_token():
     """Reads and retrieves the authentication token."""
-    return get_key(".env", "TOKEN")
+    if shell_session is not None and shell_session.token is not None:
+        return shell_session.token
+
+    token = get_key(".env", "TOKEN")
+
+    if shell_session is not None:
+        shell_session.token = token
+
+    return token
 
 
 def _verify_token():
     """Verifies the authenticity and validity of the authentication token."""
+    if (
+        shell_session is not None
+        and shell_session.payload is not None
+        and shell_session.payload["exp"] > time.time()
+    ):
+        slow_queries.identify(int(shell_session.payload["collaborator_id"]))
+        row_security.identify(shell_session.payload)
+        return True, shell_session.payload
+
     try:
         decoded_payload = jwt.decode(
             _read_token(), key=SECRET_KEY, algorithms=["HS256"]
         )
     except ExpiredSignatureError:
+        if shell_session is not None:
+            shell_session.token = None
         print("Token expiré, veuillez vous réauthentifier.")
         raise ExpiredSignatureError
 
@@ -59,6 +121,11 @@ def _verify_token():
         print("Le token n'est pas valide, veuillez vous réauthentifier.")
         raise InvalidTokenError
 
+    if shell_session is not None:
+        shell_session.payload = decoded_payload
+
+    slow_queries.identify(int(collaborator_id))
+    row_security.identify(decoded_payload)
     return True, decoded_payload
 
 
@@ -87,15 +154,18 @@ def _add_rows_in_collaborators_table(user, table):
     )
 
 
-def _print_table(queryset):
+def _print_table(rows, stream=False):
     """Print the collaborators list table."""
-    table = _create_collaborators_table()
+    listing.print_table(
+        rows, _create_collaborators_table, _add_rows_in_collaborators_table, stream
+    )
 
-    for user in queryset:
-        _add_rows_in_collaborators_table(user, table)
 
-    console = Console()
-    console.print(table)
+def _display(queryset, empty_message, output_format="table", stream=False):
+    """Displays the collaborators of a queryset in the requested output format."""
+    listing.display(
+        queryset, empty_message, _print_table, EXPORT_COLUMNS, output_format, stream
+    )
 
 
 @app.command()
@@ -114,6 +184,9 @@ def login(
     ],
 ):
     """Logs into the software."""
+    from argon2.exceptions import VerifyMismatchError
+
+    ph = passwords.get_password_hasher()
     collaborator = Collaborator.get_or_none(Collaborator.email == email)
 
     if collaborator:
@@ -124,6 +197,10 @@ def login(
                 print("Nom d'utilisateur ou mot de passe incorrect.")
                 raise typer.Exit(code=1)
 
+            if ph.check_needs_rehash(collaborator.password):
+                collaborator.password = password
+                collaborator.save()
+
     if not collaborator:
         print("Nom d'utilisateur ou mot de passe incorrect.")
         raise typer.Exit(code=1)
@@ -134,7 +211,17 @@ def login(
 
 
 @app.command()
-def list():
+def list(
+    order_by: Annotated[
+        str,
+        typer.Option("--order-by", help="Champ de tri - Choix : id, name, email"),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
+):
     """Lists all collaborators."""
     token_check = _verify_token()
 
@@ -142,13 +229,21 @@ def list():
         collaborator_department = token_check[1]["department_id"]
 
         if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
-            queryset = Collaborator.select()
-
-            if len(queryset) == 0:
-                print("La base de donnée ne contient aucun collaborateur.")
-                raise typer.Exit()
+            queryset = listing.paginate_queryset(
+                Collaborator.select_with_relations(),
+                ORDER_FIELDS,
+                order_by,
+                after,
+                limit,
+                desc,
+            )
 
-            _print_table(queryset)
+            _display(
+                queryset,
+                "La base de donnée ne contient aucun collaborateur.",
+                output_format,
+                stream,
+            )
 
         else:
             print("Action restreinte.")
@@ -199,7 +294,7 @@ def create(
         collaborator_id = token_check[1]["collaborator_id"]
 
         if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
-            department_check = Department.get_or_none(Department.id == int(department))
+            department_check = Department.get_cached(department)
 
             if department_check is None:
                 print(f"Aucun département trouvé avec l'ID n°{department}.")
@@ -213,7 +308,7 @@ def create(
                 department=department,
             )
             print(f"Le collaborateur {first_name} {name} a été créé avec succès.")
-            sentry_sdk.capture_message(
+            audit.record(
                 f"[CREATION COLLABORATEUR PAR COLLABORATEUR N°{collaborator_id}] >> Prénom : {first_name} - Nom : {name} - Email : {email} - Département : {department}"
             )
 
@@ -236,7 +331,7 @@ def update(
         typer.Argument(
             help="Nouvelle valeur à appliquer - La valeur doit être compatible avec le champ modifié !"
         ),
-    ],
+    ] = None,
     first_name: Annotated[
         bool, typer.Option("-fn", help="Modifier le prénom - Exemple : Alain")
     ] = False,
@@ -253,8 +348,9 @@ def update(
     department: Annotated[
         bool, typer.Option("-d", help="Modifier le département - Exemple : 1")
     ] = False,
+    assignments: updates.SetOption = None,
 ):
-    """Updates a given collaborator."""
+    """Updates one or several fields of a given collaborator."""
     token_check = _verify_token()
     if token_check:
         collaborator_department = token_check[1]["department_id"]
@@ -264,68 +360,39 @@ def update(
             try:
                 collaborator = Collaborator.get(Collaborator.id == collaborator_id)
 
-                if first_name:
-                    collaborator.first_name = new_value
-                    collaborator.save()
-                    print(
-                        f"Le champ 'Prénom' du collaborateur n°{collaborator_id} a été mis à jour avec succès."
-                    )
-                    sentry_sdk.capture_message(
-                        f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> Prénom : {new_value}"
-                    )
-
-                elif name:
-                    collaborator.name = new_value
-                    collaborator.save()
-                    print(
-                        f"Le champ 'Nom' du collaborateur n°{collaborator_id} a été mis à jour avec succès."
-                    )
-                    sentry_sdk.capture_message(
-                        f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> Nom : {new_value}"
-                    )
-
-                elif email:
-                    collaborator.email = new_value
-                    collaborator.save()
-                    print(
-                        f"Le champ 'Email' du collaborateur n°{collaborator_id} a été mis à jour avec succès."
-                    )
-                    sentry_sdk.capture_message(
-                        f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> Email : {new_value}"
-                    )
+                changes = updates.selected_changes(
+                    assignments,
+                    new_value,
+                    UPDATE_FIELDS,
+                    {
+                        "first_name": first_name,
+                        "name": name,
+                        "email": email,
+                        "password": password,
+                        "department": department,
+                    },
+                )
 
-                elif password:
-                    collaborator.password = new_value
-                    collaborator.save()
-                    print(
-                        f"Le champ 'Mot de passe' du collaborateur n°{collaborator_id} a été mis à jour avec succès."
-                    )
-                    sentry_sdk.capture_message(
-                        f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> Nouveau mot de passe"
-                    )
+                if "department" in changes and not Department.get_cached(
+                    changes["department"]
+                ):
+                    print("Veuillez entrer un numéro de département valide.")
+                    raise typer.Exit(code=1)
 
-                elif department:
-                    department_check = Department.get_or_none(
-                        Department.id == new_value
-                    )
+                updates.save_changes(collaborator, changes)
+                updates.print_updated(
+                    changes, UPDATE_FIELDS, f"du collaborateur n°{collaborator_id}"
+                )
 
-                    if department_check:
-                        collaborator.department = new_value
-                        collaborator.save()
-                        print(
-                            f"Le champ 'Département' du collaborateur n°{collaborator_id} a été mis à jour avec succès."
-                        )
-                        sentry_sdk.capture_message(
-                            f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> Département : {new_value}"
+                for field, value in changes.items():
+                    audit.record(
+                        f"[MAJ COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> "
+                        + (
+                            "Nouveau mot de passe"
+                            if field == "password"
+                            else f"{UPDATE_FIELDS[field]} : {value}"
                         )
-
-                    else:
-                        print("Veuillez entrer un numéro de département valide.")
-                        raise typer.Exit(code=1)
-
-                else:
-                    print("Vous n'avez pas sélectionné d'attribut à modifier.")
-                    raise typer.Exit()
+                    )
 
             except DoesNotExist:
                 print(f"Aucun collaborateur trouvé avec l'ID n°{collaborator_id}.")
@@ -359,11 +426,21 @@ def delete(
         if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
             try:
                 collaborator = Collaborator.get(Collaborator.id == collaborator_id)
+
+                from epicevents.data_access_layer.offboarding import has_portfolio
+
+                if has_portfolio(collaborator):
+                    print(
+                        "Des clients, contrats ou évènements sont encore affectés à ce collaborateur, "
+                        "veuillez utiliser la commande offboard pour les réaffecter."
+                    )
+                    raise typer.Exit(code=1)
+
                 collaborator.delete_instance()
                 print(
                     f"Le collaborateur n°{collaborator_id} a été supprimé avec succès."
                 )
-                sentry_sdk.capture_message(
+                audit.record(
                     f"[SUPPRESSION COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}]"
                 )
 
@@ -379,5 +456,152 @@ def delete(
         raise typer.Exit()
 
 
+@app.command()
+def offboard(
+    collaborator_id: Annotated[
+        int,
+        typer.Argument(
+            help="N° du collaborateur qui quitte l'entreprise - Exemple : 3"
+        ),
+    ],
+    successor_ids: Annotated[
+        List[int],
+        typer.Option(
+            "--to",
+            help="N° d'un successeur du même département, répétable - Exemple : --to 4 --to 7",
+        ),
+    ] = None,
+):
+    """Hands the clients, contracts and events of a collaborator over to successors, then deletes them."""
+    token_check = _verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+        user_id = token_check[1]["collaborator_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            from epicevents.data_access_layer.offboarding import offboard as hand_over
+
+            collaborator = Collaborator.get_or_none(Collaborator.id == collaborator_id)
+            if collaborator is None:
+                print(f"Aucun collaborateur trouvé avec l'ID n°{collaborator_id}.")
+                raise typer.Exit(code=1)
+
+            successor_ids = [*dict.fromkeys(successor_ids or [])]
+            successors = [
+                *Collaborator.select().where(Collaborator.id.in_(successor_ids))
+            ]
+            if len(successors) != len(successor_ids):
+                print("Veuillez entrer des numéros de successeurs valides.")
+                raise typer.Exit(code=1)
+
+            try:
+                report = hand_over(collaborator, successors)
+            except ValueError as e:
+                print(e)
+                raise typer.Exit(code=1)
+
+            print(
+                f"Le collaborateur n°{collaborator_id} a été supprimé : {report.clients} client(s), "
+                f"{report.contracts} contrat(s) et {report.events} évènement(s) réaffectés."
+            )
+            for successor_id, count in report.received.items():
+                print(f"  Collaborateur n°{successor_id} : {count} ligne(s) reçue(s).")
+            audit.record(
+                f"[DÉPART COLLABORATEUR N°{collaborator_id} PAR COLLABORATEUR N°{user_id}] >> "
+                f"Clients : {report.clients}, Contrats : {report.contracts}, Évènements : {report.events}, "
+                f"Successeurs : {', '.join(str(successor_id) for successor_id in successor_ids)}"
+            )
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command()
+def export(
+    columns: transfer.ColumnsOption = None,
+    where: listing.WhereOption = None,
+    output_format: transfer.ExportFormatOption = "csv",
+    output: transfer.OutputOption = None,
+    compression: transfer.CompressionOption = None,
+):
+    """Exports the collaborators to CSV or JSONL."""
+    token_check = _verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            queryset = listing.filter_queryset(
+                Collaborator.select_with_relations().order_by(Collaborator.id),
+                where,
+                EXPORT_COLUMNS,
+            )
+            transfer.run_export(
+                queryset, EXPORT_COLUMNS, columns, output_format, output, compression
+            )
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command()
+def calibrate(
+    target_ms: Annotated[
+        int,
+        typer.Option(
+            "--target-ms",
+            min=1,
+            help="Durée visée d'un hachage de mot de passe en millisecondes - Exemple : 250",
+        ),
+    ] = 250,
+    memory_cost: Annotated[
+        int,
+        typer.Option(
+            "--memory-cost",
+            min=8,
+            help="Mémoire utilisée par un hachage en kibioctets - Exemple : 65536",
+        ),
+    ] = passwords.ARGON2_MEMORY_COST,
+    parallelism: Annotated[
+        int,
+        typer.Option(
+            "--parallelism", min=1, help="Nombre de fils d'exécution - Exemple : 4"
+        ),
+    ] = passwords.ARGON2_PARALLELISM,
+):
+    """Picks the argon2 parameters reaching a target hashing duration."""
+    token_check = _verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            hasher, duration = passwords.calibrate(
+                target_ms / 1000, memory_cost, parallelism
+            )
+            print(
+                f"Un hachage prend {duration * 1000:.0f} ms avec les paramètres suivants, à renseigner dans le fichier .env :"
+            )
+            print(f"ARGON2_TIME_COST={hasher.time_cost}")
+            print(f"ARGON2_MEMORY_COST={hasher.memory_cost}")
+            print(f"ARGON2_PARALLELISM={hasher.parallelism}")
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
 if __name__ == "__main__":
     app()
@@ -1,15 +1,15 @@
 import typer
 from rich import print
-from rich.console import Console
 from rich.table import Table
 from typing_extensions import Annotated
-from peewee import DoesNotExist
 from datetime import datetime
-from epicevents.sentry import sentry_sdk
+from epicevents import audit
 from epicevents.data_access_layer.contract import Contract
 from epicevents.data_access_layer.client import Client
 from epicevents.data_access_layer.collaborator import Collaborator
 from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli import listing, transfer, updates
+from epicevents.data_access_layer.bulk import ContractImporter
 from epicevents.cli.collaborator import (
     MANAGEMENT_DEPARTMENT_ID,
     SALES_DEPARTMENT_ID,
@@ -18,6 +18,37 @@ from epicevents.cli.collaborator import (
 
 app = typer.Typer()
 
+ORDER_FIELDS = {
+    "id": Contract.id,
+    "creation_date": Contract.creation_date,
+    "total_sum": Contract.total_sum,
+}
+
+UPDATE_FIELDS = {
+    "client": "Client",
+    "collaborator": "Collaborateur",
+    "total_sum": "Montant total",
+    "amount_due": "Montant dû",
+    "creation_date": "Date de création",
+    "signed": "Signé",
+}
+
+FILTER_FIELDS = {"id": "ID", **UPDATE_FIELDS}
+
+EXPORT_COLUMNS = {
+    "id": Contract.id,
+    "client_id": Contract.client,
+    "client_first_name": Client.first_name,
+    "client_name": Client.name,
+    "collaborator_id": Contract.collaborator,
+    "collaborator_first_name": Collaborator.first_name,
+    "collaborator_name": Collaborator.name,
+    "total_sum": Contract.total_sum,
+    "amount_due": Contract.amount_due,
+    "creation_date": Contract.creation_date,
+    "signed": Contract.signed,
+}
+
 
 def _create_contracts_table():
     """Creates a table structure for displaying contract information."""
@@ -52,29 +83,51 @@ def _add_rows_in_contracts_table(contract, table):
     )
 
 
-def _print_table(queryset):
+def _print_table(rows, stream=False):
     """Prints the contracts list table."""
-    table = _create_contracts_table()
+    listing.print_table(
+        rows, _create_contracts_table, _add_rows_in_contracts_table, stream
+    )
 
-    for contract in queryset:
-        _add_rows_in_contracts_table(contract, table)
 
-    console = Console()
-    console.print(table)
+def _display(queryset, empty_message, output_format="table", stream=False):
+    """Displays the contracts of a queryset in the requested output format."""
+    listing.display(
+        queryset, empty_message, _print_table, EXPORT_COLUMNS, output_format, stream
+    )
 
 
 @app.command()
-def list():
-    """Lists all contracts."""
+def list(
+    order_by: Annotated[
+        str,
+        typer.Option(
+            "--order-by", help="Champ de tri - Choix : id, creation_date, total_sum"
+        ),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
+    mine: listing.MineOption = False,
+):
+    """Lists all contracts, or only those owned by the collaborator."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        queryset = Contract.select()
+        queryset = Contract.select_with_relations()
+        empty_message = "La base de donnée ne contient aucun contrat."
+        if mine:
+            empty_message = "Vous n'avez aucun contrat à votre charge."
+            queryset = listing.only_owned(
+                queryset, Contract, token_check[1], empty_message
+            )
 
-        if len(queryset) == 0:
-            print("La base de donnée ne contient aucun contrat.")
-            raise typer.Exit()
+        queryset = listing.paginate_queryset(
+            queryset, ORDER_FIELDS, order_by, after, limit, desc
+        )
 
-        _print_table(queryset)
+        _display(queryset, empty_message, output_format, stream)
 
     else:
         print("Veuillez vous authentifier et réessayer.")
@@ -116,18 +169,14 @@ def create(
 
         if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
             client_check = Client.get_or_none(Client.id == client)
-            collaborator_check = Collaborator.get_or_none(
-                Collaborator.id == collaborator
-            )
+            collaborator_check = Collaborator.get_cached(collaborator)
 
             if client_check is None:
                 print(f"Aucun client trouvé avec l'ID n°{client}.")
                 raise typer.Exit()
 
             if collaborator != 0:
-                collaborator_check = Collaborator.get_or_none(
-                    Collaborator.id == collaborator
-                )
+                collaborator_check = Collaborator.get_cached(collaborator)
 
                 if collaborator_check is None:
                     print(f"Aucun commercial trouvé avec l'ID n°{collaborator}.")
@@ -152,6 +201,19 @@ def create(
         raise typer.Exit()
 
 
+def _check_references(changes):
+    """Exits when the changes of a contract reference an unknown client or collaborator."""
+    if "client" in changes and not Client.get_or_none(Client.id == changes["client"]):
+        print("Veuillez entrer un numéro de client valide.")
+        raise typer.Exit(code=1)
+
+    if "collaborator" in changes and not Collaborator.get_cached(
+        changes["collaborator"]
+    ):
+        print("Veuillez entrer un numéro de collaborateur valide.")
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def update(
     contract_id: Annotated[
@@ -162,7 +224,7 @@ def update(
         typer.Argument(
             help="Nouvelle valeur à appliquer - La valeur doit être compatible avec le champ modifié !"
         ),
-    ],
+    ] = None,
     client: Annotated[
         bool, typer.Option("-c", help="Modifier le numéro du client - Exemple : 1")
     ] = False,
@@ -190,91 +252,82 @@ def update(
             help="Modifier le statut de la signature - Rappel : True pour Signé / False pour Non signé",
         ),
     ] = False,
+    assignments: updates.SetOption = None,
 ):
-    """Updates a given contract."""
+    """Updates one or several fields of a given contract."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_id = token_check[1]["collaborator_id"]
+        contract = updates.get_editable(
+            Contract,
+            contract_id,
+            token_check[1],
+            f"Aucun contrat trouvé avec l'ID n°{contract_id}.",
+        )
+
+        changes = updates.selected_changes(
+            assignments,
+            new_value,
+            UPDATE_FIELDS,
+            {
+                "client": client,
+                "collaborator": collaborator,
+                "total_sum": total_sum,
+                "amount_due": amount_due,
+                "creation_date": creation_date,
+                "signed": signed,
+            },
+        )
+
+        _check_references(changes)
+
+        if "signed" in changes:
+            changes["signed"] = updates.to_bool(changes["signed"])
+
+        updates.save_changes(contract, changes)
+        updates.print_updated(changes, UPDATE_FIELDS, f"du contrat n°{contract_id}")
+
+        if "signed" in changes:
+            audit.record(
+                f"[SIGNATURE CONTRAT N°{contract_id} PAR COLLABORATEUR N°{collaborator_id}] >> Date : {datetime.now()}"
+            )
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command("bulk-update")
+def bulk_update(
+    filters: updates.WhereOption,
+    assignments: updates.SetOption,
+    dry_run: updates.DryRunOption = False,
+    batch_size: updates.BatchSizeOption = None,
+):
+    """Updates every contract matching the conditions with set-based UPDATEs."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        collaborator_department = token_check[1]["department_id"]
         collaborator_id = token_check[1]["collaborator_id"]
-        try:
-            contract = Contract.get(Contract.id == contract_id)
+        scope = updates.editable_condition(Contract, token_check[1])
 
-        except DoesNotExist:
-            print(f"Aucun contrat trouvé avec l'ID n°{contract_id}.")
-            raise typer.Exit()
+        condition = updates.parse_filters(Contract, filters, FILTER_FIELDS)
+        if scope is not None:
+            condition &= scope
 
-        if (int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID) or (
-            int(collaborator_department) == SALES_DEPARTMENT_ID
-            and int(collaborator_id) == contract.client.collaborator.id
-        ):
-            if client:
-                client_check = Client.get_or_none(Client.id == new_value)
-
-                if client_check:
-                    contract.client = new_value
-                    contract.save()
-                    print(
-                        f"Le champ 'Client' du contrat n°{contract_id} a été mis à jour avec succès."
-                    )
-
-                else:
-                    print("Veuillez entrer un numéro de client valide.")
-                    raise typer.Exit(code=1)
-
-            elif collaborator:
-                collaborator_check = Collaborator.get_or_none(
-                    Collaborator.id == new_value
-                )
-
-                if collaborator_check:
-                    contract.collaborator = new_value
-                    contract.save()
-                    print(
-                        f"Le champ 'Collaborateur' du contrat n°{contract_id} a été mis à jour avec succès."
-                    )
-
-                else:
-                    print("Veuillez entrer un numéro de collaborateur valide.")
-                    raise typer.Exit(code=1)
-
-            elif total_sum:
-                contract.total_sum = new_value
-                contract.save()
-                print(
-                    f"Le champ 'Montant total' du contrat n°{contract_id} a été mis à jour avec succès."
-                )
-
-            elif amount_due:
-                contract.amount_due = new_value
-                contract.save()
-                print(
-                    f"Le champ 'Montant dû' du contrat n°{contract_id} a été mis à jour avec succès."
-                )
-
-            elif creation_date:
-                contract.creation_date = new_value
-                contract.save()
-                print(
-                    f"Le champ 'Date de création' du contrat n°{contract_id} a été mis à jour avec succès."
-                )
-
-            elif signed:
-                contract.signed = new_value
-                contract.save()
-                print(
-                    f"Le champ 'Signé' du contrat n°{contract_id} a été mis à jour avec succès."
-                )
-                sentry_sdk.capture_message(
-                    f"[SIGNATURE CONTRAT N°{contract_id} PAR COLLABORATEUR N°{collaborator_id}] >> Date : {datetime.now()}"
-                )
+        values = updates.column_values(
+            Contract,
+            updates.selected_changes(assignments, None, UPDATE_FIELDS, {}),
+        )
+        _check_references(values)
 
-            else:
-                print("Vous n'avez pas sélectionné d'attribut à modifier.")
-                raise typer.Exit()
+        count = updates.run_bulk_update(
+            Contract, condition, values, dry_run, batch_size, "contrat(s)"
+        )
 
-        else:
-            print("Action restreinte.")
-            raise typer.Exit()
+        if count:
+            audit.record(
+                f"[MAJ GROUPÉE DE {count} CONTRAT(S) PAR COLLABORATEUR N°{collaborator_id}] >> Conditions : {', '.join(filters)} >> Valeurs : {', '.join(assignments)} >> Date : {datetime.now()}"
+            )
 
     else:
         print("Veuillez vous authentifier et réessayer.")
@@ -289,6 +342,17 @@ def filter(
     u: Annotated[
         bool, typer.Option("-u", help="Filtre les contrats non payés en totalité")
     ] = False,
+    order_by: Annotated[
+        str,
+        typer.Option(
+            "--order-by", help="Champ de tri - Choix : id, creation_date, total_sum"
+        ),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
 ):
     """Filters the contracts depending on the option selected."""
     token_check = clicollaborator._verify_token()
@@ -296,33 +360,63 @@ def filter(
         collaborator_department = token_check[1]["department_id"]
 
         if int(collaborator_department) == SALES_DEPARTMENT_ID:
-            if ns:
-                queryset = Contract.select().where(Contract.signed == False)
+            if not (ns or u):
+                print("Vous n'avez pas sélectionné de filtre à appliquer.")
+                raise typer.Exit()
 
-                if len(queryset) == 0:
-                    print(
-                        ":white_check_mark: :white_check_mark: :white_check_mark: Tous les contrats sont signés ! :white_check_mark: :white_check_mark: :white_check_mark:"
-                    )
-                    raise typer.Exit()
+            # Both filters are combined into one query, so that a contract
+            # matching both is listed once and a machine format gets a single
+            # document.
+            unsigned = Contract.signed == False
+            unpaid = (Contract.amount_due > 0) | (Contract.amount_due == None)
+            if ns and u:
+                condition = unsigned | unpaid
+                empty_message = "Tous les contrats sont signés et payés !"
+            elif ns:
+                condition = unsigned
+                empty_message = "Tous les contrats sont signés !"
+            else:
+                condition = unpaid
+                empty_message = "Tous les contrats sont payés !"
+
+            queryset = listing.paginate_queryset(
+                Contract.select_with_relations().where(condition),
+                ORDER_FIELDS,
+                order_by,
+                after,
+                limit,
+                desc,
+            )
 
-                _print_table(queryset)
+            _display(
+                queryset,
+                f":white_check_mark: :white_check_mark: :white_check_mark: {empty_message} :white_check_mark: :white_check_mark: :white_check_mark:",
+                output_format,
+                stream,
+            )
 
-            if u:
-                queryset = Contract.select().where(
-                    (Contract.amount_due > 0) | (Contract.amount_due == None)
-                )
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
 
-                if len(queryset) == 0:
-                    print(
-                        ":white_check_mark: :white_check_mark: :white_check_mark: Tous les contrats sont payés ! :white_check_mark: :white_check_mark: :white_check_mark:"
-                    )
-                    raise typer.Exit()
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
 
-                _print_table(queryset)
 
-            elif not (ns or u):
-                print("Vous n'avez pas sélectionné de filtre à appliquer.")
-                raise typer.Exit()
+@app.command("import")
+def import_(
+    file: transfer.ImportFileArgument,
+    batch_size: transfer.BatchSizeOption = transfer.BATCH_SIZE,
+    resume: transfer.ResumeOption = False,
+):
+    """Imports contracts from a CSV or JSONL file."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+
+        if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
+            transfer.run_import(ContractImporter(batch_size), file, resume)
 
         else:
             print("Action restreinte.")
@@ -333,5 +427,30 @@ def filter(
         raise typer.Exit()
 
 
+@app.command()
+def export(
+    columns: transfer.ColumnsOption = None,
+    where: listing.WhereOption = None,
+    output_format: transfer.ExportFormatOption = "csv",
+    output: transfer.OutputOption = None,
+    compression: transfer.CompressionOption = None,
+):
+    """Exports the contracts to CSV or JSONL."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        queryset = listing.filter_queryset(
+            Contract.select_with_relations().order_by(Contract.id),
+            where,
+            EXPORT_COLUMNS,
+        )
+        transfer.run_export(
+            queryset, EXPORT_COLUMNS, columns, output_format, output, compression
+        )
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
 if __name__ == "__main__":
     app()
@@ -1,13 +1,15 @@
 import typer
 from rich import print
-from rich.console import Console
 from rich.table import Table
-from peewee import DoesNotExist
+from epicevents import audit
 from typing_extensions import Annotated
 from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.client import Client
 from epicevents.data_access_layer.collaborator import Collaborator
 from epicevents.data_access_layer.contract import Contract
 from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli import listing, transfer, updates
+from epicevents.data_access_layer.bulk import EventImporter
 from epicevents.cli.collaborator import (
     MANAGEMENT_DEPARTMENT_ID,
     SALES_DEPARTMENT_ID,
@@ -17,6 +19,39 @@ from epicevents.cli.collaborator import (
 
 app = typer.Typer()
 
+ORDER_FIELDS = {
+    "id": Event.id,
+    "start_date": Event.start_date,
+    "end_date": Event.end_date,
+}
+
+UPDATE_FIELDS = {
+    "contract": "Contrat",
+    "support": "Assistant en charge",
+    "start_date": "Date de début",
+    "end_date": "Date de fin",
+    "location": "Localisation",
+    "attendees": "Nombre de participants",
+    "notes": "Notes",
+}
+
+FILTER_FIELDS = {"id": "ID", **UPDATE_FIELDS}
+
+EXPORT_COLUMNS = {
+    "id": Event.id,
+    "contract_id": Event.contract,
+    "client_first_name": Client.first_name,
+    "client_name": Client.name,
+    "start_date": Event.start_date,
+    "end_date": Event.end_date,
+    "location": Event.location,
+    "attendees": Event.attendees,
+    "notes": Event.notes,
+    "support_id": Event.support,
+    "support_first_name": Collaborator.first_name,
+    "support_name": Collaborator.name,
+}
+
 
 def _create_events_table():
     """Creates a table structure for displaying event information."""
@@ -67,29 +102,49 @@ def _add_rows_in_events_table(event, table):
         )
 
 
-def _print_table(queryset):
+def _print_table(rows, stream=False):
     """Prints the contracts list table."""
-    table = _create_events_table()
+    listing.print_table(rows, _create_events_table, _add_rows_in_events_table, stream)
 
-    for event in queryset:
-        _add_rows_in_events_table(event, table)
 
-    console = Console()
-    console.print(table)
+def _display(queryset, empty_message, output_format="table", stream=False):
+    """Displays the events of a queryset in the requested output format."""
+    listing.display(
+        queryset, empty_message, _print_table, EXPORT_COLUMNS, output_format, stream
+    )
 
 
 @app.command()
-def list():
-    """Lists all events."""
+def list(
+    order_by: Annotated[
+        str,
+        typer.Option(
+            "--order-by", help="Champ de tri - Choix : id, start_date, end_date"
+        ),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
+    mine: listing.MineOption = False,
+):
+    """Lists all events, or only those owned by the collaborator."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        queryset = Event.select()
+        queryset = Event.select_with_relations()
+        empty_message = "La base de donnée ne contient aucun évènement."
+        if mine:
+            empty_message = "Vous n'avez aucun évènement à votre charge."
+            queryset = listing.only_owned(
+                queryset, Event, token_check[1], empty_message
+            )
 
-        if len(queryset) == 0:
-            print("La base de donnée ne contient aucun évènement.")
-            raise typer.Exit()
+        queryset = listing.paginate_queryset(
+            queryset, ORDER_FIELDS, order_by, after, limit, desc
+        )
 
-        _print_table(queryset)
+        _display(queryset, empty_message, output_format, stream)
 
     else:
         print("Veuillez vous authentifier et réessayer.")
@@ -103,13 +158,23 @@ def filter(
         typer.Option(
             "-s", help="Filtre les évènements en fonction des droits du collaborateur."
         ),
-    ] = False
+    ] = False,
+    order_by: Annotated[
+        str,
+        typer.Option(
+            "--order-by", help="Champ de tri - Choix : id, start_date, end_date"
+        ),
+    ] = "id",
+    desc: listing.DescendingOption = False,
+    after: listing.AfterOption = None,
+    limit: listing.LimitOption = None,
+    stream: listing.StreamOption = False,
+    output_format: listing.FormatOption = "table",
 ):
     """Filters the events depending on the option selected."""
     token_check = clicollaborator._verify_token()
     if token_check:
         collaborator_department = token_check[1]["department_id"]
-        collaborator_id = token_check[1]["collaborator_id"]
 
         if int(collaborator_department) in [
             MANAGEMENT_DEPARTMENT_ID,
@@ -117,25 +182,43 @@ def filter(
         ]:
             if s:
                 if int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID:
-                    queryset = Event.select().where(Event.support == None)
-
-                    if len(queryset) == 0:
-                        print(
-                            ":white_check_mark: :white_check_mark: :white_check_mark: Tous les évènements ont un assistant en charge ! :white_check_mark: :white_check_mark: :white_check_mark:"
-                        )
-                        raise typer.Exit()
+                    queryset = listing.paginate_queryset(
+                        Event.select_with_relations().where(Event.support == None),
+                        ORDER_FIELDS,
+                        order_by,
+                        after,
+                        limit,
+                        desc,
+                    )
 
-                    _print_table(queryset)
+                    _display(
+                        queryset,
+                        ":white_check_mark: :white_check_mark: :white_check_mark: Tous les évènements ont un assistant en charge ! :white_check_mark: :white_check_mark: :white_check_mark:",
+                        output_format,
+                        stream,
+                    )
 
                 elif int(collaborator_department) == SUPPORT_DEPARTMENT_ID:
-                    support = Collaborator.get(Collaborator.id == collaborator_id)
-                    queryset = Event.select().where(Event.support == support)
-
-                    if len(queryset) == 0:
-                        print("Vous n'avez pas d'évènement affecté.")
-                        raise typer.Exit()
+                    queryset = listing.paginate_queryset(
+                        listing.only_owned(
+                            Event.select_with_relations(),
+                            Event,
+                            token_check[1],
+                            "Vous n'avez pas d'évènement affecté.",
+                        ),
+                        ORDER_FIELDS,
+                        order_by,
+                        after,
+                        limit,
+                        desc,
+                    )
 
-                    _print_table(queryset)
+                    _display(
+                        queryset,
+                        "Vous n'avez pas d'évènement affecté.",
+                        output_format,
+                        stream,
+                    )
 
             elif not s:
                 print("Vous n'avez pas sélectionné de filtre à appliquer.")
@@ -150,6 +233,24 @@ def filter(
         raise typer.Exit()
 
 
+def _check_references(changes):
+    """Exits when the changes of an event reference an unknown contract or support."""
+    if "contract" in changes and not Contract.get_or_none(
+        Contract.id == changes["contract"]
+    ):
+        print("Veuillez entrer un numéro de contrat valide.")
+        raise typer.Exit(code=1)
+
+    if changes.get("support") is not None:
+        support_check = Collaborator.get_cached(changes["support"])
+
+        if not (support_check and support_check.department_id == SUPPORT_DEPARTMENT_ID):
+            print(
+                "Veuillez entrer un numéro de collaborateur valide et faisant partie du département Support."
+            )
+            raise typer.Exit(code=1)
+
+
 @app.command()
 def update(
     event_id: Annotated[
@@ -160,7 +261,7 @@ def update(
         typer.Argument(
             help="Nouvelle valeur à appliquer - La valeur doit être compatible avec le champ modifié !"
         ),
-    ],
+    ] = None,
     contract: Annotated[
         bool, typer.Option("-c", help="Modifier le numéro du contrat - Exemple : 1")
     ] = False,
@@ -192,100 +293,77 @@ def update(
         bool,
         typer.Option("-s", help="Modifier le numéro du support associé - Exemple : 1"),
     ] = False,
+    assignments: updates.SetOption = None,
 ):
-    """Updates a given event."""
+    """Updates one or several fields of a given event."""
     token_check = clicollaborator._verify_token()
     if token_check:
-        collaborator_department = token_check[1]["department_id"]
-        collaborator_id = token_check[1]["collaborator_id"]
-        try:
-            event = Event.get(Event.id == event_id)
+        event = updates.get_editable(
+            Event,
+            event_id,
+            token_check[1],
+            f"Aucun évènement trouvé avec l'ID n°{event_id}.",
+        )
 
-        except DoesNotExist:
-            print(f"Aucun évènement trouvé avec l'ID n°{event_id}.")
-            raise typer.Exit()
+        changes = updates.selected_changes(
+            assignments,
+            new_value,
+            UPDATE_FIELDS,
+            {
+                "contract": contract,
+                "support": support,
+                "start_date": start_date,
+                "end_date": end_date,
+                "location": location,
+                "attendees": attendees,
+                "notes": notes,
+            },
+        )
 
-        if (int(collaborator_department) == MANAGEMENT_DEPARTMENT_ID) or (
-            int(collaborator_department) == SUPPORT_DEPARTMENT_ID
-            and int(collaborator_id) == event.support.id
-        ):
-            if contract:
-                contract_check = Contract.get_or_none(Contract.id == new_value)
+        _check_references(changes)
+        updates.save_changes(event, changes)
+        updates.print_updated(changes, UPDATE_FIELDS, f"de l'évènement n°{event_id}")
 
-                if contract_check:
-                    event.contract = new_value
-                    event.save()
-                    print(
-                        f"Le champ 'Contrat' de l'évènement n°{event_id} a été mis à jour avec succès."
-                    )
+        if "start_date" in changes and "end_date" not in changes:
+            print("Veuillez également penser à modifier la date de fin.")
+        elif "end_date" in changes and "start_date" not in changes:
+            print("Avez-vous également pensé à modifier la date de début ?")
 
-                else:
-                    print("Veuillez entrer un numéro de contrat valide.")
-                    raise typer.Exit(code=1)
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
 
-            elif support:
-                support_check = Collaborator.get_or_none(Collaborator.id == new_value)
 
-                if (
-                    support_check
-                    and support_check.department.id == SUPPORT_DEPARTMENT_ID
-                ):
-                    event.support = new_value
-                    event.save()
-                    print(
-                        f"Le champ 'Assistant en charge' de l'évènement n°{event_id} a été mis à jour avec succès."
-                    )
+@app.command("bulk-update")
+def bulk_update(
+    filters: updates.WhereOption,
+    assignments: updates.SetOption,
+    dry_run: updates.DryRunOption = False,
+    batch_size: updates.BatchSizeOption = None,
+):
+    """Updates every event matching the conditions with set-based UPDATEs."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_id = token_check[1]["collaborator_id"]
+        scope = updates.editable_condition(Event, token_check[1])
 
-                else:
-                    print(
-                        "Veuillez entrer un numéro de collaborateur valide et faisant partie du département Support."
-                    )
-                    raise typer.Exit(code=1)
-
-            elif start_date:
-                event.start_date = new_value
-                event.save()
-                print(
-                    f"Le champ 'Date de début' de l'évènement n°{event_id} a été mis à jour avec succès."
-                )
-                print("Veuillez également penser à modifier la date de fin.")
-
-            elif end_date:
-                event.end_date = new_value
-                event.save()
-                print(
-                    f"Le champ 'Date de fin' de l'évènement n°{event_id} a été mis à jour avec succès."
-                )
-                print("Avez-vous également pensé à modifier la date de début ?")
-
-            elif location:
-                event.location = new_value
-                event.save()
-                print(
-                    f"Le champ 'Localisation' de l'évènement n°{event_id} a été mis à jour avec succès."
-                )
-
-            elif attendees:
-                event.attendees = new_value
-                event.save()
-                print(
-                    f"Le champ 'Nombre de participants' de l'évènement n°{event_id} a été mis à jour avec succès."
-                )
-
-            elif notes:
-                event.notes = new_value
-                event.save()
-                print(
-                    f"Le champ 'Notes' de l'évènement n°{event_id} a été mis à jour avec succès."
-                )
+        condition = updates.parse_filters(Event, filters, FILTER_FIELDS)
+        if scope is not None:
+            condition &= scope
 
-            else:
-                print("Vous n'avez pas sélectionné d'attribut à modifier.")
-                raise typer.Exit()
+        values = updates.column_values(
+            Event, updates.selected_changes(assignments, None, UPDATE_FIELDS, {})
+        )
+        _check_references(values)
 
-        else:
-            print("Action restreinte.")
-            raise typer.Exit()
+        count = updates.run_bulk_update(
+            Event, condition, values, dry_run, batch_size, "évènement(s)"
+        )
+
+        if count:
+            audit.record(
+                f"[MAJ GROUPÉE DE {count} ÉVÈNEMENT(S) PAR COLLABORATEUR N°{collaborator_id}] >> Conditions : {', '.join(filters)} >> Valeurs : {', '.join(assignments)}"
+            )
 
     else:
         print("Veuillez vous authentifier et réessayer.")
@@ -357,7 +435,7 @@ def create(
                 raise typer.Exit()
 
             if support is not None:
-                support_check = Collaborator.get_or_none(Collaborator.id == support)
+                support_check = Collaborator.get_cached(support)
 
                 if not support_check:
                     print("Veuillez entrer un numéro de support valide.")
@@ -383,5 +461,54 @@ def create(
         raise typer.Exit()
 
 
+@app.command("import")
+def import_(
+    file: transfer.ImportFileArgument,
+    batch_size: transfer.BatchSizeOption = transfer.BATCH_SIZE,
+    resume: transfer.ResumeOption = False,
+):
+    """Imports events from a CSV or JSONL file."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        collaborator_department = token_check[1]["department_id"]
+        collaborator_id = token_check[1]["collaborator_id"]
+
+        if int(collaborator_department) == SALES_DEPARTMENT_ID:
+            transfer.run_import(
+                EventImporter(collaborator_id, batch_size), file, resume
+            )
+
+        else:
+            print("Action restreinte.")
+            raise typer.Exit()
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
+@app.command()
+def export(
+    columns: transfer.ColumnsOption = None,
+    where: listing.WhereOption = None,
+    output_format: transfer.ExportFormatOption = "csv",
+    output: transfer.OutputOption = None,
+    compression: transfer.CompressionOption = None,
+):
+    """Exports the events to CSV or JSONL."""
+    token_check = clicollaborator._verify_token()
+    if token_check:
+        queryset = listing.filter_queryset(
+            Event.select_with_relations().order_by(Event.id), where, EXPORT_COLUMNS
+        )
+        transfer.run_export(
+            queryset, EXPORT_COLUMNS, columns, output_format, output, compression
+        )
+
+    else:
+        print("Veuillez vous authentifier et réessayer.")
+        raise typer.Exit()
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,260 @@
+import csv
+import json
+import re
+import sys
+import typer
+from itertools import chain, islice
+from rich import print
+from peewee import BooleanField
+from rich.console import Console
+from typing import List, Optional
+from typing_extensions import Annotated
+from epicevents.data_access_layer import policy
+from epicevents.data_access_layer.pagination import paginate, stream
+
+STREAM_TABLE_ROWS = 100
+OUTPUT_FORMATS = ("table", "json", "jsonl", "csv", "tsv")
+CONDITION_PATTERN = re.compile(r"^\s*(\w+)\s*(!=|>=|<=|=|>|<|~)\s*(.*?)\s*$")
+TRUE_VALUES = ("true", "1", "yes", "oui")
+
+
+LimitOption = Annotated[
+    int,
+    typer.Option(
+        "--limit", min=1, help="Nombre maximal de lignes affichées - Exemple : 50"
+    ),
+]
+AfterOption = Annotated[
+    int,
+    typer.Option(
+        "--after",
+        help="Affiche les lignes suivant celle portant ce N° (dernière ligne de la page précédente) - Exemple : 120",
+    ),
+]
+DescendingOption = Annotated[
+    bool, typer.Option("--desc", help="Trier par ordre décroissant")
+]
+StreamOption = Annotated[
+    bool,
+    typer.Option(
+        "--stream",
+        help="Affiche les lignes par lots au fur et à mesure de leur lecture, sans charger toute la table en mémoire",
+    ),
+]
+FormatOption = Annotated[
+    str,
+    typer.Option(
+        "--format",
+        help="Format de sortie - Choix : table, json, jsonl, csv, tsv",
+    ),
+]
+MineOption = Annotated[
+    bool,
+    typer.Option("--mine", help="N'affiche que les lignes dont vous avez la charge"),
+]
+WhereOption = Annotated[
+    Optional[List[str]],
+    typer.Option(
+        "--where",
+        help="Condition de filtre (=, !=, <, <=, >, >=, ~ pour « contient »), répétable - Exemple : total_sum>=1000",
+    ),
+]
+
+
+def paginate_queryset(queryset, order_fields, order_by, after, limit, descending):
+    """Orders and paginates a queryset according to the list options."""
+    if order_by not in order_fields:
+        print(f"Veuillez choisir un champ de tri parmi : {', '.join(order_fields)}.")
+        raise typer.Exit(code=1)
+
+    return paginate(
+        queryset,
+        order_fields[order_by],
+        after=after,
+        limit=limit,
+        descending=descending,
+    )
+
+
+def only_owned(queryset, model, payload, empty_message):
+    """
+    Restricts a list queryset to the rows owned by the authenticated collaborator.
+
+    Exits with the empty message when they cannot own any row of the model.
+    """
+    condition = policy.owned(model, policy.Principal.from_payload(payload))
+
+    if condition is None:
+        print(empty_message)
+        raise typer.Exit()
+
+    return queryset.where(condition)
+
+
+def _condition(condition, columns):
+    """Builds the expression of a condition written as field<operator>value."""
+    match = CONDITION_PATTERN.match(condition)
+    if match is None or match.group(1) not in columns:
+        print(
+            f"Condition invalide : {condition}. Utilisez champ<opérateur>valeur avec un champ parmi : {', '.join(columns)}."
+        )
+        raise typer.Exit(code=1)
+
+    name, operator, value = match.groups()
+    field = columns[name]
+
+    if value.lower() == "null" and operator in ("=", "!="):
+        return field.is_null(operator == "=")
+    if isinstance(field, BooleanField):
+        value = value.lower() in TRUE_VALUES
+
+    if operator == "~":
+        return field.contains(value)
+    if operator == "=":
+        return field == value
+    if operator == "!=":
+        return field != value
+    if operator == "<":
+        return field < value
+    if operator == "<=":
+        return field <= value
+    if operator == ">":
+        return field > value
+    return field >= value
+
+
+def filter_queryset(queryset, conditions, columns):
+    """
+    Keeps the rows of a queryset matching all the --where conditions.
+
+    Conditions are written as field<operator>value, the field being one of
+    the given columns. A "null" value tests whether the field is empty.
+    """
+    expressions = [_condition(condition, columns) for condition in conditions or []]
+
+    if not expressions:
+        return queryset
+
+    return queryset.where(*expressions)
+
+
+def fetch(queryset):
+    """
+    Starts streaming the rows of a queryset.
+
+    Returns None when the first fetch brings no row, so that emptiness is
+    detected without counting or loading the whole result set.
+    """
+    rows = stream(queryset)
+    first_row = next(rows, None)
+
+    if first_row is None:
+        return None
+
+    return chain([first_row], rows)
+
+
+def print_table(rows, create_table, add_row, stream_rows=False):
+    """
+    Prints rows in a table built by create_table and populated by add_row.
+
+    In streaming mode, rows are printed in successive tables of
+    STREAM_TABLE_ROWS rows, the title and the header being only printed with
+    the first one, so that memory use does not depend on the number of rows.
+    """
+    console = Console()
+
+    if not stream_rows:
+        table = create_table()
+        for row in rows:
+            add_row(row, table)
+        console.print(table)
+        return
+
+    rows = iter(rows)
+    batch = [*islice(rows, STREAM_TABLE_ROWS)]
+    first_batch = True
+
+    while batch:
+        table = create_table()
+        if not first_batch:
+            table.title = None
+            table.show_header = False
+        for row in batch:
+            add_row(row, table)
+        console.print(table)
+        batch = [*islice(rows, STREAM_TABLE_ROWS)]
+        first_batch = False
+
+
+def write_rows(rows, headers, output_format, file=None):
+    """
+    Writes rows of values in a machine-readable format.
+
+    Rows are written one by one as they are read, with no formatting other
+    than the serialisation itself.
+    """
+    file = file or sys.stdout
+
+    if output_format in ("csv", "tsv"):
+        writer = csv.writer(
+            file,
+            delimiter="," if output_format == "csv" else "\t",
+            lineterminator="\n",
+        )
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+    elif output_format == "jsonl":
+        for row in rows:
+            file.write(
+                json.dumps(dict(zip(headers, row)), default=str, ensure_ascii=False)
+            )
+            file.write("\n")
+
+    elif output_format == "json":
+        separator = "\n"
+        file.write("[")
+        for row in rows:
+            file.write(separator)
+            file.write(
+                json.dumps(dict(zip(headers, row)), default=str, ensure_ascii=False)
+            )
+            separator = ",\n"
+        file.write("\n]\n")
+
+
+def export_rows(queryset, columns, output_format):
+    """
+    Streams the given columns of a queryset in a machine-readable format.
+
+    The queryset is turned into a tuple query, so that neither model instances
+    nor Rich objects are built for the rows.
+    """
+    rows = stream(queryset.columns(*columns.values()).tuples())
+    write_rows(rows, [*columns], output_format)
+
+
+def display(queryset, empty_message, print_rows, columns, output_format, stream_rows):
+    """
+    Displays a queryset as a table or in a machine-readable format.
+
+    Tables are printed by print_rows, and an empty result is reported with
+    empty_message. Other formats write the given columns, an empty result
+    only producing the headers or an empty list.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        print(f"Veuillez choisir un format parmi : {', '.join(OUTPUT_FORMATS)}.")
+        raise typer.Exit(code=1)
+
+    if output_format != "table":
+        export_rows(queryset, columns, output_format)
+        return
+
+    rows = fetch(queryset)
+
+    if rows is None:
+        print(empty_message)
+        raise typer.Exit()
+
+    print_rows(rows, stream_rows)
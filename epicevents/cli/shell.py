@@ -0,0 +1,90 @@
+import shlex
+from contextlib import nullcontext
+from rich import print
+from epicevents import audit
+from epicevents.cli import collaborator as clicollaborator
+from epicevents.data_access_layer import database
+from epicevents.profiling import command_args, command_name
+
+PROMPT = "epicevents> "
+EXIT_COMMANDS = ("exit", "quit")
+
+
+def run_command(app, args):
+    """
+    Runs a command of the shell as a single CLI invocation would.
+
+    The command runs in its own transaction on the connection kept open by
+    the shell, unless it manages its transactions itself, and its exit or
+    error ends the command rather than the shell. Its audit events are then
+    flushed in the background, as the shell may run for a long time.
+    """
+    command = command_args(args)
+    if command and command[0] in database.UNMANAGED_COMMANDS:
+        context = nullcontext()
+    else:
+        context = database.command_context(command=command_name(args))
+
+    try:
+        with context:
+            app(args, prog_name="")
+    except SystemExit:
+        pass
+    except KeyboardInterrupt:
+        print("Commande interrompue.")
+    except Exception as e:
+        from epicevents.sentry import sentry_sdk
+
+        print(e)
+        sentry_sdk.capture_exception(e)
+
+    audit.flush_in_background()
+
+
+def run_shell(app, read_line=input):
+    """
+    Reads and runs commands until "exit", "quit" or the end of the input.
+
+    The process, its imported modules, the database connection and the
+    verified principal are kept between commands, so that only the first
+    command pays for them.
+    """
+    try:
+        # Gives input() a history and line editing where available.
+        import readline
+    except ImportError:
+        pass
+
+    clicollaborator.shell_session = clicollaborator.ShellSession()
+    opened = database.psql_db.connect(reuse_if_open=True)
+    print('Tapez une commande (exemple : clients list), "--help" ou "exit".')
+
+    try:
+        while True:
+            try:
+                line = read_line(PROMPT)
+            except EOFError:
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                print(e)
+                continue
+
+            if not args:
+                continue
+            if args[0] in EXIT_COMMANDS:
+                break
+            if args[0] == "shell":
+                print("Vous êtes déjà dans le shell.")
+                continue
+
+            run_command(app, args)
+    finally:
+        clicollaborator.shell_session = None
+        if opened:
+            database.psql_db.close()
@@ -0,0 +1,173 @@
+import gzip
+import io
+import os
+import sys
+import typer
+from contextlib import contextmanager
+from importlib.util import find_spec
+from rich import print
+from typing_extensions import Annotated
+from epicevents.cli import listing
+from epicevents.data_access_layer import bulk
+from epicevents.data_access_layer.pagination import stream
+
+BATCH_SIZE = bulk.BATCH_SIZE
+EXPORT_FORMATS = ("csv", "tsv", "jsonl")
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+ImportFileArgument = Annotated[
+    str,
+    typer.Argument(help="Fichier CSV ou JSONL à importer - Exemple : donnees.csv"),
+]
+BatchSizeOption = Annotated[
+    int,
+    typer.Option(
+        "--batch-size",
+        min=1,
+        help="Nombre de lignes validées et enregistrées par lot - Exemple : 1000",
+    ),
+]
+ResumeOption = Annotated[
+    bool,
+    typer.Option(
+        "--resume",
+        help="Reprend un import interrompu après le dernier lot enregistré",
+    ),
+]
+ColumnsOption = Annotated[
+    str,
+    typer.Option(
+        "--columns",
+        help="Colonnes exportées, séparées par des virgules - Exemple : id,name,email",
+    ),
+]
+ExportFormatOption = Annotated[
+    str,
+    typer.Option("--format", help="Format d'export - Choix : csv, tsv, jsonl"),
+]
+OutputOption = Annotated[
+    str,
+    typer.Option(
+        "--output",
+        "-o",
+        help="Fichier de destination, la sortie standard par défaut - Exemple : clients.csv.gz",
+    ),
+]
+CompressionOption = Annotated[
+    str,
+    typer.Option(
+        "--compress",
+        help="Compression de l'export, déduite de l'extension .gz ou .zst par défaut - Choix : gzip, zstd",
+    ),
+]
+
+
+def run_import(importer, path, resume):
+    """Runs an import and prints its report."""
+    if not os.path.isfile(path):
+        print(f"Aucun fichier trouvé à l'emplacement {path}.")
+        raise typer.Exit(code=1)
+
+    report = importer.import_file(path, resume)
+
+    print(
+        f"Import terminé : {report.imported} ligne(s) importée(s), {report.rejected} ligne(s) rejetée(s)."
+    )
+
+    if report.rejected:
+        print(
+            f"Le détail des lignes rejetées est disponible dans {report.rejects_path}."
+        )
+
+
+def _select_columns(columns, selected_columns):
+    """Keeps the columns named in the --columns option, in the given order."""
+    if not selected_columns:
+        return columns
+
+    names = [name.strip() for name in selected_columns.split(",") if name.strip()]
+    unknown_names = [name for name in names if name not in columns]
+
+    if not names or unknown_names:
+        print(f"Veuillez choisir des colonnes parmi : {', '.join(columns)}.")
+        raise typer.Exit(code=1)
+
+    return {name: columns[name] for name in names}
+
+
+def _compressor(file, compression):
+    """Wraps a binary file in a gzip or zstd compressor."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file, mode="wb")
+
+    import zstandard
+
+    return zstandard.ZstdCompressor().stream_writer(file, closefd=False)
+
+
+@contextmanager
+def _open_output(path, compression):
+    """
+    Opens the text file an export is written to.
+
+    The standard output is used when no path is given. Compressed exports
+    are encoded and compressed on the fly, so that nothing is buffered but
+    the compressor's own window.
+    """
+    if compression is None:
+        if path is None:
+            yield sys.stdout
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                yield file
+        return
+
+    binary_file = open(path, "wb") if path else sys.stdout.buffer
+    try:
+        with io.TextIOWrapper(
+            _compressor(binary_file, compression), encoding="utf-8", newline=""
+        ) as file:
+            yield file
+    finally:
+        if path:
+            binary_file.close()
+        else:
+            binary_file.flush()
+
+
+def run_export(queryset, columns, selected_columns, output_format, path, compression):
+    """
+    Streams the selected columns of a queryset to a file or the standard output.
+
+    CSV and TSV exports are written by a COPY ... TO STDOUT statement on
+    PostgreSQL. Other databases and formats read the rows in chunks from a
+    cursor. In both cases, memory use does not depend on the number of rows.
+    """
+    if output_format not in EXPORT_FORMATS:
+        print(f"Veuillez choisir un format parmi : {', '.join(EXPORT_FORMATS)}.")
+        raise typer.Exit(code=1)
+
+    if compression is None and path:
+        compression = COMPRESSIONS.get(os.path.splitext(path)[1])
+
+    if compression not in (None, *COMPRESSIONS.values()):
+        print(
+            f"Veuillez choisir une compression parmi : {', '.join(COMPRESSIONS.values())}."
+        )
+        raise typer.Exit(code=1)
+
+    if compression == "zstd" and find_spec("zstandard") is None:
+        print("La compression zstd nécessite le paquet 'zstandard'.")
+        raise typer.Exit(code=1)
+
+    columns = _select_columns(columns, selected_columns)
+    query = queryset.columns(
+        *[field.alias(name) for name, field in columns.items()]
+    ).tuples()
+
+    with _open_output(path, compression) as file:
+        if output_format != "jsonl" and bulk.can_copy(query):
+            bulk.copy_to(query, file, "," if output_format == "csv" else "\t")
+        else:
+            listing.write_rows(stream(query), [*columns], output_format, file)
@@ -0,0 +1,250 @@
+import typer
+from rich import print
+from typing import List
+from typing_extensions import Annotated
+from peewee import BooleanField
+from epicevents.data_access_layer import bulk, policy
+from epicevents.data_access_layer.bulk import FALSE_VALUES, TRUE_VALUES
+
+NULL_VALUE = "null"
+
+
+SetOption = Annotated[
+    List[str],
+    typer.Option(
+        "--set",
+        metavar="CHAMP=VALEUR",
+        help="Champ à modifier et sa nouvelle valeur, répétable - Exemple : --set location=Lyon",
+    ),
+]
+WhereOption = Annotated[
+    List[str],
+    typer.Option(
+        "--where",
+        metavar="CHAMP=VALEUR",
+        help='Condition des lignes à modifier, répétable, "null" désignant une valeur vide - Exemple : --where support=3',
+    ),
+]
+DryRunOption = Annotated[
+    bool,
+    typer.Option(
+        "--dry-run", help="Affiche le nombre de lignes concernées sans les modifier"
+    ),
+]
+BatchSizeOption = Annotated[
+    int,
+    typer.Option(
+        "--batch-size",
+        min=1,
+        help="Nombre maximal de lignes modifiées par transaction - Exemple : 10000",
+    ),
+]
+
+
+def parse_assignments(assignments, fields, option="--set"):
+    """
+    Reads the field=value pairs given with --set or --where.
+
+    Returns the values keyed by field name, in the order they were given.
+    Exits when a pair is malformed, names an unknown field or repeats one.
+    """
+    changes = {}
+
+    for assignment in assignments:
+        field, separator, value = assignment.partition("=")
+        field = field.strip()
+
+        if not separator or field not in fields:
+            print(
+                f"Veuillez choisir un champ parmi : {', '.join(fields)} (Exemple : {option} {next(iter(fields))}=valeur)."
+            )
+            raise typer.Exit(code=1)
+
+        if field in changes:
+            print(f"Le champ '{fields[field]}' ne peut être modifié qu'une fois.")
+            raise typer.Exit(code=1)
+
+        changes[field] = value
+
+    return changes
+
+
+def selected_changes(assignments, new_value, fields, flags):
+    """
+    Returns the changes requested by an update command.
+
+    They come from the --set pairs when any is given, and otherwise from the
+    first selected single-field flag along with the new value.
+    """
+    if assignments:
+        return parse_assignments(assignments, fields)
+
+    for field, selected in flags.items():
+        if selected:
+            if new_value is None:
+                print("Veuillez entrer la nouvelle valeur du champ à modifier.")
+                raise typer.Exit(code=1)
+            return {field: new_value}
+
+    print("Vous n'avez pas sélectionné d'attribut à modifier.")
+    raise typer.Exit()
+
+
+def to_bool(value):
+    """
+    Converts a boolean given on the command line.
+
+    A value which is neither true nor false is returned unchanged, for the
+    validation of the model to reject it.
+    """
+    text = str(value).strip().lower()
+
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    return value
+
+
+def save_changes(instance, changes):
+    """
+    Applies changes to an instance and saves them with a single UPDATE.
+
+    The new values are validated together by the save() method of the model,
+    and only the changed columns are written, inside one transaction.
+    """
+    for field, value in changes.items():
+        setattr(instance, field, value)
+
+    with instance._meta.database.atomic():
+        instance.save(only=instance.dirty_fields)
+
+
+def get_editable(model, pk, payload, not_found_message):
+    """
+    Fetches the row changed by an update command, or exits.
+
+    The ownership of the authenticated collaborator is checked by the fetching
+    query itself; the existence of the row is only looked up when it fails, to
+    tell an unknown identifier from a restricted action.
+    """
+    try:
+        instance = policy.get_editable(
+            model, pk, policy.Principal.from_payload(payload)
+        )
+    except PermissionError:
+        instance = None
+
+    if instance is None:
+        if model.select().where(model._meta.primary_key == pk).exists():
+            print("Action restreinte.")
+        else:
+            print(not_found_message)
+        raise typer.Exit()
+
+    return instance
+
+
+def editable_condition(model, payload):
+    """Returns the condition of the rows the authenticated collaborator may change, or exits."""
+    try:
+        return policy.editable(model, policy.Principal.from_payload(payload))
+    except PermissionError:
+        print("Action restreinte.")
+        raise typer.Exit()
+
+
+def print_updated(changes, labels, target):
+    """Prints the success message of an update, target being such as "du client n°1"."""
+    names = ", ".join(f"'{labels[field]}'" for field in changes)
+
+    if len(changes) == 1:
+        print(f"Le champ {names} {target} a été mis à jour avec succès.")
+    else:
+        print(f"Les champs {names} {target} ont été mis à jour avec succès.")
+
+
+def _column_value(field, value):
+    """Converts a value given on the command line for a column of a set-based query."""
+    if isinstance(value, str) and value.strip().lower() == NULL_VALUE and field.null:
+        return None
+    if isinstance(field, BooleanField):
+        return to_bool(value)
+    return value
+
+
+def parse_filters(model, filters, fields):
+    """
+    Reads the field=value conditions given with --where.
+
+    Returns the condition matching the rows meeting all of them, "null"
+    matching the empty values of a nullable field. Exits when none is given,
+    so that a mass update never covers a whole table by mistake.
+    """
+    if not filters:
+        print("Veuillez préciser les lignes à modifier avec --where.")
+        raise typer.Exit(code=1)
+
+    condition = None
+
+    for field, value in parse_assignments(filters, fields, "--where").items():
+        column = getattr(model, field)
+        value = _column_value(column, value)
+        if isinstance(column, BooleanField) and not isinstance(value, bool):
+            print(f"Le champ '{fields[field]}' doit être filtré avec True ou False.")
+            raise typer.Exit(code=1)
+        clause = column.is_null() if value is None else column == value
+        condition = clause if condition is None else condition & clause
+
+    return condition
+
+
+def column_values(model, changes):
+    """Converts the new values of a set-based update, keyed by field name."""
+    return {
+        field: _column_value(getattr(model, field), value)
+        for field, value in changes.items()
+    }
+
+
+def validate_changes(model, condition, values):
+    """
+    Validates the new values of a set-based update with the rules of the model.
+
+    They are applied to the first matching row, which is then validated as
+    save() would. Returns False when no row matches.
+    """
+    instance = model.select().where(condition).order_by(model._meta.primary_key).first()
+    if instance is None:
+        return False
+
+    for field, value in values.items():
+        setattr(instance, field, value)
+    instance.validate()
+    return True
+
+
+def run_bulk_update(model, condition, values, dry_run, batch_size, noun):
+    """
+    Runs the set-based update of a bulk-update command and prints its outcome.
+
+    Returns the number of updated rows, zero for a dry run.
+    """
+    if dry_run:
+        count = model.select().where(condition).count()
+        print(f"{count} {noun} seraient modifié(s).")
+        return 0
+
+    if not validate_changes(model, condition, values):
+        print("Aucune ligne ne correspond aux conditions.")
+        return 0
+
+    count = bulk.update_rows(
+        model,
+        condition,
+        {getattr(model, field): value for field, value in values.items()},
+        batch_size,
+    )
+
+    print(f"{count} {noun} modifié(s).")
+    return count
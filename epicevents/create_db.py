@@ -1,45 +1,63 @@
-from dotenv import get_key
-from data_access_layer.database import psql_db
-from data_access_layer.client import Client
-from data_access_layer.collaborator import Collaborator
-from data_access_layer.company import Company
-from data_access_layer.contract import Contract
-from data_access_layer.department import Department
-from data_access_layer.event import Event
-
-ADMIN_EMAIL = get_key(".env", "ADMIN_EMAIL")
-ADMIN_PASSWORD = get_key(".env", "ADMIN_PASSWORD")
-
-
-"""Connecting to the database."""
-psql_db.connect()
-
-
-"""Table creation."""
-psql_db.create_tables([Client, Collaborator, Company, Contract, Department, Event])
-
+"""
+Creates the database of EpicEvents, its reference rows and its admin user.
 
-"""Creating EpicEvents' departments."""
-Department.create(name="Management")
-Department.create(name="Sales")
-Department.create(name="Support")
-
-
-"""Creating fake companies."""
-Company.create(name="L'Oréal")
-Company.create(name="Ubisoft")
-Company.create(name="Riot Games")
-
-
-"""Creating the admin user."""
-Collaborator.create(
-    first_name="Admin",
-    name="Test",
-    email=ADMIN_EMAIL,
-    password=ADMIN_PASSWORD,
-    department=1,
-)
-
-
-"""Closing the database."""
-psql_db.close()
+Run from the root of the project with "python -m epicevents.create_db". Every
+step skips what already exists, so that the script can be run again on an
+existing database.
+"""
+from dotenv import get_key
+from epicevents.data_access_layer import database, migrations
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.department import Department
+from epicevents.data_access_layer.event import Event
+
+DEPARTMENTS = ("Management", "Sales", "Support")
+COMPANIES = ("L'Oréal", "Ubisoft", "Riot Games")
+
+
+def main(admin_email=None, admin_password=None):
+    """Creates the tables, applies the migrations and creates the reference rows."""
+    admin_email = admin_email or get_key(".env", "ADMIN_EMAIL")
+    admin_password = admin_password or get_key(".env", "ADMIN_PASSWORD")
+
+    # Connecting to the database.
+    opened = database.psql_db.connect(reuse_if_open=True)
+
+    try:
+        # Table creation, skipping the tables which already exist.
+        database.psql_db.create_tables(
+            [Client, Collaborator, Company, Contract, Department, Event]
+        )
+
+        # Applying the schema migrations, which the new tables already include.
+        migrations.run()
+
+        # Creating EpicEvents' departments.
+        for name in DEPARTMENTS:
+            Department.get_or_create(name=name)
+
+        # Creating fake companies.
+        for name in COMPANIES:
+            Company.get_or_create(name=name)
+
+        # Creating the admin user.
+        if not Collaborator.select().where(Collaborator.email == admin_email).exists():
+            Collaborator.create(
+                first_name="Admin",
+                name="Test",
+                email=admin_email,
+                password=admin_password,
+                department=1,
+            )
+
+    finally:
+        # Closing the database.
+        if opened:
+            database.psql_db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import io
+import json
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+from epicevents.profiling import command_args, command_name
+from epicevents.settings import get_settings
+
+FRAME_HEADER = struct.Struct("!cI")
+REQUEST = b"r"
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+FALLBACK = b"f"
+HELD_OUTPUT_SIZE = 64 * 1024
+LOCAL_COMMANDS = (
+    "migrate",
+    "seed",
+    "serve",
+    "serve-api",
+    "shell",
+    "--install-completion",
+    "--show-completion",
+)
+
+
+def default_socket_path():
+    """Returns the socket path of the daemon, one per user by default."""
+    return get_settings().daemon_socket_path or os.path.join(
+        tempfile.gettempdir(), f"epicevents-{os.getuid()}.sock"
+    )
+
+
+def _send_frame(connection, kind, payload=b""):
+    """Sends a frame made of a kind, a length and a payload."""
+    connection.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _read_exact(connection, size):
+    """Reads exactly size bytes from a socket."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("La connexion au démon a été interrompue.")
+        data += chunk
+    return bytes(data)
+
+
+def _read_frame(connection):
+    """Reads the next frame from a socket and returns its kind and payload."""
+    kind, size = FRAME_HEADER.unpack(_read_exact(connection, FRAME_HEADER.size))
+    return kind, _read_exact(connection, size)
+
+
+def send_request(connection, args):
+    """Sends a command to the daemon, along with the context of the caller."""
+    request = {
+        "args": [*args],
+        "cwd": os.getcwd(),
+        "columns": shutil.get_terminal_size().columns,
+        "color": sys.stdout.isatty(),
+    }
+    _send_frame(connection, REQUEST, json.dumps(request).encode("utf-8"))
+
+
+def receive_response(connection, stdout, stderr):
+    """
+    Copies the output of a command run by the daemon as it arrives.
+
+    Returns the exit code of the command, or None when the daemon hands the
+    command back because it needs the terminal.
+    """
+    while True:
+        kind, payload = _read_frame(connection)
+        if kind == STDOUT:
+            stdout.write(payload)
+            stdout.flush()
+        elif kind == STDERR:
+            stderr.write(payload)
+            stderr.flush()
+        elif kind == EXIT:
+            return int(payload)
+        elif kind == FALLBACK:
+            return None
+
+
+def forward(args, socket_path=None, stdout=None, stderr=None):
+    """
+    Runs a command in the daemon listening on socket_path.
+
+    Returns the exit code of the command, or None when no daemon is running
+    or when the command must run in-process.
+    """
+    command = command_args(args)
+    if command and command[0] in LOCAL_COMMANDS:
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path or default_socket_path())
+    except OSError:
+        connection.close()
+        return None
+
+    with connection:
+        send_request(connection, args)
+        return receive_response(
+            connection, stdout or sys.stdout.buffer, stderr or sys.stderr.buffer
+        )
+
+
+class InteractiveCommand(Exception):
+    """Raised when a command run by the daemon prompts for a value."""
+
+
+def _refuse_prompt(text=""):
+    """Replaces the terminal prompts while a command runs in the daemon."""
+    raise InteractiveCommand()
+
+
+class _FrameWriter(io.RawIOBase):
+    """
+    Sends what a command writes to the client, as frames of a given kind.
+
+    The first HELD_OUTPUT_SIZE bytes are held back, so that the output of a
+    command handed back to the client, such as the text of a prompt, can be
+    discarded.
+    """
+
+    def __init__(self, connection, kind):
+        super().__init__()
+        self.connection = connection
+        self.kind = kind
+        self.held_output = bytearray()
+        self.streaming = False
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.streaming:
+            _send_frame(self.connection, self.kind, bytes(data))
+        else:
+            self.held_output += data
+            if len(self.held_output) > HELD_OUTPUT_SIZE:
+                self.release()
+        return len(data)
+
+    def release(self):
+        """Sends the held output and streams the rest as it is written."""
+        if self.held_output:
+            _send_frame(self.connection, self.kind, bytes(self.held_output))
+        self.held_output.clear()
+        self.streaming = True
+
+    def discard(self):
+        """Drops the held output."""
+        self.held_output.clear()
+
+
+def handle_request(app, connection):
+    """
+    Runs a command received on a connection and sends back its output.
+
+    The command runs in the working directory of the client, so that its
+    .env file and relative paths are used, and in its own transaction on the
+    connection kept by the daemon. A command prompting for a value is rolled
+    back and handed back to the client.
+    """
+    import click.termui
+    from contextlib import redirect_stderr, redirect_stdout
+    from epicevents.data_access_layer import database
+
+    kind, payload = _read_frame(connection)
+    request = json.loads(payload)
+
+    writers = [_FrameWriter(connection, STDOUT), _FrameWriter(connection, STDERR)]
+    stdout, stderr = [
+        io.TextIOWrapper(
+            io.BufferedWriter(writer), encoding="utf-8", line_buffering=True
+        )
+        for writer in writers
+    ]
+    prompt_functions = (
+        click.termui.visible_prompt_func,
+        click.termui.hidden_prompt_func,
+    )
+    working_directory = os.getcwd()
+    environment = {"COLUMNS": str(request["columns"])}
+    if request["color"]:
+        environment["FORCE_COLOR"] = "1"
+    previous_environment = {
+        name: os.environ.get(name) for name in ("COLUMNS", "FORCE_COLOR")
+    }
+
+    click.termui.visible_prompt_func = click.termui.hidden_prompt_func = _refuse_prompt
+    os.environ.update(environment)
+    os.chdir(request["cwd"])
+    code = 0
+
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                with database.command_context(command=command_name(request["args"])):
+                    app(request["args"], prog_name="epicevents")
+            except SystemExit as exit_request:
+                code = exit_request.code or 0
+                if not isinstance(code, int):
+                    code = 1
+            except InteractiveCommand:
+                code = None
+            except Exception as e:
+                from rich import print
+                from epicevents.sentry import sentry_sdk
+
+                print(e)
+                sentry_sdk.capture_exception(e)
+                code = 1
+            stdout.flush()
+            stderr.flush()
+    finally:
+        (
+            click.termui.visible_prompt_func,
+            click.termui.hidden_prompt_func,
+        ) = prompt_functions
+        os.chdir(working_directory)
+        for name, value in previous_environment.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    if code is None:
+        for writer in writers:
+            writer.discard()
+        _send_frame(connection, FALLBACK)
+    else:
+        for writer in writers:
+            writer.release()
+        _send_frame(connection, EXIT, str(code).encode("ascii"))
+
+    # The daemon never exits between commands, so their audit events are
+    # flushed once the command has committed and its client has its answer.
+    from epicevents import audit
+
+    audit.flush_in_background()
+
+
+def serve(app, socket_path=None):
+    """
+    Answers the commands sent on a Unix socket until the process is stopped.
+
+    The daemon imports every command module and opens its database
+    connection once, then runs the commands one after the other. The socket
+    is only accessible to the user running the daemon.
+    """
+    import signal
+    import socketserver
+    from rich import print
+    from epicevents.data_access_layer import database
+
+    socket_path = socket_path or default_socket_path()
+
+    class RequestHandler(socketserver.BaseRequestHandler):
+        def handle(self):
+            handle_request(app, self.request)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, RequestHandler)
+    finally:
+        os.umask(previous_umask)
+
+    def stop(signal_number, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    database.psql_db.connect(reuse_if_open=True)
+    print(f"Démon à l'écoute sur {socket_path}.")
+    sys.stdout.flush()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+        database.psql_db.close()
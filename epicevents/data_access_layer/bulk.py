@@ -0,0 +1,470 @@
+import csv
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from itertools import islice
+from peewee import PostgresqlDatabase, chunked
+from . import row_security
+from .database import commit_progress
+from .client import Client
+from .collaborator import Collaborator
+from .company import Company
+from .contract import Contract
+from .event import Event
+
+BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 100
+TRUE_VALUES = ("true", "1", "yes", "oui")
+FALSE_VALUES = ("false", "0", "no", "non")
+
+
+def read_rows(path):
+    """
+    Reads a CSV or JSONL file one row at a time.
+
+    Yields (line number, row) pairs, the row being a dictionary of stripped
+    values where empty values are replaced with None, or None when the line
+    cannot be parsed.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield number, _clean(row) if isinstance(row, dict) else None
+        else:
+            for number, row in enumerate(csv.DictReader(file), start=2):
+                yield number, _clean(row)
+
+
+def _clean(row):
+    """Strips the values of a row and replaces the empty ones with None."""
+    cleaned_row = {}
+    for key, value in row.items():
+        if isinstance(value, str):
+            value = value.strip() or None
+        cleaned_row[key] = value
+    return cleaned_row
+
+
+def _to_id(value):
+    """Converts an identifier read from a file to an integer, or None if it is invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_ids(rows, key):
+    """Collects the valid identifiers found in a column of a batch."""
+    return {_to_id(row.get(key)) for row in rows} - {None}
+
+
+def _present(**values):
+    """Keeps the values given in a row, so that missing ones get their default."""
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def can_copy(query):
+    """Tells whether the rows of a query can be exported with a COPY statement."""
+    return isinstance(query.model._meta.database, PostgresqlDatabase)
+
+
+def copy_to(query, file, delimiter=","):
+    """
+    Streams the rows of a query to a file with a PostgreSQL COPY ... TO STDOUT.
+
+    Rows are written as CSV by the server, with a header made of the aliases
+    of the selected columns, and flow to the file without being turned into
+    Python objects.
+    """
+    database = query.model._meta.database
+    cursor = database.cursor()
+    sql, params = query.sql()
+    statement = cursor.mogrify(sql, params).decode(cursor.connection.encoding)
+    delimiter = "E'\\t'" if delimiter == "\t" else f"'{delimiter}'"
+    cursor.copy_expert(
+        f"COPY ({statement}) TO STDOUT WITH (FORMAT csv, HEADER true, DELIMITER {delimiter})",
+        file,
+    )
+
+
+def load_rows(model, fields, rows):
+    """
+    Loads rows of values, listed in the order of fields, into the table of a model.
+
+    The rows are loaded with a PostgreSQL COPY ... FROM STDIN statement, or
+    with multi-row INSERT statements on other databases. In the row-level
+    security mode, where PostgreSQL refuses COPY FROM to the roles subject to
+    the policies, INSERT statements are used as well.
+    """
+    if not rows:
+        return
+
+    database = model._meta.database
+
+    with database.atomic():
+        if isinstance(database, PostgresqlDatabase) and not row_security.ENABLED:
+            _copy_rows(database, model, fields, rows)
+        else:
+            for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+                model.insert_many(chunk, fields=fields).execute(database)
+
+
+def _copy_value(value):
+    """
+    Formats a value as a field of a CSV COPY.
+
+    Values are always quoted, so that an empty string stays one, and None is
+    written as an unquoted empty field, which is how COPY reads a NULL.
+    """
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_rows(database, model, fields, rows):
+    """Loads rows with a PostgreSQL COPY ... FROM STDIN statement."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(
+            ",".join(
+                _copy_value(field.db_value(value)) for field, value in zip(fields, row)
+            )
+        )
+        buffer.write("\n")
+    buffer.seek(0)
+    columns = ", ".join(f'"{field.column_name}"' for field in fields)
+    database.cursor().copy_expert(
+        f'COPY "{model._meta.table_name}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+        buffer,
+    )
+
+
+def update_rows(model, condition, values, batch_size=None):
+    """
+    Updates the rows of a model matching a condition with set-based UPDATEs.
+
+    Without a batch size, all the rows are updated by a single statement.
+    Otherwise, they are updated by one statement per batch of at most
+    batch_size rows, taken in primary key order, and each batch is
+    committed, so that a very large update neither holds its locks nor
+    grows its transaction until the end. Returns the number of updated rows.
+    """
+    if not batch_size:
+        return model.update(values).where(condition).execute()
+
+    database = model._meta.database
+    primary_key = model._meta.primary_key
+    updated = 0
+    last_id = None
+
+    while True:
+        query = model.select(primary_key).where(condition)
+        if last_id is not None:
+            query = query.where(primary_key > last_id)
+        ids = [row[0] for row in query.order_by(primary_key).limit(batch_size).tuples()]
+
+        if not ids:
+            return updated
+
+        updated += model.update(values).where(primary_key.in_(ids)).execute()
+        last_id = ids[-1]
+        commit_progress(database)
+
+
+class ImportReport:
+    """Sums up the outcome of an import."""
+
+    def __init__(self, imported=0, rejected=0, last_line=0, rejects_path=None):
+        self.imported = imported
+        self.rejected = rejected
+        self.last_line = last_line
+        self.rejects_path = rejects_path
+
+
+class BulkImporter(ABC):
+    """
+    Validates and loads the rows of a file into the table of a model.
+
+    Rows are processed in batches: the rows referenced by a batch are fetched
+    with a few set-based queries, each row is validated with the same rules as
+    Model.save(), and the valid rows are loaded with a PostgreSQL COPY or with
+    multi-row INSERT statements. Every loaded batch is committed and recorded
+    in a checkpoint file, so that an interrupted import can be resumed.
+    """
+
+    model = None
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def resolve(self, rows):
+        """Fetches the rows referenced by a batch, with set-based queries."""
+        return {}
+
+    @abstractmethod
+    def build(self, row, references):
+        """
+        Builds a model instance from a row of the file.
+
+        Raises:
+            ValueError: If the row references unknown or forbidden rows.
+        """
+
+    def accept(self, instance, references):
+        """Records an instance accepted in the current batch."""
+
+    def import_file(self, path, resume=False):
+        """Imports a CSV or JSONL file and returns an ImportReport."""
+        checkpoint_path = f"{path}.checkpoint"
+        report = ImportReport(rejects_path=f"{path}.rejected.csv")
+
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            report.imported = checkpoint["imported"]
+            report.rejected = checkpoint["rejected"]
+            report.last_line = checkpoint["last_line"]
+
+        rows = (
+            (number, row)
+            for number, row in read_rows(path)
+            if number > report.last_line
+        )
+        rejects_mode = "a" if resume and report.last_line else "w"
+
+        with open(
+            report.rejects_path, rejects_mode, newline="", encoding="utf-8"
+        ) as file:
+            rejects = csv.writer(file, lineterminator="\n")
+            if rejects_mode == "w":
+                rejects.writerow(["line", "reason", "row"])
+
+            while True:
+                batch = [*islice(rows, self.batch_size)]
+                if not batch:
+                    break
+
+                instances = self._validate_batch(batch, rejects, report)
+                self._load(instances)
+                report.imported += len(instances)
+                report.last_line = batch[-1][0]
+                commit_progress(self.model._meta.database)
+                file.flush()
+                self._write_checkpoint(checkpoint_path, report)
+
+        self.model._meta.database.execute_sql(
+            f'ANALYZE "{self.model._meta.table_name}"'
+        )
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        return report
+
+    def _validate_batch(self, batch, rejects, report):
+        """Validates the rows of a batch and reports the rejected ones."""
+        references = self.resolve([row for _, row in batch if row is not None])
+        instances = []
+
+        for number, row in batch:
+            try:
+                if row is None:
+                    raise ValueError("Erreur : La ligne n'est pas lisible.")
+                instance = self.build(row, references)
+                instance.validate()
+            except (ValueError, TypeError) as error:
+                rejects.writerow(
+                    [number, str(error), json.dumps(row, ensure_ascii=False)]
+                )
+                report.rejected += 1
+            else:
+                self.accept(instance, references)
+                instances.append(instance)
+
+        return instances
+
+    def _load(self, instances):
+        """Loads valid instances with a COPY on PostgreSQL, INSERT statements otherwise."""
+        if not instances:
+            return
+
+        fields = [
+            field
+            for field in self.model._meta.sorted_fields
+            if field is not self.model._meta.primary_key
+        ]
+        load_rows(
+            self.model,
+            fields,
+            [
+                [instance.__data__.get(field.name) for field in fields]
+                for instance in instances
+            ],
+        )
+
+    def _write_checkpoint(self, checkpoint_path, report):
+        """Records the progress of the import after a committed batch."""
+        with open(checkpoint_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump(
+                {
+                    "imported": report.imported,
+                    "rejected": report.rejected,
+                    "last_line": report.last_line,
+                },
+                checkpoint_file,
+            )
+
+
+class ClientImporter(BulkImporter):
+    """Imports clients assigned to the importing sales collaborator."""
+
+    model = Client
+
+    def __init__(self, collaborator_id, batch_size=BATCH_SIZE):
+        super().__init__(batch_size)
+        self.collaborator = Collaborator.get_by_id(collaborator_id)
+
+    def resolve(self, rows):
+        emails = {row.get("email") for row in rows} - {None}
+        phones = {row.get("phone") for row in rows} - {None}
+        existing_clients = Client.select(Client.email, Client.phone).where(
+            Client.email.in_([*emails]) | Client.phone.in_([*phones])
+        )
+
+        return {
+            "companies": {
+                company.id: company
+                for company in Company.select().where(
+                    Company.id.in_([*_to_ids(rows, "company")])
+                )
+            },
+            "emails": {client.email for client in existing_clients},
+            "phones": {client.phone for client in existing_clients},
+        }
+
+    def build(self, row, references):
+        company = references["companies"].get(_to_id(row.get("company")))
+        if company is None:
+            raise ValueError(
+                "Erreur : Veuillez entrer un identifiant d'entreprise valide."
+            )
+        if row.get("email") in references["emails"]:
+            raise ValueError("Erreur : Un client utilise déjà cet email.")
+        if row.get("phone") in references["phones"]:
+            raise ValueError("Erreur : Un client utilise déjà ce numéro de téléphone.")
+
+        return Client(
+            company=company,
+            collaborator=self.collaborator,
+            **_present(
+                first_name=row.get("first_name"),
+                name=row.get("name"),
+                email=row.get("email"),
+                phone=row.get("phone"),
+                creation_date=row.get("creation_date"),
+                last_update=row.get("last_update"),
+            ),
+        )
+
+    def accept(self, instance, references):
+        references["emails"].add(instance.email)
+        references["phones"].add(instance.phone)
+
+
+class ContractImporter(BulkImporter):
+    """Imports contracts assigned to the collaborator in charge of their client."""
+
+    model = Contract
+
+    def resolve(self, rows):
+        clients = (
+            Client.select(Client, Collaborator)
+            .join(Collaborator)
+            .where(Client.id.in_([*_to_ids(rows, "client")]))
+        )
+        return {"clients": {client.id: client for client in clients}}
+
+    def build(self, row, references):
+        client = references["clients"].get(_to_id(row.get("client")))
+        if client is None:
+            raise ValueError("Erreur : Veuillez entrer un identifiant client valide.")
+
+        signed = row.get("signed")
+        if isinstance(signed, str):
+            signed = signed.lower() in TRUE_VALUES
+
+        return Contract(
+            client=client,
+            collaborator=client.collaborator,
+            total_sum=row.get("total_sum"),
+            **_present(
+                amount_due=row.get("amount_due"),
+                creation_date=row.get("creation_date"),
+                signed=signed,
+            ),
+        )
+
+
+class EventImporter(BulkImporter):
+    """Imports events of signed contracts whose client belongs to the importer."""
+
+    model = Event
+
+    def __init__(self, collaborator_id, batch_size=BATCH_SIZE):
+        super().__init__(batch_size)
+        self.collaborator_id = int(collaborator_id)
+
+    def resolve(self, rows):
+        contracts = (
+            Contract.select(Contract, Client)
+            .join(Client)
+            .where(Contract.id.in_([*_to_ids(rows, "contract")]))
+        )
+        supports = Collaborator.select().where(
+            Collaborator.id.in_([*_to_ids(rows, "support")])
+        )
+
+        return {
+            "contracts": {contract.id: contract for contract in contracts},
+            "supports": {support.id: support for support in supports},
+        }
+
+    def build(self, row, references):
+        contract = references["contracts"].get(_to_id(row.get("contract")))
+        if contract is None:
+            raise ValueError(
+                "Erreur : Veuillez entrer un identifiant de contrat valide."
+            )
+        if contract.client.collaborator_id != self.collaborator_id:
+            raise ValueError(
+                "Erreur : Vous ne pouvez pas créer d'évènement pour un client qui ne vous est pas affecté."
+            )
+        if not contract.signed:
+            raise ValueError(
+                "Erreur : Vous ne pouvez pas créer d'évènement pour un contrat qui n'est pas signé."
+            )
+
+        support = None
+        if row.get("support") is not None:
+            support = references["supports"].get(_to_id(row.get("support")))
+            if support is None:
+                raise ValueError(
+                    "Erreur : Veuillez entrer un identifiant de collaborateur valide."
+                )
+
+        return Event(
+            contract=contract,
+            support=support,
+            start_date=row.get("start_date"),
+            end_date=row.get("end_date"),
+            location=row.get("location"),
+            attendees=row.get("attendees"),
+            notes=row.get("notes"),
+        )
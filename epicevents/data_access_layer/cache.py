@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+from .database import BaseModel
+from epicevents.settings import get_settings
+
+settings = get_settings()
+TTL = settings.reference_cache_ttl
+PATH = settings.reference_cache_path
+
+
+class ReferenceCache:
+    """
+    Keeps the rows of the reference tables looked up by primary key.
+
+    Entries expire after ttl seconds and are dropped as soon as their row is
+    saved or deleted through its model. When a path is given, entries are
+    also kept in a SQLite file, so that successive commands share them.
+    Changes made by other means, such as raw update queries, are only seen
+    once the entry has expired.
+    """
+
+    def __init__(self, ttl=None, path=None):
+        self.ttl = TTL if ttl is None else ttl
+        self.path = path
+        self.entries = {}
+
+    def _connect(self):
+        """Opens the cache file, creating its table on first use."""
+        connection = sqlite3.connect(self.path, timeout=1)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS reference_row ("
+            "namespace TEXT NOT NULL, "
+            "id INTEGER NOT NULL, "
+            "data TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, id))"
+        )
+        return connection
+
+    def get(self, namespace, key):
+        """Returns the cached data of a row, or None if it is missing or expired."""
+        entry = self.entries.get((namespace, key))
+
+        if entry is None and self.path:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT data, expires_at FROM reference_row "
+                    "WHERE namespace = ? AND id = ?",
+                    (namespace, key),
+                ).fetchone()
+            if row is not None:
+                entry = self.entries[(namespace, key)] = json.loads(row[0]), row[1]
+
+        if entry is None:
+            return None
+
+        data, expires_at = entry
+        if expires_at <= time.time():
+            self.invalidate(namespace, key)
+            return None
+
+        return data
+
+    def set(self, namespace, key, data):
+        """Caches the data of a row for ttl seconds."""
+        if self.ttl <= 0:
+            return
+
+        expires_at = time.time() + self.ttl
+        self.entries[(namespace, key)] = data, expires_at
+
+        if self.path:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO reference_row (namespace, id, data, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(data), expires_at),
+                )
+
+    def invalidate(self, namespace, key):
+        """Drops the cached data of a row."""
+        self.entries.pop((namespace, key), None)
+
+        if self.path:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "DELETE FROM reference_row WHERE namespace = ? AND id = ?",
+                    (namespace, key),
+                )
+
+    def clear(self):
+        """Drops every cached row."""
+        self.entries.clear()
+
+        if self.path:
+            with closing(self._connect()) as connection, connection:
+                connection.execute("DELETE FROM reference_row")
+
+
+@lru_cache(maxsize=None)
+def get_cache():
+    """Returns the reference cache, created on first use."""
+    return ReferenceCache(TTL, PATH)
+
+
+class CachedModel(BaseModel):
+    """
+    Base model of the small reference tables.
+
+    Rows looked up with get_cached() are read through the reference cache,
+    and saving or deleting an instance invalidates its entry.
+    """
+
+    uncached_fields = ()
+
+    @classmethod
+    def _cache_namespace(cls):
+        """Names the cache entries of the model, per database."""
+        return f"{cls._meta.database.database}.{cls._meta.table_name}"
+
+    @classmethod
+    def get_cached(cls, pk):
+        """
+        Returns the row with the given primary key, or None if there is none.
+
+        The fields listed in uncached_fields are neither cached nor set on
+        the instances read from the cache.
+        """
+        try:
+            key = int(pk)
+        except (TypeError, ValueError):
+            return None
+
+        cache = get_cache()
+        data = cache.get(cls._cache_namespace(), key)
+
+        if data is not None:
+            instance = cls(__no_default__=True, **data)
+            instance._dirty.clear()
+            return instance
+
+        instance = cls.get_or_none(cls._meta.primary_key == key)
+
+        if instance is not None:
+            cache.set(
+                cls._cache_namespace(),
+                key,
+                {
+                    name: value
+                    for name, value in instance.__data__.items()
+                    if name not in cls.uncached_fields
+                },
+            )
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Saves the instance and invalidates its cache entry."""
+        result = super().save(*args, **kwargs)
+        get_cache().invalidate(self._cache_namespace(), self.get_id())
+        return result
+
+    def delete_instance(self, *args, **kwargs):
+        """Deletes the instance and invalidates its cache entry."""
+        get_cache().invalidate(self._cache_namespace(), self.get_id())
+        return super().delete_instance(*args, **kwargs)
@@ -20,10 +20,30 @@ class Client(BaseModel):
         Collaborator, backref="associated_sales", on_delete="SET NULL"
     )
 
+    @classmethod
+    def select_with_relations(cls):
+        """Selects clients along with their company and collaborator in a single query."""
+        return (
+            cls.select(cls, Company, Collaborator)
+            .join(Company)
+            .switch(cls)
+            .join(Collaborator)
+        )
+
     def save(self, *args, **kwargs):
         """
         Saves the client's information with validation checks.
 
+        Raises:
+            ValueError: If required fields are missing or validation checks fail.
+        """
+        self.validate()
+        super().save(*args, **kwargs)
+
+    def validate(self):
+        """
+        Validates the client's information without saving it.
+
         Raises:
             ValueError: If required fields are missing or validation checks fail.
         """
@@ -44,7 +64,6 @@ class Client(BaseModel):
         self._validate_date()
         self.first_name.capitalize()
         self.name.capitalize()
-        super().save(*args, **kwargs)
 
     def _validate_name(self):
         """
@@ -102,3 +121,6 @@ class Client(BaseModel):
                 raise ValueError(
                     "Erreur : Veuillez entrer une date valide (Exemple : 2023-05-23)"
                 )
+
+
+Client.add_index(Client.collaborator, Client.id, name="client_collaborator_id_id")
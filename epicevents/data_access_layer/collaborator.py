@@ -1,14 +1,12 @@
 import re
 from datetime import datetime, timedelta, timezone
 from peewee import *
-from argon2 import PasswordHasher
-from .database import BaseModel
+from .cache import CachedModel
 from .department import Department
+from . import passwords
 
-ph = PasswordHasher()
 
-
-class Collaborator(BaseModel):
+class Collaborator(CachedModel):
     """Represents a collaborator (user) in the CRM system."""
 
     first_name = CharField(max_length=25)
@@ -17,10 +15,38 @@ class Collaborator(BaseModel):
     password = CharField()
     department = ForeignKeyField(Department, backref="department")
 
+    uncached_fields = ("password",)
+    _password_hash = None
+
+    @classmethod
+    def select_with_relations(cls):
+        """Selects collaborators along with their department in a single query."""
+        return cls.select(cls, Department).join(Department)
+
     def save(self, *args, **kwargs):
         """
         Saves the collaborator's information with validation checks.
 
+        The password is only hashed when a new plain text password has been
+        set, so that saving other changes neither pays for a hash nor hashes
+        the stored hash again.
+
+        Raises:
+            ValueError: If required fields are missing or validation checks fail.
+        """
+        self.validate()
+        if "password" in self._dirty and self.password != self._password_hash:
+            self.password = self._password_hash = passwords.get_password_hasher().hash(
+                self.password
+            )
+        self.first_name.capitalize()
+        self.name.upper()
+        super().save(*args, **kwargs)
+
+    def validate(self):
+        """
+        Validates the collaborator's information without saving it.
+
         Raises:
             ValueError: If required fields are missing or validation checks fail.
         """
@@ -30,10 +56,6 @@ class Collaborator(BaseModel):
             )
         self._validate_name()
         self._validate_email()
-        self.password = ph.hash(self.password)
-        self.first_name.capitalize()
-        self.name.upper()
-        super().save(*args, **kwargs)
 
     def _validate_name(self):
         """
@@ -71,7 +93,7 @@ class Collaborator(BaseModel):
         collaborator_data = {
             "collaborator_id": f"{self.id}",
             "email": f"{self.email}",
-            "department_id": f"{self.department.id}",
+            "department_id": f"{self.department_id}",
             "exp": datetime.now(tz=timezone.utc) + timedelta(hours=1),
         }
 
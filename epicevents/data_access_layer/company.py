@@ -1,9 +1,9 @@
 import re
 from peewee import *
-from .database import BaseModel
+from .cache import CachedModel
 
 
-class Company(BaseModel):
+class Company(CachedModel):
     """Represents a company in the CRM system."""
 
     name = CharField(max_length=50, unique=True)
@@ -18,10 +18,30 @@ class Contract(BaseModel):
     creation_date = DateTimeField(default=datetime.now().date)
     signed = BooleanField(default=False)
 
+    @classmethod
+    def select_with_relations(cls):
+        """Selects contracts along with their client and collaborator in a single query."""
+        return (
+            cls.select(cls, Client, Collaborator)
+            .join(Client)
+            .switch(cls)
+            .join(Collaborator, on=cls.collaborator)
+        )
+
     def save(self, *args, **kwargs):
         """
         Saves the contract's information with validation checks.
 
+        Raises:
+            ValueError: If required fields are missing or validation checks fail.
+        """
+        self.validate()
+        super().save(*args, **kwargs)
+
+    def validate(self):
+        """
+        Validates the contract's information without saving it.
+
         Raises:
             ValueError: If required fields are missing or validation checks fail.
         """
@@ -49,8 +69,6 @@ class Contract(BaseModel):
 
         self._validate_date()
 
-        super().save(*args, **kwargs)
-
     def _validate_date(self):
         """
         Validates the date.
@@ -67,3 +85,13 @@ class Contract(BaseModel):
             raise ValueError(
                 "Erreur : Veuillez entrer une date valide (Exemple : 2023-05-23)"
             )
+
+
+Contract.add_index(
+    Contract.id, name="contract_unsigned_id", where=SQL('"signed" = false')
+)
+Contract.add_index(
+    Contract.id,
+    name="contract_unpaid_id",
+    where=SQL('"amount_due" > 0.0 OR "amount_due" IS NULL'),
+)
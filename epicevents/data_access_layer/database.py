@@ -1,15 +1,190 @@
-import os
-from dotenv import load_dotenv
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from peewee import *
-from playhouse.migrate import PostgresqlMigrator
+from playhouse.pool import PooledPostgresqlExtDatabase
+from playhouse.postgres_ext import PostgresqlExtDatabase
+from epicevents import audit
+from epicevents.settings import get_settings
+from . import row_security, slow_queries
 
-load_dotenv()
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
 
-psql_db = PostgresqlDatabase(DB_NAME, user=DB_USER, password=DB_PASSWORD)
-psql_migrator = PostgresqlMigrator(psql_db)
+settings = get_settings()
+DB_NAME = settings.db_name
+DB_USER = settings.db_user
+DB_PASSWORD = settings.db_password
+DB_POOL = settings.db_pool
+DB_POOL_MAX_CONNECTIONS = settings.db_pool_max_connections
+DB_POOL_STALE_TIMEOUT = settings.db_pool_stale_timeout
+DB_POOL_TIMEOUT = settings.db_pool_timeout
+DB_POOL_HEALTH_CHECK = settings.db_pool_health_check
+DB_RETRIES = settings.db_retries
+DB_RETRY_BACKOFF = settings.db_retry_backoff
+
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+# Commands managing their own connection and transactions, such as migrate,
+# whose CREATE INDEX CONCURRENTLY statements cannot run in a transaction, and
+# the shell, the daemon and the API, which run each command or request in
+# its own transaction.
+UNMANAGED_COMMANDS = ("migrate", "shell", "serve", "serve-api")
+
+
+class RetryMixin:
+    """Retries connections and statements failing with a transient error."""
+
+    def __init__(
+        self, *args, retries=DB_RETRIES, retry_backoff=DB_RETRY_BACKOFF, **kwargs
+    ):
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        super().__init__(*args, **kwargs)
+
+    def _wait_before_retry(self, attempt):
+        """Sleeps with an exponential backoff before the given retry attempt."""
+        time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+    def _connect(self):
+        """Opens a connection, retrying with a backoff on transient errors."""
+        attempt = 0
+        while True:
+            try:
+                return super()._connect()
+            except TRANSIENT_ERRORS:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                self._wait_before_retry(attempt)
+
+    def execute_sql(self, sql, params=None, commit=None):
+        """
+        Executes a statement, reconnecting and retrying on transient errors.
+
+        Statements running inside a transaction are never retried, as the
+        transaction has been lost along with the connection.
+        """
+        attempt = 0
+        while True:
+            try:
+                return super().execute_sql(sql, params, commit)
+            except TRANSIENT_ERRORS:
+                attempt += 1
+                if self.in_transaction() or attempt > self.retries:
+                    raise
+                if not self.is_closed():
+                    self.close()
+                self._wait_before_retry(attempt)
+                self.connect()
+
+
+class ReliablePostgresqlDatabase(RetryMixin, PostgresqlExtDatabase):
+    """A PostgreSQL database retrying on transient errors."""
+
+
+class ReliablePooledPostgresqlDatabase(RetryMixin, PooledPostgresqlExtDatabase):
+    """A pooled PostgreSQL database checking connections before reusing them."""
+
+    def __init__(self, *args, health_check=DB_POOL_HEALTH_CHECK, **kwargs):
+        self.health_check = health_check
+        super().__init__(*args, **kwargs)
+
+    def _is_closed(self, conn):
+        """Checks that a pooled connection is still usable before checking it out."""
+        if super()._is_closed(conn):
+            return True
+
+        if self.health_check:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                return True
+
+        return False
+
+
+def _create_database():
+    """Creates the database selected by the environment configuration."""
+    if DB_POOL:
+        return ReliablePooledPostgresqlDatabase(
+            DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            max_connections=DB_POOL_MAX_CONNECTIONS,
+            stale_timeout=DB_POOL_STALE_TIMEOUT,
+            timeout=DB_POOL_TIMEOUT,
+        )
+
+    return ReliablePostgresqlDatabase(DB_NAME, user=DB_USER, password=DB_PASSWORD)
+
+
+psql_db = _create_database()
+
+
+@lru_cache(maxsize=None)
+def get_migrator():
+    """Returns the schema migrator of the database, imported on first use."""
+    from playhouse.migrate import PostgresqlMigrator
+
+    return PostgresqlMigrator(psql_db)
+
+
+def __getattr__(name):
+    """Creates psql_migrator lazily, as only schema changes need it."""
+    if name == "psql_migrator":
+        return get_migrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@contextmanager
+def command_context(database=None, command=None):
+    """
+    Runs a CLI command inside an explicit connection and transaction.
+
+    The transaction is committed when the command succeeds, including when it
+    ends through a zero exit code, and rolled back otherwise. The connection
+    is released at the end if it was opened here, which returns it to the
+    pool in pooled mode. The slow statements of the command are logged under
+    its name, and its audit events are spooled only once it has committed.
+    """
+    database = database or psql_db
+    row_security.forget()
+    audit.hold()
+    opened = database.connect(reuse_if_open=True)
+    try:
+        with slow_queries.recording(database, command):
+            with database.atomic() as transaction:
+                try:
+                    yield database
+                except SystemExit as exit_request:
+                    if exit_request.code:
+                        transaction.rollback()
+                    else:
+                        transaction.commit()
+                        audit.release()
+                    raise
+        audit.release()
+    finally:
+        audit.discard()
+        if opened:
+            database.close()
+
+
+def commit_progress(database=None):
+    """
+    Commits the work done so far by the running command.
+
+    Long-running commands call it between batches, so that a later failure
+    does not roll back the batches already loaded. A new transaction is begun
+    in place of the committed one, with the collaborator of the row-level
+    security mode set again, and the audit events recorded so far are spooled.
+    """
+    database = database or psql_db
+    if database.in_transaction():
+        database.top_transaction().commit()
+        audit.release()
+        row_security.apply(database)
 
 
 class BaseModel(Model):
@@ -17,4 +192,3 @@ class BaseModel(Model):
 
     class Meta:
         database = psql_db
-        migrator = psql_migrator
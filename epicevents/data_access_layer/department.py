@@ -1,9 +1,9 @@
 import re
 from peewee import *
-from .database import BaseModel
+from .cache import CachedModel
 
 
-class Department(BaseModel):
+class Department(CachedModel):
     """Represents a department in the CRM system."""
 
     name = CharField(max_length=50, unique=True)
@@ -1,6 +1,7 @@
 import re
 from peewee import *
 from .database import BaseModel
+from .client import Client
 from .contract import Contract
 from .collaborator import Collaborator
 
@@ -18,10 +19,31 @@ class Event(BaseModel):
         Collaborator, backref="associated_support", on_delete="SET NULL", null=True
     )
 
+    @classmethod
+    def select_with_relations(cls):
+        """Selects events along with their contract, client and support in a single query."""
+        return (
+            cls.select(cls, Contract, Client, Collaborator)
+            .join(Contract)
+            .join(Client)
+            .switch(cls)
+            .join(Collaborator, JOIN.LEFT_OUTER, on=cls.support)
+        )
+
     def save(self, *args, **kwargs):
         """
         Saves the event's information with validation checks.
 
+        Raises:
+            ValueError: If required fields are missing or validation checks fail.
+        """
+        self.validate()
+        super().save(*args, **kwargs)
+
+    def validate(self):
+        """
+        Validates the event's information without saving it.
+
         Raises:
             ValueError: If required fields are missing or validation checks fail.
         """
@@ -45,8 +67,6 @@ class Event(BaseModel):
 
         self._validate_date()
 
-        super().save(*args, **kwargs)
-
     def _validate_date(self):
         """
         Validates the date.
@@ -70,3 +90,7 @@ class Event(BaseModel):
             raise ValueError(
                 "Erreur : Veuillez entrer une date et une heure valides (Exemple : 2023-02-05 20:30)"
             )
+
+
+Event.add_index(Event.support, Event.id, name="event_support_id_id")
+Event.add_index(Event.id, name="event_unassigned_id", where=SQL('"support_id" IS NULL'))
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from collections import namedtuple
+
+QueryRecord = namedtuple("QueryRecord", ["sql", "params", "duration", "call_site"])
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SKIPPED_MODULES = (
+    "peewee",
+    "playhouse",
+    "epicevents.data_access_layer.database",
+    "epicevents.data_access_layer.pagination",
+)
+
+
+def call_site():
+    """
+    Returns the "file:line (function)" of the code that ran a statement.
+
+    The frames of peewee, of the database classes, of the pagination helpers
+    and of the wrappers installed on execute_sql are skipped, so that the
+    frame of the code asking for the rows is returned.
+    """
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not (
+            module.startswith(SKIPPED_MODULES)
+            or frame.f_code.co_filename == __file__
+            or frame.f_globals.get("_skip_call_site")
+        ):
+            filename = frame.f_code.co_filename
+            if filename.startswith(ROOT):
+                filename = os.path.relpath(filename, ROOT)
+            return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+
+    return "?"
+
+
+class QueryRecorder:
+    """
+    Records the statements run by a database, with their duration and call site.
+
+    While installed, the recorder wraps the execute_sql() method of the
+    database instance, so that it sees the statements of every query,
+    including the lazy loads of foreign keys. The duration covers the
+    execution of the statement, the rows fetched later by a streaming
+    cursor being left out. Listeners are called with each QueryRecord.
+    Statements running faster than threshold seconds are not recorded,
+    which spares them the lookup of their call site.
+    """
+
+    def __init__(self, database, keep=True, listeners=(), threshold=0):
+        self.database = database
+        self.keep = keep
+        self.threshold = threshold
+        self.listeners = [*listeners]
+        self.records = []
+        self._installed = False
+        self._replaced = None
+
+    def install(self):
+        """Starts recording the statements of the database."""
+        execute_sql = self.database.execute_sql
+        self._replaced = self.database.__dict__.get("execute_sql")
+
+        def recorded_execute_sql(sql, params=None, commit=None):
+            start = time.perf_counter()
+            try:
+                return execute_sql(sql, params, commit)
+            finally:
+                duration = time.perf_counter() - start
+                if duration >= self.threshold:
+                    self._record(QueryRecord(sql, params, duration, call_site()))
+
+        self.database.execute_sql = recorded_execute_sql
+        self._installed = True
+        return self
+
+    def uninstall(self):
+        """Stops recording, putting the method of the database back."""
+        if self._installed:
+            if self._replaced is None:
+                del self.database.execute_sql
+            else:
+                self.database.execute_sql = self._replaced
+            self._installed = False
+
+    def _record(self, record):
+        if self.keep:
+            self.records.append(record)
+        for listener in self.listeners:
+            listener(record)
+
+    @property
+    def count(self):
+        """Returns the number of recorded statements."""
+        return len(self.records)
+
+    @property
+    def duration(self):
+        """Returns the total duration in seconds of the recorded statements."""
+        return sum(record.duration for record in self.records)
+
+    def by_call_site(self):
+        """Returns (call site, count, duration) triples, the slowest first."""
+        call_sites = {}
+        for record in self.records:
+            count, duration = call_sites.get(record.call_site, (0, 0))
+            call_sites[record.call_site] = count + 1, duration + record.duration
+        return sorted(
+            ((site, count, duration) for site, (count, duration) in call_sites.items()),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
@@ -0,0 +1,125 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module of this package listed in MIGRATIONS, in the
+order they must be applied, with an upgrade(migrator) function. Applied
+migrations are recorded in the schema_migration table, so that only the new
+ones run. Migrations run outside of any transaction, as CREATE INDEX
+CONCURRENTLY requires, and should therefore be idempotent: a migration
+interrupted halfway is applied again from the start by the next run.
+
+A migration whose effect depends on the settings also provides a
+synchronize(migrator) function, called by every run once the migration is
+applied, so that a changed setting is taken into account by the next run.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from importlib import import_module
+from peewee import CharField, DateTimeField, Model, PostgresqlDatabase
+from epicevents.settings import get_settings
+from ..database import get_migrator
+
+MIGRATIONS = ["m0001_indexes", "m0002_row_level_security"]
+
+settings = get_settings()
+LOCK_TIMEOUT = settings.migration_lock_timeout
+
+# Key of the PostgreSQL advisory lock held while migrations are applied.
+ADVISORY_LOCK_KEY = 5_012_001
+
+
+class MigrationError(Exception):
+    """Raised when the migrations cannot be applied."""
+
+
+class AppliedMigration(Model):
+    """A migration recorded as applied, bound to the migrated database."""
+
+    name = CharField(primary_key=True)
+    applied_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = "schema_migration"
+
+
+@contextmanager
+def _migration_lock(database):
+    """
+    Keeps other migration runs out and limits the wait for table locks.
+
+    On PostgreSQL, a session advisory lock is held for the whole run, and
+    lock_timeout makes a schema change give up, rather than queue every
+    query behind it, when a long transaction holds its table.
+    """
+    if not isinstance(database, PostgresqlDatabase):
+        yield
+        return
+
+    if not database.execute_sql(
+        "SELECT pg_try_advisory_lock(%s)", (ADVISORY_LOCK_KEY,)
+    ).fetchone()[0]:
+        raise MigrationError("Une migration est déjà en cours.")
+
+    database.execute_sql(f"SET lock_timeout = {int(LOCK_TIMEOUT * 1000)}")
+    try:
+        yield
+    finally:
+        database.execute_sql("RESET lock_timeout")
+        database.execute_sql("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+
+
+def status(migrator=None):
+    """Returns (name, applied_at) pairs for every migration, applied_at being None when pending."""
+    database = (migrator or get_migrator()).database
+
+    with database.bind_ctx([AppliedMigration]):
+        database.create_tables([AppliedMigration])
+        applied = {
+            migration.name: migration.applied_at
+            for migration in AppliedMigration.select()
+        }
+
+    return [(name, applied.get(name)) for name in MIGRATIONS]
+
+
+def run(migrator=None, on_applied=None):
+    """
+    Applies the pending migrations in order.
+
+    Each migration is recorded as soon as it succeeds, and on_applied is
+    called with its name. A failing migration stops the run, leaving the
+    following ones pending.
+    """
+    migrator = migrator or get_migrator()
+    database = migrator.database
+    applied = []
+
+    if database.in_transaction():
+        raise MigrationError(
+            "Les migrations ne peuvent pas s'exécuter dans une transaction."
+        )
+
+    opened = database.connect(reuse_if_open=True)
+    try:
+        with _migration_lock(database):
+            for name, applied_at in status(migrator):
+                if applied_at is not None:
+                    continue
+
+                import_module(f"{__name__}.{name}").upgrade(migrator)
+
+                with database.bind_ctx([AppliedMigration]):
+                    AppliedMigration.create(name=name)
+                applied.append(name)
+                if on_applied:
+                    on_applied(name)
+
+            for name in MIGRATIONS:
+                migration = import_module(f"{__name__}.{name}")
+                if hasattr(migration, "synchronize"):
+                    migration.synchronize(migrator)
+    finally:
+        if opened:
+            database.close()
+
+    return applied
@@ -0,0 +1,3 @@
+from epicevents.data_access_layer.migrations import run
+
+run(on_applied=lambda name: print(f"Migration {name} appliquée."))
@@ -0,0 +1,30 @@
+"""
+Adds the indexes of the foreign keys and of the filter commands.
+
+Besides the foreign key indexes declared by the models, it creates:
+
+- client (collaborator_id, id), for the ownership checks and the clients of
+  a sales collaborator read in primary key order;
+- contract (id) WHERE NOT signed, for "contracts filter -ns";
+- contract (id) WHERE amount_due > 0 OR amount_due IS NULL, for
+  "contracts filter -u";
+- event (support_id, id), for "events filter -s" run by a support
+  collaborator;
+- event (id) WHERE support_id IS NULL, for "events filter -s" run by the
+  management.
+"""
+from ..client import Client
+from ..collaborator import Collaborator
+from ..contract import Contract
+from ..event import Event
+from . import operations
+
+MODELS = [Collaborator, Client, Contract, Event]
+
+
+def upgrade(migrator):
+    """Creates the missing indexes, then refreshes the planner statistics."""
+    for model in MODELS:
+        operations.create_model_indexes(migrator, model)
+
+    operations.analyze(migrator, MODELS)
@@ -0,0 +1,118 @@
+"""
+Creates the row-level security policies of the client, contract and event tables.
+
+They enforce the rules of the policy module from the collaborator set on the
+transaction by the row-level security mode (see row_security):
+
+- every authenticated collaborator reads every row;
+- a sales collaborator creates their clients and the events of the signed
+  contracts of their clients, and changes their clients and the contracts
+  of those;
+- the management creates contracts, and changes every contract and event,
+  as well as the clients of a collaborator while the offboarding hands
+  them over to successors, and no other client;
+- a support collaborator changes the events assigned to them.
+
+A connection without collaborator reads and changes nothing. The
+collaborator is read through STABLE functions, evaluated once per
+statement, so that the predicates use the ownership indexes of m0001.
+
+The policies only apply while DB_ROW_LEVEL_SECURITY is enabled: the
+migration creates them, and synchronize(), run by every migrate, enables or
+disables row-level security on the tables to follow the setting. A
+connection of a role subject to the policies must then set the collaborator,
+as the commands and the API do in this mode.
+
+PostgreSQL being the only database with row-level security, the migration
+does nothing on the others.
+"""
+from ..policy import (
+    MANAGEMENT_DEPARTMENT_ID,
+    SALES_DEPARTMENT_ID,
+    SUPPORT_DEPARTMENT_ID,
+)
+from .. import row_security
+from ..row_security import COLLABORATOR_SETTING, DEPARTMENT_SETTING, HANDOVER_SETTING
+from . import operations
+
+FUNCTIONS = {
+    "epicevents_collaborator_id": COLLABORATOR_SETTING,
+    "epicevents_department_id": DEPARTMENT_SETTING,
+    "epicevents_handover_id": HANDOVER_SETTING,
+}
+
+AUTHENTICATED = "epicevents_department_id() IS NOT NULL"
+MANAGEMENT = f"epicevents_department_id() = {MANAGEMENT_DEPARTMENT_ID}"
+SALES = f"epicevents_department_id() = {SALES_DEPARTMENT_ID}"
+SUPPORT = f"epicevents_department_id() = {SUPPORT_DEPARTMENT_ID}"
+OWNED_CLIENTS = (
+    'SELECT "id" FROM "client" WHERE "collaborator_id" = epicevents_collaborator_id()'
+)
+OWNED_SIGNED_CONTRACTS = (
+    f'SELECT "id" FROM "contract" WHERE "signed" AND "client_id" IN ({OWNED_CLIENTS})'
+)
+
+POLICIES = {
+    "client": {
+        "client_read": f"FOR SELECT USING ({AUTHENTICATED})",
+        "client_create": (
+            f'FOR INSERT WITH CHECK ({SALES} AND "collaborator_id" = epicevents_collaborator_id())'
+        ),
+        "client_change": (
+            f'FOR UPDATE USING (({SALES} AND "collaborator_id" = epicevents_collaborator_id()) '
+            f'OR ({MANAGEMENT} AND "collaborator_id" = epicevents_handover_id())) '
+            "WITH CHECK (true)"
+        ),
+    },
+    "contract": {
+        "contract_read": f"FOR SELECT USING ({AUTHENTICATED})",
+        "contract_create": f"FOR INSERT WITH CHECK ({MANAGEMENT})",
+        "contract_change": (
+            f'FOR UPDATE USING ({MANAGEMENT} OR ({SALES} AND "client_id" IN ({OWNED_CLIENTS}))) '
+            "WITH CHECK (true)"
+        ),
+    },
+    "event": {
+        "event_read": f"FOR SELECT USING ({AUTHENTICATED})",
+        "event_create": (
+            f'FOR INSERT WITH CHECK ({SALES} AND "contract_id" IN ({OWNED_SIGNED_CONTRACTS}))'
+        ),
+        "event_change": (
+            f'FOR UPDATE USING ({MANAGEMENT} OR ({SUPPORT} AND "support_id" = epicevents_collaborator_id())) '
+            "WITH CHECK (true)"
+        ),
+    },
+}
+
+
+def _create_function(migrator, name, setting):
+    """Creates the function reading an integer setting of the transaction, NULL when unset."""
+    migrator.database.execute_sql(
+        f"CREATE OR REPLACE FUNCTION {name}() RETURNS integer LANGUAGE sql STABLE "
+        f"AS $$ SELECT NULLIF(current_setting('{setting}', true), '')::integer $$"
+    )
+
+
+def upgrade(migrator):
+    """Creates the functions and policies, which only apply once synchronized."""
+    if not operations.is_postgresql(migrator):
+        return
+
+    for name, setting in FUNCTIONS.items():
+        _create_function(migrator, name, setting)
+
+    for table, policies in POLICIES.items():
+        for name, definition in policies.items():
+            operations.create_policy(migrator, table, name, definition)
+
+
+def synchronize(migrator):
+    """Makes the policies apply when DB_ROW_LEVEL_SECURITY is enabled, and not otherwise."""
+    if not operations.is_postgresql(migrator):
+        return
+
+    for table in POLICIES:
+        if row_security.ENABLED:
+            operations.enable_row_level_security(migrator, table)
+        else:
+            operations.disable_row_level_security(migrator, table)
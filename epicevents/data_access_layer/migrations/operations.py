@@ -0,0 +1,190 @@
+"""
+Schema changes that can run against a large database in use.
+
+The statements avoid holding long locks: indexes are built with CREATE
+INDEX CONCURRENTLY, new columns are filled in small committed batches, and
+constraints are added NOT VALID, then validated without blocking writes.
+"""
+import re
+import time
+from peewee import PostgresqlDatabase
+from epicevents.settings import get_settings
+from . import MigrationError
+
+settings = get_settings()
+BATCH_SIZE = settings.migration_batch_size
+BATCH_PAUSE = settings.migration_batch_pause
+
+
+def is_postgresql(migrator):
+    """Tells whether the migrated database is a PostgreSQL one."""
+    return isinstance(migrator.database, PostgresqlDatabase)
+
+
+def create_index(migrator, index):
+    """
+    Creates an index declared on a model, unless it already exists.
+
+    On PostgreSQL, the index is built concurrently, so that the table stays
+    writable, unless a transaction is open, which CONCURRENTLY forbids. A
+    concurrent build that failed leaves an invalid index behind, which is
+    dropped and built again.
+    """
+    database = migrator.database
+    sql, params = database.get_sql_context().sql(index.safe(True)).query()
+
+    if is_postgresql(migrator) and not database.in_transaction():
+        sql = re.sub(r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", sql)
+        invalid = database.execute_sql(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+            (index._name,),
+        ).fetchone()
+        if invalid and invalid[0]:
+            database.execute_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index._name}"')
+
+    database.execute_sql(sql, params)
+
+
+def create_model_indexes(migrator, model):
+    """Creates the missing indexes declared on a model, foreign key ones included."""
+    for index in model._meta.fields_to_index():
+        create_index(migrator, index)
+
+
+def analyze(migrator, models):
+    """Refreshes the planner statistics of the tables of the models."""
+    for model in models:
+        migrator.database.execute_sql(f'ANALYZE "{model._meta.table_name}"')
+
+
+def backfill(migrator, model, values, where, batch_size=None, pause=None):
+    """
+    Updates the rows matching where with values, a batch at a time.
+
+    Each batch is committed on its own and followed by a pause, so that
+    locks are held briefly and replicas keep up. where must stop matching
+    the rows once updated, so that an interrupted backfill resumes where it
+    stopped. Returns the number of updated rows.
+    """
+    database = migrator.database
+    batch_size = batch_size or BATCH_SIZE
+    pause = BATCH_PAUSE if pause is None else pause
+    primary_key = model._meta.primary_key
+    updated = 0
+    last_id = None
+
+    while True:
+        query = model.select(primary_key).where(where)
+        if last_id is not None:
+            query = query.where(primary_key > last_id)
+        ids = [
+            row[0]
+            for row in query.order_by(primary_key)
+            .limit(batch_size)
+            .tuples()
+            .execute(database)
+        ]
+
+        if not ids:
+            return updated
+
+        with database.atomic():
+            updated += (
+                model.update(values)
+                .where(primary_key.in_(ids), where)
+                .execute(database)
+            )
+
+        last_id = ids[-1]
+        if pause:
+            time.sleep(pause)
+
+
+def _constraint_exists(migrator, table, name):
+    """Tells whether a table of a PostgreSQL database has a constraint."""
+    return (
+        migrator.database.execute_sql(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conname = %s AND conrelid = %s::regclass",
+            (name, table),
+        ).fetchone()
+        is not None
+    )
+
+
+def add_constraint(migrator, table, name, definition):
+    """
+    Adds a CHECK or FOREIGN KEY constraint to a table, unless it exists.
+
+    The constraint is added NOT VALID: only new and updated rows are
+    checked, and the existing ones are left to validate_constraint().
+    """
+    if not is_postgresql(migrator):
+        raise MigrationError(
+            "Les contraintes ne peuvent être ajoutées qu'à PostgreSQL."
+        )
+
+    if not _constraint_exists(migrator, table, name):
+        database = migrator.database
+        database.execute_sql(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition} NOT VALID'
+        )
+
+
+def validate_constraint(migrator, table, name):
+    """
+    Checks the existing rows against a constraint added NOT VALID.
+
+    The validation scans the table while still letting rows be read and
+    written, and does nothing when the constraint is already valid.
+    """
+    if not is_postgresql(migrator):
+        raise MigrationError(
+            "Les contraintes ne peuvent être ajoutées qu'à PostgreSQL."
+        )
+
+    database = migrator.database
+    database.execute_sql(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"')
+
+
+def enable_row_level_security(migrator, table):
+    """
+    Makes the row-level security policies of a table apply.
+
+    They apply to the roles which do not own the table, the owner running
+    the migrations and administration commands unrestricted.
+    """
+    if not is_postgresql(migrator):
+        raise MigrationError(
+            "La sécurité au niveau des lignes n'est disponible qu'avec PostgreSQL."
+        )
+
+    migrator.database.execute_sql(f'ALTER TABLE "{table}" ENABLE ROW LEVEL SECURITY')
+
+
+def disable_row_level_security(migrator, table):
+    """Stops the row-level security policies of a table from applying, keeping them."""
+    if not is_postgresql(migrator):
+        raise MigrationError(
+            "La sécurité au niveau des lignes n'est disponible qu'avec PostgreSQL."
+        )
+
+    migrator.database.execute_sql(f'ALTER TABLE "{table}" DISABLE ROW LEVEL SECURITY')
+
+
+def create_policy(migrator, table, name, definition):
+    """Creates a row-level security policy on a table, unless it exists."""
+    if not is_postgresql(migrator):
+        raise MigrationError(
+            "La sécurité au niveau des lignes n'est disponible qu'avec PostgreSQL."
+        )
+
+    database = migrator.database
+    exists = database.execute_sql(
+        "SELECT 1 FROM pg_policies WHERE tablename = %s AND policyname = %s",
+        (table, name),
+    ).fetchone()
+
+    if exists is None:
+        database.execute_sql(f'CREATE POLICY "{name}" ON "{table}" {definition}')
@@ -0,0 +1,157 @@
+"""
+Hands the portfolio of a departing collaborator over to their successors.
+
+The clients of a sales collaborator and the events of a support
+collaborator are shared among the successors so that their loads end up as
+even as possible. Rows are handed over in primary key order, in one range
+per successor, so that the whole handover takes a few set-based statements
+whatever the size of the portfolio.
+"""
+import heapq
+from peewee import fn
+from . import row_security
+from .client import Client
+from .collaborator import Collaborator
+from .contract import Contract
+from .event import Event
+
+
+class OffboardingReport:
+    """Counts the rows handed over, and the clients or events each successor received."""
+
+    def __init__(self):
+        self.clients = 0
+        self.contracts = 0
+        self.events = 0
+        self.received = {}
+
+
+def has_portfolio(collaborator):
+    """Tells whether clients, contracts or events are still assigned to a collaborator."""
+    return any(
+        query.exists()
+        for query in (
+            Client.select().where(Client.collaborator == collaborator),
+            Contract.select().where(Contract.collaborator == collaborator),
+            Event.select().where(Event.support == collaborator),
+        )
+    )
+
+
+def _loads(field, successors):
+    """Returns the number of rows assigned to each successor through a field."""
+    loads = {successor.id: 0 for successor in successors}
+    query = (
+        field.model.select(field, fn.COUNT(field.model._meta.primary_key))
+        .where(field.in_([*loads]))
+        .group_by(field)
+        .tuples()
+    )
+    loads.update(query)
+    return loads
+
+
+def _quotas(loads, count):
+    """
+    Splits count rows among successors so that their loads end up as even as possible.
+
+    Each row goes to the least loaded successor, the lowest identifier first
+    on a tie.
+    """
+    quotas = dict.fromkeys(loads, 0)
+    heap = [(load, successor_id) for successor_id, load in loads.items()]
+    heapq.heapify(heap)
+
+    for _ in range(count):
+        load, successor_id = heapq.heappop(heap)
+        quotas[successor_id] += 1
+        heapq.heappush(heap, (load + 1, successor_id))
+
+    return quotas
+
+
+def _hand_over(field, collaborator, successors):
+    """
+    Shares the rows assigned to a collaborator through a field among successors.
+
+    Returns the number of rows each successor received.
+    """
+    model = field.model
+    primary_key = model._meta.primary_key
+    assigned = model.select().where(field == collaborator)
+    quotas = _quotas(_loads(field, successors), assigned.count())
+    received = {}
+
+    for successor_id, quota in quotas.items():
+        if not quota:
+            continue
+
+        # The range of the successor ends at its quota-th remaining row.
+        last_id = (
+            assigned.select(primary_key)
+            .order_by(primary_key)
+            .offset(quota - 1)
+            .limit(1)
+            .scalar()
+        )
+        received[successor_id] = (
+            model.update({field: successor_id})
+            .where((field == collaborator) & (primary_key <= last_id))
+            .execute()
+        )
+
+    return received
+
+
+def offboard(collaborator, successors):
+    """
+    Hands the portfolio of a collaborator over to successors, then deletes them.
+
+    The clients are shared among the sales successors and the contracts follow
+    their client, the events are shared among the support successors. Everything
+    happens in one transaction.
+
+    Raises:
+        ValueError: If a successor is the departing collaborator, or does not
+            belong to their department while a portfolio has to be handed over.
+    """
+    report = OffboardingReport()
+    successors = sorted(successors, key=lambda successor: successor.id)
+
+    if any(successor.id == collaborator.id for successor in successors):
+        raise ValueError(
+            "Erreur : Le collaborateur ne peut pas être son propre successeur."
+        )
+
+    with Collaborator._meta.database.atomic():
+        if has_portfolio(collaborator):
+            if not successors or any(
+                successor.department_id != collaborator.department_id
+                for successor in successors
+            ):
+                raise ValueError(
+                    "Erreur : Veuillez choisir des successeurs du même département que le collaborateur."
+                )
+
+            with row_security.handover(collaborator.id, Client._meta.database):
+                clients = _hand_over(Client.collaborator, collaborator, successors)
+            events = _hand_over(Event.support, collaborator, successors)
+            report.clients = sum(clients.values())
+            report.events = sum(events.values())
+            for successor_id, count in [*clients.items(), *events.items()]:
+                report.received[successor_id] = (
+                    report.received.get(successor_id, 0) + count
+                )
+            report.contracts = (
+                Contract.update(
+                    collaborator=Client.select(Client.collaborator).where(
+                        Client.id == Contract.client
+                    )
+                )
+                .where(Contract.collaborator == collaborator)
+                .execute()
+            )
+
+        collaborator.delete_instance()
+
+    return report
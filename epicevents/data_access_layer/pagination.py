@@ -0,0 +1,108 @@
+from peewee import Tuple
+from playhouse.postgres_ext import PostgresqlExtDatabase
+
+STREAM_BATCH_SIZE = 500
+
+
+def paginate(query, order_by=None, after=None, limit=None, descending=False):
+    """
+    Applies a stable ordering and a keyset pagination to a query.
+
+    Rows are ordered by the given field of the queried model, ties being broken
+    by the primary key, and only the rows located after the row identified by
+    ``after`` are kept. Seeking from the position of a row rather than skipping
+    rows with an OFFSET keeps the cost of a page the same wherever it is.
+
+    Args:
+        query: The select query to paginate.
+        order_by: The field of the queried model to order by (primary key by default).
+        after: The primary key of the last row of the previous page.
+        limit: The maximum number of rows of the page.
+        descending: Whether the rows are ordered in descending order.
+    """
+    model = query.model
+    primary_key = model._meta.primary_key
+
+    if order_by is None or order_by.name == primary_key.name:
+        keys = [primary_key]
+    else:
+        keys = [order_by, primary_key]
+
+    if after is not None:
+        if len(keys) == 1:
+            boundary = after
+        else:
+            cursor = model.alias()
+            boundary = cursor.select(
+                *[getattr(cursor, key.name) for key in keys]
+            ).where(getattr(cursor, primary_key.name) == after)
+        position = Tuple(*keys) if len(keys) > 1 else primary_key
+        query = query.where(position < boundary if descending else position > boundary)
+
+    query = query.order_by(*[key.desc() if descending else key.asc() for key in keys])
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+
+def stream(query, batch_size=STREAM_BATCH_SIZE):
+    """
+    Iterates over the rows of a query without loading them all in memory.
+
+    On PostgreSQL, rows are read through a server-side (named) cursor fetching
+    ``batch_size`` rows at a time. Other databases read them lazily from a
+    regular cursor. In both cases, model instances are not cached.
+    """
+    if isinstance(query._database, PostgresqlExtDatabase):
+        yield from _server_side_rows(query, batch_size)
+    else:
+        yield from query.iterator()
+
+
+def _server_side_rows(query, batch_size):
+    """
+    Reads the rows of a query through a named cursor of a PostgreSQL database.
+
+    psycopg2 only keeps the rows of a named cursor on the server, fetching
+    itersize of them per round trip while the cursor is iterated over. The
+    rows are then turned into the row type of the query by its cursor wrapper.
+
+    The query is still run by execute_sql(), the database being made to open
+    a named cursor for it, so that the query recorder, the profiler and the
+    slow query log see it as any other query.
+    """
+    database = query._database
+
+    with database.transaction():
+        cursor = _execute_on_named_cursor(database, batch_size, *query.sql())
+        try:
+            wrapper = query._get_cursor_wrapper(cursor)
+            for row in cursor:
+                if not wrapper.initialized:
+                    wrapper.initialize()
+                    wrapper.initialized = True
+                yield wrapper.process_row(row)
+        finally:
+            cursor.close()
+
+
+def _execute_on_named_cursor(database, batch_size, sql, params):
+    """Runs a statement through execute_sql() on a named cursor of the database."""
+    replaced = database.__dict__.get("cursor")
+    open_cursor = database.cursor
+
+    def named_cursor(commit=None, named_cursor=None):
+        cursor = open_cursor(commit, named_cursor=True)
+        cursor.itersize = batch_size
+        return cursor
+
+    database.cursor = named_cursor
+    try:
+        return database.execute_sql(sql, params)
+    finally:
+        if replaced is None:
+            del database.cursor
+        else:
+            database.cursor = replaced
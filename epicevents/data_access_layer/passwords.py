@@ -0,0 +1,61 @@
+import time
+from functools import lru_cache
+from epicevents.settings import get_settings
+
+settings = get_settings()
+ARGON2_TIME_COST = settings.argon2_time_cost
+ARGON2_MEMORY_COST = settings.argon2_memory_cost
+ARGON2_PARALLELISM = settings.argon2_parallelism
+
+CALIBRATION_PASSWORD = "calibration-password"
+CALIBRATION_SAMPLES = 3
+MAX_TIME_COST = 20
+
+
+def create_password_hasher(time_cost=None, memory_cost=None, parallelism=None):
+    """Creates an argon2 password hasher with the configured parameters."""
+    from argon2 import PasswordHasher
+
+    return PasswordHasher(
+        time_cost=time_cost or ARGON2_TIME_COST,
+        memory_cost=memory_cost or ARGON2_MEMORY_COST,
+        parallelism=parallelism or ARGON2_PARALLELISM,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_password_hasher():
+    """
+    Returns the password hasher of the software.
+
+    argon2 is only imported by the commands hashing or verifying a password.
+    """
+    return create_password_hasher()
+
+
+def measure_hash_duration(hasher, samples=CALIBRATION_SAMPLES):
+    """Returns the average duration in seconds of a password hash."""
+    start = time.perf_counter()
+    for _ in range(samples):
+        hasher.hash(CALIBRATION_PASSWORD)
+    return (time.perf_counter() - start) / samples
+
+
+def calibrate(target_duration, memory_cost=None, parallelism=None):
+    """
+    Finds the smallest argon2 time cost reaching a target hash duration.
+
+    The memory cost and the parallelism are kept, and the number of passes
+    is increased until hashing a password takes at least target_duration
+    seconds on this machine, or MAX_TIME_COST is reached.
+
+    Returns:
+        The calibrated hasher and its measured hash duration in seconds.
+    """
+    for time_cost in range(1, MAX_TIME_COST + 1):
+        hasher = create_password_hasher(time_cost, memory_cost, parallelism)
+        duration = measure_hash_duration(hasher)
+        if duration >= target_duration:
+            break
+
+    return hasher, duration
@@ -0,0 +1,87 @@
+"""
+Compiles the access rules of the CRM into query conditions.
+
+Every collaborator may read every row. Management may change every contract
+and event, a sales collaborator the clients they follow and the contracts of
+those clients, a support collaborator the events assigned to them. Turning
+these rules into WHERE clauses lets the database check ownership within the
+indexed query which fetches or updates the rows, instead of loading each row
+and its owner to compare them in Python.
+"""
+from .client import Client
+from .contract import Contract
+from .event import Event
+
+MANAGEMENT_DEPARTMENT_ID = 1
+SALES_DEPARTMENT_ID = 2
+SUPPORT_DEPARTMENT_ID = 3
+
+UNRESTRICTED_MODELS = {MANAGEMENT_DEPARTMENT_ID: (Contract, Event)}
+
+
+class Principal:
+    """The collaborator on whose behalf queries run, as authenticated by their token."""
+
+    def __init__(self, collaborator_id, department_id):
+        self.collaborator_id = int(collaborator_id)
+        self.department_id = int(department_id)
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Builds the principal from the payload of a verified token."""
+        return cls(payload["collaborator_id"], payload["department_id"])
+
+
+def owned(model, principal):
+    """
+    Returns the condition matching the rows of a model owned by a principal.
+
+    Returns None when the principal cannot own any row of the model.
+    """
+    if principal.department_id == SALES_DEPARTMENT_ID:
+        if model is Client:
+            return Client.collaborator == principal.collaborator_id
+        if model is Contract:
+            return Contract.client.in_(
+                Client.select(Client.id).where(owned(Client, principal))
+            )
+
+    if principal.department_id == SUPPORT_DEPARTMENT_ID and model is Event:
+        return Event.support == principal.collaborator_id
+
+    return None
+
+
+def editable(model, principal):
+    """
+    Returns the condition matching the rows of a model a principal may change.
+
+    Returns None when the principal may change every row.
+
+    Raises:
+        PermissionError: If the principal may not change any row of the model.
+    """
+    if model in UNRESTRICTED_MODELS.get(principal.department_id, ()):
+        return None
+
+    condition = owned(model, principal)
+    if condition is None:
+        raise PermissionError("Action restreinte.")
+    return condition
+
+
+def get_editable(model, pk, principal):
+    """
+    Fetches a row a principal may change, identifier and ownership being
+    checked by the same query.
+
+    Returns None when the row does not exist or belongs to someone else.
+
+    Raises:
+        PermissionError: If the principal may not change any row of the model.
+    """
+    query = model.select().where(model._meta.primary_key == pk)
+    condition = editable(model, principal)
+    if condition is not None:
+        query = query.where(condition)
+    return query.get_or_none()
@@ -0,0 +1,93 @@
+"""
+Row-level security mode of PostgreSQL.
+
+When DB_ROW_LEVEL_SECURITY is enabled, the collaborator authenticated by the
+token of a command is handed to PostgreSQL as two settings of the running
+transaction, epicevents.collaborator_id and epicevents.department_id. The
+policies created by the m0002_row_level_security migration read them to
+enforce on the client, contract and event tables the rules of the policy
+module, so that every connection made with a role subject to the policies,
+reporting tools included, gets the same scoping. The HTTP API sets the
+collaborator of each request the same way.
+
+The management may only change the clients of a collaborator while they are
+handed over to successors on their departure, which the offboarding sets
+with a third setting, epicevents.handover_id.
+
+The settings are local to the transaction: they vanish on commit or
+rollback, so that a pooled connection never carries a collaborator over to
+another command, and are set again when a command commits its progress.
+"""
+from contextlib import contextmanager
+from peewee import PostgresqlDatabase
+from epicevents.settings import get_settings
+
+settings = get_settings()
+ENABLED = settings.db_row_level_security
+
+COLLABORATOR_SETTING = "epicevents.collaborator_id"
+DEPARTMENT_SETTING = "epicevents.department_id"
+HANDOVER_SETTING = "epicevents.handover_id"
+
+# Sets the collaborator and their department on the running transaction.
+SET_PRINCIPAL_SQL = "SELECT set_config(%s, %s, true), set_config(%s, %s, true)"
+
+# Collaborator on whose behalf the running command queries the database.
+context = {"principal": None}
+
+
+def principal_parameters(principal):
+    """Returns the parameters of SET_PRINCIPAL_SQL for a principal."""
+    return (
+        COLLABORATOR_SETTING,
+        str(principal.collaborator_id),
+        DEPARTMENT_SETTING,
+        str(principal.department_id),
+    )
+
+
+def apply(database):
+    """Sets the collaborator of the running command on the transaction of a database."""
+    principal = context["principal"]
+
+    if not ENABLED or principal is None:
+        return
+    if not isinstance(database, PostgresqlDatabase):
+        return
+
+    database.execute_sql(SET_PRINCIPAL_SQL, principal_parameters(principal))
+
+
+def identify(payload, database=None):
+    """Records the collaborator authenticated by a token payload and hands it to PostgreSQL."""
+    if not ENABLED:
+        return
+
+    # Imported here, as the models imported by policy need the database module.
+    from .database import psql_db
+    from .policy import Principal
+
+    context["principal"] = Principal.from_payload(payload)
+    apply(database or psql_db)
+
+
+def forget():
+    """Forgets the collaborator of the previous command."""
+    context["principal"] = None
+
+
+@contextmanager
+def handover(collaborator_id, database):
+    """Lets the management change the clients of a departing collaborator within the block."""
+    active = ENABLED and isinstance(database, PostgresqlDatabase)
+
+    if active:
+        database.execute_sql(
+            "SELECT set_config(%s, %s, true)", (HANDOVER_SETTING, str(collaborator_id))
+        )
+
+    yield
+
+    # On failure, the transaction is rolled back along with the setting.
+    if active:
+        database.execute_sql("SELECT set_config(%s, '', true)", (HANDOVER_SETTING,))
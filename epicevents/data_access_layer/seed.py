@@ -0,0 +1,354 @@
+"""
+Generates a large synthetic dataset, so that performance problems can be
+reproduced on a local database.
+
+The data follows the rules of the software and the skews of a real
+activity: a few sales collaborators own most clients, a few companies gather
+most of them, many contracts are unsigned or unpaid, only signed contracts
+have events, and events cluster around the busy seasons of the year. The
+same random seed on the same database always generates the same rows.
+"""
+import random
+import secrets
+import unicodedata
+from datetime import datetime, timedelta
+from itertools import accumulate
+from peewee import PostgresqlDatabase, fn
+from . import passwords
+from .bulk import load_rows
+from .database import commit_progress
+from .client import Client
+from .collaborator import Collaborator
+from .company import Company
+from .contract import Contract
+from .department import Department
+from .event import Event
+
+BATCH_SIZE = 1000
+RANDOM_SEED = 12
+REFERENCE_DATE = datetime(2024, 1, 1)
+HISTORY_DAYS = 3 * 365
+
+# Rows generated for each unit of scale.
+COLLABORATORS_PER_SCALE = {"Management": 1, "Sales": 4, "Support": 5}
+COMPANIES_PER_SCALE = 50
+CLIENTS_PER_SCALE = 1000
+
+CONTRACTS_PER_CLIENT = (1, 2, 3, 4, 6)
+CONTRACTS_PER_CLIENT_WEIGHTS = (35, 30, 20, 10, 5)
+SIGNED_RATE = 0.55
+PAID_RATE = 0.5
+EVENT_RATE = 0.7
+UNASSIGNED_EVENT_RATE = 0.1
+# Exponent of the Zipf-like distribution of clients among owners.
+SKEW = 1.2
+# (month, day, weight) of the busy seasons around which events cluster.
+EVENT_SEASONS = ((6, 20, 5), (9, 25, 3), (12, 12, 4), (3, 15, 1))
+EVENT_SEASON_SPREAD_DAYS = 12
+
+FIRST_NAMES = (
+    "Alain", "Amélie", "Antoine", "Camille", "Chloé", "Élodie", "Emma", "Hugo",
+    "Inès", "Jules", "Léa", "Louis", "Lucas", "Manon", "Nathan", "Noémie",
+    "Paul", "Sarah", "Théo", "Zoé",
+)  # fmt: skip
+NAMES = (
+    "Bernard", "Bonnet", "Dubois", "Durand", "Fontaine", "François", "Garnier",
+    "Girard", "Lambert", "Laurent", "Lefèvre", "Leroy", "Martin", "Mercier",
+    "Moreau", "Petit", "Richard", "Robert", "Rousseau", "Thomas",
+)  # fmt: skip
+COMPANY_WORDS = (
+    "Atelier", "Agence", "Groupe", "Studio", "Maison", "Compagnie", "Réseau",
+    "Collectif",
+)  # fmt: skip
+LOCATIONS = (
+    "Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes", "Toulouse",
+    "Strasbourg", "Nice", "Rennes",
+)  # fmt: skip
+
+
+COLLABORATOR_FIELDS = [
+    Collaborator.id,
+    Collaborator.first_name,
+    Collaborator.name,
+    Collaborator.email,
+    Collaborator.password,
+    Collaborator.department,
+]
+COMPANY_FIELDS = [Company.id, Company.name]
+CLIENT_FIELDS = [
+    Client.id,
+    Client.first_name,
+    Client.name,
+    Client.email,
+    Client.phone,
+    Client.company,
+    Client.creation_date,
+    Client.collaborator,
+]
+CONTRACT_FIELDS = [
+    Contract.id,
+    Contract.client,
+    Contract.collaborator,
+    Contract.total_sum,
+    Contract.amount_due,
+    Contract.creation_date,
+    Contract.signed,
+]
+EVENT_FIELDS = [
+    Event.id,
+    Event.contract,
+    Event.start_date,
+    Event.end_date,
+    Event.location,
+    Event.attendees,
+    Event.support,
+]
+
+
+class SeedReport:
+    """Counts the rows generated by a seed run."""
+
+    def __init__(self, total_clients=0):
+        self.total_clients = total_clients
+        self.collaborators = 0
+        self.companies = 0
+        self.clients = 0
+        self.contracts = 0
+        self.events = 0
+
+
+def _count(scale, per_scale):
+    """Returns the number of rows of a kind for a scale, at least one."""
+    return max(1, round(per_scale * scale))
+
+
+def _next_id(model):
+    """Returns the first primary key following the rows of a table."""
+    return (model.select(fn.MAX(model._meta.primary_key)).scalar() or 0) + 1
+
+
+def _ascii(text):
+    """Removes the accents of a text, for use in an email address."""
+    return (
+        unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    )
+
+
+def _email(first_name, name, number, domain):
+    """Builds a unique email address from a name and a row number."""
+    return f"{_ascii(first_name)}.{_ascii(name)}.{number}@{domain}"
+
+
+class _SkewedChoice:
+    """Draws identifiers with a Zipf-like skew, the first ones being the most drawn."""
+
+    def __init__(self, rng, ids):
+        self.rng = rng
+        self.ids = [*ids]
+        rng.shuffle(self.ids)
+        self.cum_weights = [
+            *accumulate(1 / rank**SKEW for rank in range(1, len(self.ids) + 1))
+        ]
+
+    def __call__(self):
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights)[0]
+
+
+def _reset_sequences(database, models):
+    """Moves the PostgreSQL sequences after the primary keys given explicitly."""
+    if isinstance(database, PostgresqlDatabase):
+        for model in models:
+            table = model._meta.table_name
+            column = model._meta.primary_key.column_name
+            database.execute_sql(
+                f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{column}'), "
+                f'(SELECT MAX("{column}") FROM "{table}"))'
+            )
+
+
+class Seeder:
+    """
+    Generates collaborators, companies, clients, contracts and events.
+
+    Rows are built in memory one batch of clients at a time, with their
+    contracts and events, and loaded with the bulk loader of the imports:
+    a COPY on PostgreSQL, multi-row INSERT statements otherwise. Each batch
+    is committed, so that memory stays flat whatever the scale. Primary keys
+    are given explicitly, following the existing rows, so that the
+    references between the generated rows are known without reading them
+    back.
+    """
+
+    def __init__(self, scale=1, random_seed=RANDOM_SEED, password=None):
+        self.scale = scale
+        self.rng = random.Random(random_seed)
+        self.password = password
+
+    def run(self, batch_size=BATCH_SIZE, on_progress=None):
+        """Generates the dataset and returns a SeedReport."""
+        database = Client._meta.database
+        report = SeedReport(_count(self.scale, CLIENTS_PER_SCALE))
+
+        departments = {
+            name: Department.get_or_create(name=name)[0].id
+            for name in COLLABORATORS_PER_SCALE
+        }
+        collaborators = self._collaborators(departments, report)
+        company_choice = _SkewedChoice(self.rng, self._companies(report))
+        sales_choice = _SkewedChoice(self.rng, collaborators["Sales"])
+        support_choice = _SkewedChoice(self.rng, collaborators["Support"])
+        commit_progress(database)
+
+        next_client_id = _next_id(Client)
+        contract_id = _next_id(Contract)
+        event_id = _next_id(Event)
+
+        while report.clients < report.total_clients:
+            size = min(batch_size, report.total_clients - report.clients)
+            clients, contracts, events = [], [], []
+
+            for client_id in range(next_client_id, next_client_id + size):
+                client = self._client(client_id, company_choice(), sales_choice())
+                clients.append(client)
+
+                for _ in range(self._contract_count()):
+                    contract = self._contract(contract_id, client)
+                    contracts.append(contract)
+                    contract_id += 1
+
+                    if contract[-1] and self.rng.random() < EVENT_RATE:
+                        events.append(self._event(event_id, contract, support_choice))
+                        event_id += 1
+
+            next_client_id += size
+            load_rows(Client, CLIENT_FIELDS, clients)
+            load_rows(Contract, CONTRACT_FIELDS, contracts)
+            load_rows(Event, EVENT_FIELDS, events)
+            commit_progress(database)
+
+            report.clients += len(clients)
+            report.contracts += len(contracts)
+            report.events += len(events)
+            if on_progress:
+                on_progress(report)
+
+        models = [Collaborator, Company, Client, Contract, Event]
+        _reset_sequences(database, models)
+        for model in models:
+            database.execute_sql(f'ANALYZE "{model._meta.table_name}"')
+
+        return report
+
+    def _collaborators(self, departments, report):
+        """Loads the collaborators and returns their identifiers per department."""
+        password = passwords.get_password_hasher().hash(
+            self.password or secrets.token_urlsafe()
+        )
+        next_id = _next_id(Collaborator)
+        rows = []
+        ids = {}
+
+        for department, per_scale in COLLABORATORS_PER_SCALE.items():
+            ids[department] = range(next_id, next_id + _count(self.scale, per_scale))
+            for collaborator_id in ids[department]:
+                first_name = self.rng.choice(FIRST_NAMES)
+                name = self.rng.choice(NAMES)
+                rows.append(
+                    [
+                        collaborator_id,
+                        first_name,
+                        name,
+                        _email(first_name, name, collaborator_id, "epicevents.fr"),
+                        password,
+                        departments[department],
+                    ]
+                )
+            next_id += len(ids[department])
+
+        load_rows(Collaborator, COLLABORATOR_FIELDS, rows)
+        report.collaborators = len(rows)
+        return ids
+
+    def _companies(self, report):
+        """Loads the companies and returns their identifiers."""
+        next_id = _next_id(Company)
+        ids = range(next_id, next_id + _count(self.scale, COMPANIES_PER_SCALE))
+        load_rows(
+            Company,
+            COMPANY_FIELDS,
+            [
+                [company_id, f"{self.rng.choice(COMPANY_WORDS)}-{company_id}"]
+                for company_id in ids
+            ],
+        )
+        report.companies = len(ids)
+        return ids
+
+    def _client(self, client_id, company_id, collaborator_id):
+        """Builds the row of a client created during the covered history."""
+        first_name = self.rng.choice(FIRST_NAMES)
+        name = self.rng.choice(NAMES)
+        creation_date = REFERENCE_DATE - timedelta(
+            days=self.rng.randrange(HISTORY_DAYS)
+        )
+        return [
+            client_id,
+            first_name,
+            name,
+            _email(first_name, name, client_id, "client.fr"),
+            f"0{600000000 + client_id}",
+            company_id,
+            creation_date,
+            collaborator_id,
+        ]
+
+    def _contract_count(self):
+        """Draws the number of contracts of a client."""
+        return self.rng.choices(
+            CONTRACTS_PER_CLIENT, weights=CONTRACTS_PER_CLIENT_WEIGHTS
+        )[0]
+
+    def _contract(self, contract_id, client):
+        """Builds the row of a contract of a client, signed or not, paid or not."""
+        client_id, creation_date, collaborator_id = client[0], client[6], client[7]
+        total_sum = round(self.rng.lognormvariate(9, 0.8), 2)
+        signed = self.rng.random() < SIGNED_RATE
+
+        if not signed:
+            amount_due = total_sum
+        elif self.rng.random() < PAID_RATE:
+            amount_due = 0
+        else:
+            amount_due = round(total_sum * self.rng.random(), 2)
+
+        return [
+            contract_id,
+            client_id,
+            collaborator_id,
+            total_sum,
+            amount_due,
+            creation_date + timedelta(days=self.rng.randrange(365)),
+            signed,
+        ]
+
+    def _event(self, event_id, contract, support_choice):
+        """Builds the row of an event of a signed contract, during a busy season."""
+        month, day, _ = self.rng.choices(
+            EVENT_SEASONS, weights=[season[2] for season in EVENT_SEASONS]
+        )[0]
+        contract_date = contract[5]
+        start_date = datetime(
+            contract_date.year, month, day, self.rng.randrange(9, 21)
+        ) + timedelta(days=round(self.rng.gauss(0, EVENT_SEASON_SPREAD_DAYS)))
+        if start_date <= contract_date:
+            start_date += timedelta(days=365)
+
+        return [
+            event_id,
+            contract[0],
+            start_date,
+            start_date + timedelta(hours=self.rng.randrange(2, 72)),
+            self.rng.choice(LOCATIONS),
+            min(5000, round(self.rng.paretovariate(1.5) * 20)),
+            None if self.rng.random() < UNASSIGNED_EVENT_RATE else support_choice(),
+        ]
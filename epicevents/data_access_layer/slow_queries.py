@@ -0,0 +1,180 @@
+import re
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from epicevents.settings import get_settings
+from .instrumentation import QueryRecorder
+
+settings = get_settings()
+THRESHOLD = settings.slow_query_threshold
+LOG_PATH = settings.slow_query_log_path
+MAX_ENTRIES = settings.slow_query_log_max_entries
+
+LOCK_TIMEOUT = 1
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+# Command and collaborator of the statements being recorded.
+context = {"command": None, "collaborator_id": None}
+
+
+def normalize(sql):
+    """
+    Reduces a statement to its shape, so that its runs can be grouped.
+
+    Literals are replaced with placeholders, lists of placeholders, such as
+    those of IN clauses, are collapsed and whitespace is squeezed.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql).replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(?, ...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def params_shape(params):
+    """Describes the types of the parameters of a statement, without their values."""
+    shape = []
+    for param in params or ():
+        name = type(param).__name__
+        if shape and shape[-1][0] == name:
+            shape[-1][1] += 1
+        else:
+            shape.append([name, 1])
+    return ", ".join(f"{name}×{count}" if count > 1 else name for name, count in shape)
+
+
+def _percentile(durations, percentile):
+    """Returns the nearest-rank percentile of durations."""
+    durations = sorted(durations)
+    return durations[max(0, -(-len(durations) * percentile // 100) - 1)]
+
+
+class SlowQueryLog:
+    """
+    Keeps the statements slower than the threshold in a local SQLite file.
+
+    Only the shape of the statements and of their parameters is kept, never
+    the parameter values. The log is bounded: once it holds max_entries
+    entries, the oldest ones are dropped as new ones come.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self.path = path or LOG_PATH
+        self.max_entries = max_entries or MAX_ENTRIES
+
+    def _connect(self):
+        """Opens the log, creating its table on first use."""
+        connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS slow_query ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "recorded_at REAL NOT NULL, "
+            "sql TEXT NOT NULL, "
+            "params_shape TEXT NOT NULL, "
+            "duration REAL NOT NULL, "
+            "command TEXT, "
+            "collaborator_id INTEGER, "
+            "call_site TEXT NOT NULL)"
+        )
+        return connection
+
+    def append(self, record, command=None, collaborator_id=None):
+        """Adds a recorded statement to the log, dropping the oldest entries beyond the bound."""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO slow_query (recorded_at, sql, params_shape, duration, "
+                "command, collaborator_id, call_site) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    normalize(record.sql),
+                    params_shape(record.params),
+                    record.duration,
+                    command,
+                    collaborator_id,
+                    record.call_site,
+                ),
+            )
+            connection.execute(
+                "DELETE FROM slow_query WHERE id <= ?",
+                (cursor.lastrowid - self.max_entries,),
+            )
+
+    def entries(self, command=None):
+        """Returns (sql, command, call_site, duration) rows, of a command if given."""
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT sql, command, call_site, duration FROM slow_query "
+                "WHERE ? IS NULL OR command = ?",
+                (command, command),
+            ).fetchall()
+
+    def report(self, order_by="total", limit=10, command=None):
+        """
+        Groups the logged statements by shape, command and call site.
+
+        Returns dictionaries holding the count, total, p95 and max durations
+        in seconds of each group, the limit groups with the largest total or
+        p95 duration first.
+        """
+        groups = {}
+        for sql, logged_command, call_site, duration in self.entries(command):
+            groups.setdefault((sql, logged_command, call_site), []).append(duration)
+
+        rows = [
+            {
+                "sql": sql,
+                "command": logged_command,
+                "call_site": call_site,
+                "count": len(durations),
+                "total": sum(durations),
+                "p95": _percentile(durations, 95),
+                "max": max(durations),
+            }
+            for (sql, logged_command, call_site), durations in groups.items()
+        ]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def clear(self):
+        """Empties the log."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM slow_query")
+
+
+def identify(collaborator_id):
+    """Attributes the statements recorded from now on to a collaborator."""
+    context["collaborator_id"] = collaborator_id
+
+
+def _log(record):
+    """Logs a slow statement, a failure to write the log being ignored."""
+    try:
+        SlowQueryLog().append(record, context["command"], context["collaborator_id"])
+    except sqlite3.Error:
+        pass
+
+
+@contextmanager
+def recording(database, command=None):
+    """
+    Logs the statements of a command slower than THRESHOLD seconds.
+
+    Nothing is recorded when the threshold is zero or negative.
+    """
+    if THRESHOLD <= 0:
+        yield
+        return
+
+    context.update(command=command, collaborator_id=None)
+    recorder = QueryRecorder(
+        database, keep=False, listeners=[_log], threshold=THRESHOLD
+    )
+    recorder.install()
+    try:
+        yield
+    finally:
+        recorder.uninstall()
+        context.update(command=None, collaborator_id=None)
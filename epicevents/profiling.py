@@ -0,0 +1,197 @@
+import os
+import time
+
+# Options of the root command, with the number of values each takes.
+GLOBAL_OPTIONS = {"--profile": 0, "--profile-dump": 1}
+TOP_CALL_SITES = 5
+TOP_ALLOCATIONS = 25
+
+# Frames of this module are skipped when looking for the call site of a query.
+_skip_call_site = True
+
+
+def command_args(args):
+    """Returns the arguments following the global options, the command name first."""
+    index = 0
+    while index < len(args) and args[index].split("=")[0] in GLOBAL_OPTIONS:
+        option = args[index]
+        index += 1 if "=" in option else 1 + GLOBAL_OPTIONS[option]
+    return args[index:]
+
+
+def command_name(args):
+    """Returns the name of the invoked command, such as "clients list"."""
+    names = [arg for arg in command_args(args)[:2] if not arg.startswith("-")]
+    return " ".join(names)
+
+
+class PhaseTimer:
+    """
+    Times the phases of a command by wrapping the functions running them.
+
+    Each phase is timed exclusively: the time spent in a nested phase, such
+    as the queries run while rendering a table, only counts for the nested
+    phase.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self._stack = []
+        self._patches = []
+
+    def wrap(self, owner, name, phase):
+        """Times the calls to owner.name as the given phase until restore()."""
+        function = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit()
+
+        self._patches.append((owner, name, owner.__dict__.get(name)))
+        setattr(owner, name, timed)
+
+    def _enter(self, phase):
+        now = time.perf_counter()
+        if self._stack:
+            outer_phase, started = self._stack[-1]
+            self.durations[outer_phase] = self.durations.get(outer_phase, 0) + (
+                now - started
+            )
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        self._stack.append((phase, now))
+
+    def _exit(self):
+        now = time.perf_counter()
+        phase, started = self._stack.pop()
+        self.durations[phase] = self.durations.get(phase, 0) + (now - started)
+        if self._stack:
+            self._stack[-1] = (self._stack[-1][0], now)
+
+    def reset(self):
+        """Forgets the durations and counts measured so far."""
+        self.durations = {}
+        self.counts = {}
+
+    def restore(self):
+        """Puts the wrapped functions back."""
+        for owner, name, original in reversed(self._patches):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patches = []
+
+
+class Profiler:
+    """
+    Profiles a command run by the CLI.
+
+    It counts and times the SQL statements along with their call sites, and
+    times the authentication and the rendering of the results, the rest
+    being Python time. The peak memory is traced with tracemalloc, which
+    slows the Python code down. When a dump directory is given, a cProfile
+    of the command and its largest allocations are also written there.
+    """
+
+    def __init__(self, dump_directory=None):
+        self.dump_directory = dump_directory
+        self.timer = PhaseTimer()
+        self.recorder = None
+        self.profile = None
+        self.total = 0
+        self.peak = 0
+
+    def __enter__(self):
+        import tracemalloc
+        from argon2 import PasswordHasher
+        from epicevents.cli import collaborator as clicollaborator
+        from epicevents.cli import listing
+        from epicevents.data_access_layer import database
+        from epicevents.data_access_layer.instrumentation import QueryRecorder
+
+        self.recorder = QueryRecorder(database.psql_db).install()
+        self.timer.wrap(database.psql_db, "execute_sql", "db")
+        self.timer.wrap(clicollaborator, "_verify_token", "auth")
+        self.timer.wrap(PasswordHasher, "verify", "auth")
+        self.timer.wrap(PasswordHasher, "hash", "auth")
+        self.timer.wrap(listing, "print_table", "render")
+        self.timer.wrap(listing, "write_rows", "render")
+
+        if self.dump_directory:
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        import tracemalloc
+
+        self.total = time.perf_counter() - self._start
+        self.peak = tracemalloc.get_traced_memory()[1]
+
+        if self.profile is not None:
+            self.profile.disable()
+            self._dump(tracemalloc.take_snapshot())
+
+        if self._tracing:
+            tracemalloc.stop()
+
+        self.timer.restore()
+        self.recorder.uninstall()
+
+    def _dump(self, snapshot):
+        """Writes the cProfile statistics and the largest allocations."""
+        os.makedirs(self.dump_directory, exist_ok=True)
+        self.profile.dump_stats(os.path.join(self.dump_directory, "profile.pstats"))
+
+        with open(
+            os.path.join(self.dump_directory, "tracemalloc.txt"), "w", encoding="utf-8"
+        ) as file:
+            for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                file.write(f"{statistic}\n")
+
+    def summary(self):
+        """Returns the lines of the profile summary."""
+        durations = self.timer.durations
+        python_time = self.total - sum(durations.values())
+        lines = [
+            "Profil de la commande :",
+            f"  Durée totale : {self.total * 1000:.1f} ms",
+            f"  Requêtes SQL : {self.recorder.count} ({durations.get('db', 0) * 1000:.1f} ms)",
+            f"  Authentification : {durations.get('auth', 0) * 1000:.1f} ms",
+            f"  Affichage : {durations.get('render', 0) * 1000:.1f} ms",
+            f"  Python : {python_time * 1000:.1f} ms",
+            f"  Pic de mémoire : {self.peak / 1024:.0f} Kio",
+        ]
+
+        call_sites = self.recorder.by_call_site()[:TOP_CALL_SITES]
+        if call_sites:
+            lines.append("  Requêtes par origine :")
+            lines.extend(
+                f"    {count} × {duration * 1000:.1f} ms  {site}"
+                for site, count, duration in call_sites
+            )
+
+        if self.dump_directory:
+            lines.append(f"  Profils détaillés écrits dans {self.dump_directory}")
+
+        return lines
+
+    def print_summary(self):
+        """Prints the profile summary on the error output."""
+        from rich.console import Console
+
+        Console(stderr=True, highlight=False).print(
+            "\n".join(self.summary()), soft_wrap=True
+        )
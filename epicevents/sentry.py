@@ -1,9 +1,27 @@
-import sentry_sdk
-import os
-from dotenv import load_dotenv
+from epicevents.settings import get_settings
 
-load_dotenv()
 
-DSN = os.getenv("DSN")
+class LazySentry:
+    """
+    Stands for the sentry_sdk module, imported and initialised on first use.
 
-sentry_sdk.init(dsn=DSN)
+    Commands that never report anything to Sentry do not pay for importing
+    and initialising the SDK.
+    """
+
+    _sdk = None
+
+    def _load(self):
+        """Imports and initialises the Sentry SDK once."""
+        if LazySentry._sdk is None:
+            import sentry_sdk
+
+            sentry_sdk.init(dsn=get_settings().dsn)
+            LazySentry._sdk = sentry_sdk
+        return LazySentry._sdk
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+
+sentry_sdk = LazySentry()
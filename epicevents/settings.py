@@ -0,0 +1,76 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+
+def _getenv_bool(name, default="False"):
+    """Reads a boolean environment variable."""
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def _getenv_int(name, default):
+    """Reads an integer environment variable."""
+    return int(os.getenv(name) or default)
+
+
+def _getenv_float(name, default):
+    """Reads a decimal environment variable."""
+    return float(os.getenv(name) or default)
+
+
+class Settings:
+    """Holds the configuration read from the environment and the .env file."""
+
+    def __init__(self):
+        self.dotenv_loaded = load_dotenv()
+
+        self.db_name = os.getenv("DB_NAME")
+        self.db_user = os.getenv("DB_USER")
+        self.db_password = os.getenv("DB_PASSWORD")
+        self.db_pool = _getenv_bool("DB_POOL")
+        self.db_pool_max_connections = _getenv_int("DB_POOL_MAX_CONNECTIONS", 8)
+        self.db_pool_stale_timeout = _getenv_int("DB_POOL_STALE_TIMEOUT", 300)
+        self.db_pool_timeout = _getenv_int("DB_POOL_TIMEOUT", 10)
+        self.db_pool_health_check = _getenv_bool("DB_POOL_HEALTH_CHECK", "True")
+        self.db_retries = _getenv_int("DB_RETRIES", 3)
+        self.db_retry_backoff = _getenv_float("DB_RETRY_BACKOFF", 0.2)
+        self.db_row_level_security = _getenv_bool("DB_ROW_LEVEL_SECURITY")
+
+        self.argon2_time_cost = _getenv_int("ARGON2_TIME_COST", 3)
+        self.argon2_memory_cost = _getenv_int("ARGON2_MEMORY_COST", 65536)
+        self.argon2_parallelism = _getenv_int("ARGON2_PARALLELISM", 4)
+
+        self.secret_key = os.getenv("SECRET_KEY")
+        self.dsn = os.getenv("DSN")
+        self.audit_spool_path = os.getenv("AUDIT_SPOOL_PATH") or "audit_spool.sqlite3"
+        self.audit_sample_rate = _getenv_float("AUDIT_SAMPLE_RATE", 1.0)
+        self.audit_batch_size = _getenv_int("AUDIT_BATCH_SIZE", 100)
+        self.audit_background_flush = _getenv_bool("AUDIT_BACKGROUND_FLUSH", "True")
+        self.daemon_socket_path = os.getenv("DAEMON_SOCKET_PATH")
+        self.reference_cache_ttl = _getenv_float("REFERENCE_CACHE_TTL", 300)
+        self.reference_cache_path = os.getenv("REFERENCE_CACHE_PATH")
+        self.api_host = os.getenv("API_HOST") or "127.0.0.1"
+        self.api_port = _getenv_int("API_PORT", 8000)
+        self.api_max_concurrency = _getenv_int("API_MAX_CONCURRENCY", 64)
+        self.api_hash_workers = _getenv_int("API_HASH_WORKERS", 2)
+        self.migration_lock_timeout = _getenv_float("MIGRATION_LOCK_TIMEOUT", 5)
+        self.migration_batch_size = _getenv_int("MIGRATION_BATCH_SIZE", 1000)
+        self.migration_batch_pause = _getenv_float("MIGRATION_BATCH_PAUSE", 0.1)
+        self.slow_query_threshold = _getenv_float("SLOW_QUERY_THRESHOLD", 0.1)
+        self.slow_query_log_path = (
+            os.getenv("SLOW_QUERY_LOG_PATH") or "slow_queries.sqlite3"
+        )
+        self.slow_query_log_max_entries = _getenv_int(
+            "SLOW_QUERY_LOG_MAX_ENTRIES", 10000
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """
+    Returns the configuration of the software.
+
+    The .env file and the environment are only read on the first call, the
+    same Settings object being returned afterwards.
+    """
+    return Settings()
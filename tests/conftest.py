@@ -11,7 +11,8 @@ from epicevents.data_access_layer import (
     department,
     event,
 )
-from epicevents.data_access_layer import database
+from epicevents import audit
+from epicevents.data_access_layer import cache, database, slow_queries
 from epicevents.cli import collaborator as clicollaborator
 from epicevents.cli import contract as clicontract
 from epicevents.cli.collaborator import (
@@ -42,6 +43,29 @@ def test_database(monkeypatch):
     return mocked_database
 
 
+@pytest.fixture(autouse=True)
+def audit_spool(monkeypatch, tmp_path):
+    monkeypatch.setattr(audit, "SPOOL_PATH", str(tmp_path / "audit_spool.sqlite3"))
+    monkeypatch.setattr(audit, "BACKGROUND_FLUSH", False)
+    monkeypatch.setattr(audit, "_spooled_since_flush", False)
+    return audit.AuditSpool()
+
+
+@pytest.fixture(autouse=True)
+def slow_query_log(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        slow_queries, "LOG_PATH", str(tmp_path / "slow_queries.sqlite3")
+    )
+    return slow_queries.SlowQueryLog()
+
+
+@pytest.fixture(autouse=True)
+def reference_cache(monkeypatch):
+    reference_cache = cache.ReferenceCache(ttl=300)
+    monkeypatch.setattr(cache, "get_cache", lambda: reference_cache)
+    return reference_cache
+
+
 @pytest.fixture()
 def fake_department_management():
     fake_department1 = department.Department.create(name="Management")
@@ -585,7 +609,7 @@ def monkey_capture_message_collaborator(monkeypatch):
     def return_monkey(*args, **kwargs):
         pass
 
-    monkeypatch.setattr(clicollaborator.sentry_sdk, "capture_message", return_monkey)
+    monkeypatch.setattr(clicollaborator.audit, "record", return_monkey)
 
 
 @pytest.fixture()
@@ -593,4 +617,4 @@ def monkey_capture_message_contract(monkeypatch):
     def return_monkey(*args, **kwargs):
         pass
 
-    monkeypatch.setattr(clicontract.sentry_sdk, "capture_message", return_monkey)
+    monkeypatch.setattr(clicontract.audit, "record", return_monkey)
@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from epicevents.api.executor import PsycopgExecutor, request_principal
+from epicevents.data_access_layer import row_security
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.policy import SALES_DEPARTMENT_ID, Principal
+
+
+class RecordingCursor:
+    """Answers every statement with no row."""
+
+    description = [("id",)]
+
+    async def fetchall(self):
+        return []
+
+
+class RecordingConnection:
+    """A psycopg connection recording its transactions and statements."""
+
+    def __init__(self):
+        self.statements = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.statements.append("BEGIN")
+        yield
+        self.statements.append("COMMIT")
+
+    async def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+        return RecordingCursor()
+
+
+@pytest.fixture()
+def executor(monkeypatch):
+    connection = RecordingConnection()
+    executor = PsycopgExecutor(1)
+
+    @asynccontextmanager
+    async def borrowed_connection():
+        yield connection
+
+    monkeypatch.setattr(executor, "connection", borrowed_connection)
+    executor.recording_connection = connection
+    return executor
+
+
+def _fetch_clients(executor, principal):
+    """Fetches the clients on behalf of a principal, as a request handler does."""
+
+    async def fetch():
+        request_principal.set(principal)
+        return await executor.fetch(Client.select(Client.id))
+
+    return asyncio.run(fetch())
+
+
+def test_queries_carry_the_collaborator_in_row_level_security_mode(
+    executor, monkeypatch
+):
+    """
+    GIVEN the row-level security mode and a request authenticated as a sales collaborator
+    WHEN the API runs a query
+    THEN it should run in a transaction on which the collaborator and department are set
+    """
+    monkeypatch.setattr(row_security, "ENABLED", True)
+
+    _fetch_clients(executor, Principal(7, SALES_DEPARTMENT_ID))
+
+    statements = executor.recording_connection.statements
+    assert statements[0] == "BEGIN"
+    assert statements[1] == (
+        row_security.SET_PRINCIPAL_SQL,
+        ("epicevents.collaborator_id", "7", "epicevents.department_id", "2"),
+    )
+    assert statements[2][0].startswith('SELECT "t1"."id" FROM "client"')
+    assert statements[3] == "COMMIT"
+
+
+def test_queries_run_alone_without_row_level_security(executor, monkeypatch):
+    """
+    GIVEN the row-level security mode disabled
+    WHEN the API runs a query for an authenticated collaborator
+    THEN the query should be sent alone, in autocommit mode
+    """
+    monkeypatch.setattr(row_security, "ENABLED", False)
+
+    _fetch_clients(executor, Principal(7, SALES_DEPARTMENT_ID))
+
+    statements = executor.recording_connection.statements
+    assert len(statements) == 1
+    assert statements[0][0].startswith('SELECT "t1"."id" FROM "client"')
@@ -0,0 +1,342 @@
+import asyncio
+import json
+import jwt
+from epicevents.api.server import HTTPError, Request, create_application
+from epicevents.cli.collaborator import SECRET_KEY
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.contract import Contract
+
+
+def _token(collaborator):
+    """Issues a token for a collaborator, as the login command does."""
+    return jwt.encode(collaborator.get_data(), key=SECRET_KEY, algorithm="HS256")
+
+
+def _call(method, path, token=None, body=None, query=None):
+    """Dispatches a request to the API and returns its status and payload."""
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    request = Request(
+        method,
+        path,
+        query or {},
+        headers,
+        json.dumps(body).encode("utf-8") if body is not None else b"",
+    )
+    application = create_application()
+
+    async def dispatch():
+        try:
+            return await application.dispatch(request)
+        except HTTPError as error:
+            return error.status, {"detail": error.message}
+        finally:
+            await application.close()
+
+    return asyncio.run(dispatch())
+
+
+def test_login_returns_a_bearer_token(fake_collaborator_sales):
+    """
+    GIVEN a sales collaborator
+    WHEN they log in with their credentials
+    THEN a token compatible with the CLI should be returned
+    """
+    status, payload = _call(
+        "POST", "/login", body={"email": "test@sales.fr", "password": "testpass"}
+    )
+
+    decoded_payload = jwt.decode(payload["token"], key=SECRET_KEY, algorithms=["HS256"])
+
+    assert status == 200
+    assert decoded_payload["collaborator_id"] == str(fake_collaborator_sales.id)
+    assert decoded_payload["department_id"] == "2"
+
+
+def test_login_with_wrong_password(fake_collaborator_sales):
+    """
+    GIVEN a sales collaborator
+    WHEN they log in with a wrong password
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "POST", "/login", body={"email": "test@sales.fr", "password": "wrong"}
+    )
+
+    assert status == 401
+    assert payload["detail"] == "Nom d'utilisateur ou mot de passe incorrect."
+
+
+def test_list_requires_a_token(fake_client):
+    """
+    GIVEN a client
+    WHEN the clients are listed without a token
+    THEN the request should be refused
+    """
+    status, payload = _call("GET", "/clients")
+
+    assert status == 401
+    assert payload["detail"] == "Veuillez vous authentifier et réessayer."
+
+
+def test_list_collaborators_is_restricted(fake_collaborator_sales):
+    """
+    GIVEN a valid sales collaborator token
+    WHEN the collaborators are listed
+    THEN the request should be refused as for the list command
+    """
+    status, payload = _call(
+        "GET", "/collaborators", token=_token(fake_collaborator_sales)
+    )
+
+    assert status == 403
+    assert payload["detail"] == "Action restreinte."
+
+
+def test_list_clients_paginated(fake_client, fake_collaborator_sales):
+    """
+    GIVEN a client
+    WHEN the clients are listed one per page
+    THEN the page should hold the client and the key of the next page
+    """
+    status, payload = _call(
+        "GET",
+        "/clients",
+        token=_token(fake_collaborator_sales),
+        query={"after": str(fake_client.id - 1), "limit": "1"},
+    )
+
+    assert status == 200
+    assert payload["results"][0]["email"] == fake_client.email
+    assert payload["results"][0]["collaborator"] == fake_collaborator_sales.id
+    assert payload["next"] == fake_client.id
+
+
+def test_create_client(fake_company, fake_collaborator_sales):
+    """
+    GIVEN a valid sales collaborator token and a company
+    WHEN a client is created
+    THEN it should be assigned to the sales collaborator
+    """
+    status, payload = _call(
+        "POST",
+        "/clients",
+        token=_token(fake_collaborator_sales),
+        body={
+            "first_name": "Marc",
+            "name": "Assin",
+            "email": "marc@assin.fr",
+            "phone": "0611223344",
+            "company": fake_company.id,
+        },
+    )
+
+    created_client = Client.get_by_id(payload["id"])
+    created_client.delete_instance()
+
+    assert status == 201
+    assert created_client.collaborator_id == fake_collaborator_sales.id
+
+
+def test_create_client_with_invalid_data(fake_company, fake_collaborator_sales):
+    """
+    GIVEN a valid sales collaborator token and a company
+    WHEN a client is created with an invalid email
+    THEN the validation error of the model should be returned
+    """
+    status, payload = _call(
+        "POST",
+        "/clients",
+        token=_token(fake_collaborator_sales),
+        body={
+            "first_name": "Marc",
+            "name": "Assin",
+            "email": "marc",
+            "phone": "0611223344",
+            "company": fake_company.id,
+        },
+    )
+
+    assert status == 400
+    assert payload["detail"].startswith("Erreur : Veuillez entrer un email valide")
+
+
+def test_update_client_of_another_sales(fake_client, fake_collaborator_sales2):
+    """
+    GIVEN a client assigned to another sales collaborator
+    WHEN a sales collaborator updates it
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/clients/{fake_client.id}",
+        token=_token(fake_collaborator_sales2),
+        body={"name": "Dupont"},
+    )
+
+    assert status == 403
+    assert payload["detail"] == "Action restreinte."
+
+
+def test_update_missing_client(fake_collaborator_sales):
+    """
+    GIVEN a valid sales collaborator token
+    WHEN a client which does not exist is updated
+    THEN the client should not be found
+    """
+    status, payload = _call(
+        "PATCH",
+        "/clients/999",
+        token=_token(fake_collaborator_sales),
+        body={"name": "Dupont"},
+    )
+
+    assert status == 404
+    assert payload["detail"] == "Aucun client trouvé avec l'ID n°999."
+
+
+def test_update_client_from_support(fake_client, fake_collaborator_support):
+    """
+    GIVEN a client and a support collaborator, who may change no client
+    WHEN the support collaborator updates it
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/clients/{fake_client.id}",
+        token=_token(fake_collaborator_support),
+        body={"name": "Dupont"},
+    )
+
+    assert status == 403
+    assert payload["detail"] == "Action restreinte."
+
+
+def test_update_contract_of_another_sales(
+    fake_contract_unsigned, fake_collaborator_sales2
+):
+    """
+    GIVEN a contract of a client assigned to another sales collaborator
+    WHEN a sales collaborator signs it
+    THEN the request should be refused and the contract left unsigned
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/contracts/{fake_contract_unsigned.id}",
+        token=_token(fake_collaborator_sales2),
+        body={"signed": True},
+    )
+
+    assert status == 403
+    assert payload["detail"] == "Action restreinte."
+    assert Contract.get_by_id(fake_contract_unsigned.id).signed is False
+
+
+def test_update_contract(fake_contract_unsigned, fake_collaborator_sales):
+    """
+    GIVEN an unsigned contract of a client of the sales collaborator
+    WHEN the sales collaborator signs it and changes the amount due
+    THEN both fields should be updated in one request
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/contracts/{fake_contract_unsigned.id}",
+        token=_token(fake_collaborator_sales),
+        body={"signed": True, "amount_due": 1000},
+    )
+
+    updated_contract = Contract.get_by_id(fake_contract_unsigned.id)
+
+    assert status == 200
+    assert payload["signed"] is True
+    assert updated_contract.signed is True
+    assert updated_contract.amount_due == 1000
+
+
+def test_create_event_for_unsigned_contract(
+    fake_contract_unsigned, fake_collaborator_sales
+):
+    """
+    GIVEN an unsigned contract of a client of the sales collaborator
+    WHEN an event is created for it
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "POST",
+        "/events",
+        token=_token(fake_collaborator_sales),
+        body={
+            "contract": fake_contract_unsigned.id,
+            "start_date": "2023-12-24 20:00",
+            "end_date": "2023-12-25 02:00",
+            "location": "Nanterre",
+            "attendees": 10,
+        },
+    )
+
+    assert status == 400
+    assert (
+        payload["detail"]
+        == "Vous ne pouvez pas créer d'évènement pour un contrat qui n'est pas signé."
+    )
+
+
+def test_update_event_of_another_support(fake_event, fake_collaborator_support2):
+    """
+    GIVEN an event assigned to another support collaborator
+    WHEN a support collaborator updates it
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/events/{fake_event.id}",
+        token=_token(fake_collaborator_support2),
+        body={"location": "Lyon"},
+    )
+
+    assert status == 403
+    assert payload["detail"] == "Action restreinte."
+
+
+def test_update_event_from_management(fake_event, fake_collaborator_management):
+    """
+    GIVEN an event and a management collaborator, who may change every event
+    WHEN the management collaborator updates it
+    THEN the event should be updated
+    """
+    status, payload = _call(
+        "PATCH",
+        f"/events/{fake_event.id}",
+        token=_token(fake_collaborator_management),
+        body={"location": "Lyon"},
+    )
+
+    assert status == 200
+    assert payload["location"] == "Lyon"
+
+
+def test_create_event_for_a_client_of_another_sales(
+    fake_contract, fake_collaborator_sales2
+):
+    """
+    GIVEN a signed contract of a client assigned to another sales collaborator
+    WHEN a sales collaborator creates an event for it
+    THEN the request should be refused
+    """
+    status, payload = _call(
+        "POST",
+        "/events",
+        token=_token(fake_collaborator_sales2),
+        body={
+            "contract": fake_contract.id,
+            "start_date": "2023-12-24 20:00",
+            "end_date": "2023-12-25 02:00",
+            "location": "Nanterre",
+            "attendees": 10,
+        },
+    )
+
+    assert status == 403
+    assert (
+        payload["detail"]
+        == "Vous ne pouvez pas créer d'évènement pour un client qui ne vous est pas affecté."
+    )
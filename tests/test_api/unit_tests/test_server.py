@@ -0,0 +1,97 @@
+import asyncio
+import json
+import socket
+from epicevents import audit
+from epicevents.api.server import create_application
+
+
+def _exchange(data):
+    """Sends raw bytes to the API over a socket pair and returns the raw answer."""
+    client_connection, server_connection = socket.socketpair()
+
+    async def exchange():
+        application = create_application()
+        reader, writer = await asyncio.open_connection(sock=server_connection)
+        client_reader, client_writer = await asyncio.open_connection(
+            sock=client_connection
+        )
+        client_writer.write(data)
+        client_writer.write_eof()
+        await application.handle_connection(reader, writer)
+        answer = await client_reader.read()
+        client_writer.close()
+        await application.close()
+        return answer
+
+    return asyncio.run(exchange())
+
+
+def _responses(answer):
+    """Splits the answer of the API into (status, payload) pairs."""
+    responses = []
+    while answer:
+        head, _, answer = answer.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in header_lines)
+        length = int(headers["Content-Length"])
+        responses.append((int(status_line.split(" ")[1]), json.loads(answer[:length])))
+        answer = answer[length:]
+    return responses
+
+
+def test_keep_alive_connection():
+    """
+    GIVEN a connection to the API
+    WHEN two requests are sent on it
+    THEN both should be answered with JSON on the same connection
+    """
+    answer = _exchange(
+        b"GET /clients HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        b"GET /unknown HTTP/1.1\r\nHost: localhost\r\n\r\n"
+    )
+
+    assert _responses(answer) == [
+        (401, {"detail": "Veuillez vous authentifier et réessayer."}),
+        (404, {"detail": "Ressource introuvable."}),
+    ]
+
+
+def test_audit_events_are_flushed_after_each_request(monkeypatch):
+    """
+    GIVEN a connection to the API, whose server keeps running
+    WHEN two requests are sent on it
+    THEN the audit events should be flushed once each request has been answered
+    """
+    flushes = []
+    monkeypatch.setattr(audit, "flush_in_background", lambda: flushes.append(True))
+
+    _exchange(
+        b"GET /clients HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        b"GET /unknown HTTP/1.1\r\nHost: localhost\r\n\r\n"
+    )
+
+    assert len(flushes) == 2
+
+
+def test_malformed_request():
+    """
+    GIVEN a connection to the API
+    WHEN a malformed request is sent
+    THEN it should be answered with an error and the connection closed
+    """
+    answer = _exchange(b"HELLO\r\n\r\nGET /clients HTTP/1.1\r\n\r\n")
+
+    assert _responses(answer) == [(400, {"detail": "Requête invalide."})]
+
+
+def test_body_too_large():
+    """
+    GIVEN a connection to the API
+    WHEN a request announces a body larger than the limit
+    THEN it should be refused without reading the body
+    """
+    answer = _exchange(b"POST /login HTTP/1.1\r\nContent-Length: 999999999\r\n\r\n{}")
+
+    assert _responses(answer) == [
+        (413, {"detail": "Le corps de la requête est trop volumineux."})
+    ]
@@ -0,0 +1,76 @@
+import pytest
+from typer import Exit
+from epicevents.cli.admin import slow_queries_report
+from epicevents.data_access_layer.instrumentation import QueryRecord
+
+
+@pytest.fixture()
+def logged_queries(slow_query_log):
+    for duration in (0.2, 0.3, 0.4):
+        slow_query_log.append(
+            QueryRecord('SELECT * FROM "client" WHERE "id" = ?', [1], duration, "a:1"),
+            "clients get",
+            1,
+        )
+    slow_query_log.append(
+        QueryRecord('SELECT * FROM "event"', [], 2.5, "b:2"), "events list", 1
+    )
+    return slow_query_log
+
+
+def test_report_shows_the_slowest_queries(
+    monkey_token_check_management, logged_queries, capsys
+):
+    """
+    GIVEN a management collaborator and logged slow queries
+    WHEN the slow-query report is limited to one query by p95
+    THEN only the slowest query should be displayed
+    """
+    slow_queries_report(top=1, order_by="p95", command=None, clear=False)
+
+    captured = capsys.readouterr()
+    assert "events list" in captured.out
+    assert "2500.0" in captured.out
+    assert "clients get" not in captured.out
+
+
+def test_report_rejects_an_unknown_order(
+    monkey_token_check_management, logged_queries, capsys
+):
+    """
+    GIVEN a management collaborator
+    WHEN the report is ordered by an unknown measure
+    THEN an error should be displayed
+    """
+    with pytest.raises(Exit):
+        slow_queries_report(top=10, order_by="mean", command=None, clear=False)
+
+    captured = capsys.readouterr()
+    assert "Veuillez choisir un classement parmi : total, p95." in captured.out
+
+
+def test_report_clears_the_log(monkey_token_check_management, logged_queries, capsys):
+    """
+    GIVEN a management collaborator and logged slow queries
+    WHEN the report is asked to clear the log
+    THEN the log should be empty
+    """
+    with pytest.raises(Exit):
+        slow_queries_report(top=10, order_by="total", command=None, clear=True)
+
+    assert logged_queries.report() == []
+
+
+def test_report_is_restricted_to_management(
+    monkey_token_check_fake_sales, logged_queries, capsys
+):
+    """
+    GIVEN a sales collaborator
+    WHEN they ask for the slow-query report
+    THEN the action should be restricted
+    """
+    with pytest.raises(Exit):
+        slow_queries_report(top=10, order_by="total", command=None, clear=False)
+
+    captured = capsys.readouterr()
+    assert "Action restreinte." in captured.out
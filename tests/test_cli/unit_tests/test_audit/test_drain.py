@@ -0,0 +1,173 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typer import Exit
+from epicevents import audit
+from epicevents.cli.audit import drain, status
+
+
+class StandInCollector(BaseHTTPRequestHandler):
+    """Stands for Sentry, recording the envelopes it receives."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((self.path, self.headers, body))
+        status_code = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status_code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def collector(monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), StandInCollector)
+    server.requests = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        audit, "DSN", f"http://public@127.0.0.1:{server.server_port}/42"
+    )
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_record_spools_events_without_sending_them(collector, audit_spool):
+    """
+    GIVEN a configured Sentry DSN
+    WHEN audit events are recorded
+    THEN they should be kept in the spool without reaching the collector
+    """
+    audit.record("[SIGNATURE CONTRAT N°1 PAR COLLABORATEUR N°2]")
+    audit.record("[SUPPRESSION COLLABORATEUR N°3 PAR COLLABORATEUR N°2]")
+
+    assert audit_spool.count() == 2
+    assert collector.requests == []
+
+
+def test_record_applies_the_sample_rate(collector, audit_spool, monkeypatch):
+    """
+    GIVEN a sample rate of zero
+    WHEN an audit event is recorded
+    THEN it should not be spooled
+    """
+    monkeypatch.setattr(audit, "SAMPLE_RATE", 0)
+
+    audit.record("[SUPPRESSION COLLABORATEUR N°3 PAR COLLABORATEUR N°2]")
+
+    assert audit_spool.count() == 0
+
+
+def test_flush_in_background_only_follows_new_events(
+    collector, audit_spool, monkeypatch
+):
+    """
+    GIVEN background flushes enabled, as in a long-lived process
+    WHEN flushes are requested after spooling events and after nothing new
+    THEN a background drain should only be started when events were spooled since the last one
+    """
+    started_flushes = []
+    monkeypatch.setattr(audit, "BACKGROUND_FLUSH", True)
+    monkeypatch.setattr(audit, "_flush_scheduled", True)
+    monkeypatch.setattr(
+        audit, "_start_background_flush", lambda: started_flushes.append(True)
+    )
+
+    audit.record("[SIGNATURE CONTRAT N°1]")
+    audit.record("[SIGNATURE CONTRAT N°2]")
+    audit.flush_in_background()
+    audit.flush_in_background()
+    audit.record("[SIGNATURE CONTRAT N°3]")
+    audit.flush_in_background()
+
+    assert len(started_flushes) == 2
+
+
+def test_drain_delivers_events_in_batches(
+    collector, audit_spool, monkey_token_check_management, capsys
+):
+    """
+    GIVEN three spooled audit events and a reachable collector
+    WHEN the spool is drained in batches of two events
+    THEN every event should be delivered as a Sentry envelope and removed from the spool
+    """
+    for contract_id in range(3):
+        audit.record(f"[SIGNATURE CONTRAT N°{contract_id}]")
+
+    report = audit.drain(batch_size=2)
+
+    path, headers, body = collector.requests[0]
+    event = json.loads(body.splitlines()[2])
+
+    assert report.delivered == 3
+    assert audit_spool.count() == 0
+    assert path == "/api/42/envelope/"
+    assert "sentry_key=public" in headers["X-Sentry-Auth"]
+    assert event["message"] == "[SIGNATURE CONTRAT N°0]"
+
+
+def test_drain_postpones_events_on_failure(collector, audit_spool):
+    """
+    GIVEN two spooled audit events and a collector rejecting the second one
+    WHEN the spool is drained
+    THEN the first event should be delivered and the second one postponed
+    AND a forced drain should deliver the postponed event with the same event id
+    """
+    audit.record("[SIGNATURE CONTRAT N°1]")
+    audit.record("[SIGNATURE CONTRAT N°2]")
+    collector.statuses = [200, 503]
+
+    report = audit.drain()
+
+    assert report.delivered == 1
+    assert report.postponed == 1
+    assert audit_spool.pending(10) == []
+
+    forced_report = audit.drain(force=True)
+
+    first_attempt, retry = [
+        json.loads(body.splitlines()[0])["event_id"]
+        for _, _, body in collector.requests[1:]
+    ]
+
+    assert forced_report.delivered == 1
+    assert audit_spool.count() == 0
+    assert first_attempt == retry
+
+
+def test_drain_command(collector, monkey_token_check_management, capsys):
+    """
+    GIVEN a valid management collaborator token and a spooled audit event
+    WHEN the drain and status commands are called
+    THEN the event should be delivered and no event should remain pending.
+    """
+    audit.record("[SIGNATURE CONTRAT N°1]")
+
+    drain()
+    status()
+
+    captured = capsys.readouterr()
+
+    assert "1 évènement(s) d'audit envoyé(s), 0 reporté(s)." in captured.out
+    assert "0 évènement(s) d'audit en attente d'envoi." in captured.out
+
+
+def test_drain_command_restricted(monkey_token_check_correct_sales, capsys):
+    """
+    GIVEN a valid sales collaborator token
+    WHEN the drain command is called
+    THEN a restricted action message should be displayed.
+    """
+    with pytest.raises(Exit):
+        drain()
+
+    captured = capsys.readouterr()
+
+    assert "Action restreinte." in captured.out
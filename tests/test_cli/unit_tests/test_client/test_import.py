@@ -0,0 +1,68 @@
+import csv
+import pytest
+from typer import Exit
+from epicevents.data_access_layer.client import Client
+from epicevents.cli.client import import_
+
+
+def test_import_successful(
+    monkey_token_check_correct_sales,
+    fake_company,
+    fake_collaborator_sales,
+    tmp_path,
+    capsys,
+):
+    """
+    Given a valid sales collaborator token and a CSV file of clients,
+    When the file is imported,
+    Then the clients should be created and assigned to the sales collaborator.
+    And the import report should be displayed in the captured output.
+    """
+    path = str(tmp_path / "clients.csv")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["first_name", "name", "email", "phone", "company"])
+        writer.writerow(
+            ["Bob", "Eponge", "bob@import.fr", "0600000001", fake_company.id]
+        )
+
+    import_(file=path)
+
+    created_client = Client.get(Client.email == "bob@import.fr")
+
+    captured = capsys.readouterr()
+
+    assert created_client.collaborator.id == fake_collaborator_sales.id
+    assert "1 ligne(s) importée(s), 0 ligne(s) rejetée(s)" in captured.out
+
+    created_client.delete_instance()
+
+
+def test_import_missing_file(monkey_token_check_correct_sales, tmp_path, capsys):
+    """
+    Given a valid sales collaborator token,
+    When a file that does not exist is imported,
+    Then an error message should be displayed and the command should exit.
+    """
+    path = str(tmp_path / "absent.csv")
+
+    with pytest.raises(Exit):
+        import_(file=path)
+
+    captured = capsys.readouterr()
+
+    assert "Aucun fichier trouvé" in captured.out
+
+
+def test_import_restricted(monkey_token_check_management, tmp_path, capsys):
+    """
+    Given a valid management collaborator token,
+    When a file of clients is imported,
+    Then a restricted action message should be displayed.
+    """
+    with pytest.raises(Exit):
+        import_(file=str(tmp_path / "clients.csv"))
+
+    captured = capsys.readouterr()
+
+    assert "Action restreinte." in captured.out
@@ -1,5 +1,7 @@
 import pytest
 from typer import Exit
+from playhouse.test_utils import count_queries
+from epicevents.data_access_layer.client import Client
 from epicevents.cli.client import list
 
 
@@ -44,3 +46,121 @@ def test_list_token_fails(monkey_token_check_false, fake_client, capsys):
     captured = capsys.readouterr()
 
     assert "Veuillez vous authentifier et réessayer." in captured.out.strip()
+
+
+def test_list_query_count_does_not_depend_on_rows(
+    monkey_token_check_management,
+    fake_client,
+    fake_company,
+    fake_collaborator_sales,
+    capsys,
+):
+    """
+    GIVEN a user with management access and a growing number of clients in the database
+    WHEN the list() function is called
+    THEN the number of executed queries should not depend on the number of clients
+    """
+    with count_queries() as single_client:
+        list()
+
+    extra_clients = [
+        Client.create(
+            first_name="Extra",
+            name="Client",
+            email=f"extra{index}@client.fr",
+            phone=f"07000000{index:02d}",
+            company=fake_company.id,
+            collaborator=fake_collaborator_sales.id,
+        )
+        for index in range(5)
+    ]
+
+    with count_queries() as many_clients:
+        list()
+
+    for extra_client in extra_clients:
+        extra_client.delete_instance()
+
+    assert many_clients.count == single_client.count
+
+
+def test_list_paginated(
+    monkeypatch,
+    monkey_token_check_management,
+    fake_client,
+    fake_company,
+    fake_collaborator_sales,
+    capsys,
+):
+    """
+    GIVEN a user with management access and several clients in the database
+    WHEN the list() function is called with a limit and the ID of the last client of the previous page
+    THEN only the clients of the requested page should be printed
+    """
+    monkeypatch.setenv("COLUMNS", "200")
+    next_client = Client.create(
+        first_name="Suivant",
+        name="Client",
+        email="suivant@client.fr",
+        phone="0700000099",
+        company=fake_company.id,
+        collaborator=fake_collaborator_sales.id,
+    )
+
+    list(after=fake_client.id, limit=1)
+
+    next_client.delete_instance()
+
+    captured = capsys.readouterr()
+
+    assert "Suivant" in captured.out
+    assert "Gérard" not in captured.out
+
+
+def test_list_fails_with_unknown_order_field(
+    monkey_token_check_management, fake_client, capsys
+):
+    """
+    GIVEN a user with management access and existing clients in the database
+    WHEN the list() function is called with an unknown ordering field
+    THEN it should raise an Exit exception, and an error message should list the available fields
+    """
+    with pytest.raises(Exit):
+        list(order_by="phone")
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez choisir un champ de tri parmi" in captured.out
+
+
+def test_list_mine_shows_owned_clients_only(
+    monkey_token_check_correct_sales_plankton, fake_client, capsys
+):
+    """
+    GIVEN a sales collaborator and a client followed by another one
+    WHEN the list() function is called with the --mine option
+    THEN it should raise an Exit exception without displaying the client, and a message should indicate that they have no client
+    """
+    with pytest.raises(Exit):
+        list(mine=True)
+
+    captured = capsys.readouterr()
+
+    assert "Gérard" not in captured.out
+    assert "Vous n'avez aucun client à votre charge." in captured.out
+
+
+def test_list_mine_exits_for_departments_owning_no_client(
+    monkey_token_check_management, fake_client, capsys
+):
+    """
+    GIVEN a user with management access and existing clients in the database
+    WHEN the list() function is called with the --mine option
+    THEN it should raise an Exit exception, as management owns no client
+    """
+    with pytest.raises(Exit):
+        list(mine=True)
+
+    captured = capsys.readouterr()
+
+    assert "Vous n'avez aucun client à votre charge." in captured.out
@@ -0,0 +1,37 @@
+import pytest
+from typer import Exit
+from epicevents.data_access_layer import passwords
+from epicevents.cli.collaborator import calibrate
+
+
+def test_calibrate_successful(monkeypatch, monkey_token_check_management, capsys):
+    """
+    GIVEN a valid management collaborator token and a hash taking 100 ms per pass
+    WHEN the calibrate function is called with a target of 250 ms
+    THEN the smallest time cost reaching the target should be displayed.
+    """
+    monkeypatch.setattr(
+        passwords, "measure_hash_duration", lambda hasher: hasher.time_cost * 0.1
+    )
+
+    calibrate(target_ms=250, memory_cost=1024, parallelism=2)
+
+    captured = capsys.readouterr()
+
+    assert "ARGON2_TIME_COST=3" in captured.out
+    assert "ARGON2_MEMORY_COST=1024" in captured.out
+    assert "ARGON2_PARALLELISM=2" in captured.out
+
+
+def test_calibrate_restricted(monkey_token_check_correct_sales, capsys):
+    """
+    GIVEN a valid sales collaborator token
+    WHEN the calibrate function is called
+    THEN a restricted action message should be displayed.
+    """
+    with pytest.raises(Exit):
+        calibrate(target_ms=250)
+
+    captured = capsys.readouterr()
+
+    assert "Action restreinte." in captured.out
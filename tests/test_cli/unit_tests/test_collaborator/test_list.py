@@ -1,5 +1,7 @@
 import pytest
 from typer import Exit
+from playhouse.test_utils import count_queries
+from epicevents.data_access_layer.collaborator import Collaborator
 from epicevents.cli.collaborator import list
 
 
@@ -47,3 +49,37 @@ def test_list_fails_with_wrong_token(monkey_token_check_false, capsys):
     captured = capsys.readouterr()
 
     assert "Veuillez vous authentifier et réessayer." in captured.out.strip()
+
+
+def test_list_query_count_does_not_depend_on_rows(
+    monkey_token_check_management,
+    fake_department_management,
+    fake_collaborator_management,
+    capsys,
+):
+    """
+    GIVEN a management collaborator and a growing number of collaborators
+    WHEN the list function is called
+    THEN the number of executed queries should not depend on the number of collaborators
+    """
+    with count_queries() as single_collaborator:
+        list()
+
+    extra_collaborators = [
+        Collaborator.create(
+            first_name="Extra",
+            name="Collaborateur",
+            email=f"extra{index}@management.fr",
+            password="testpass",
+            department=fake_department_management.id,
+        )
+        for index in range(3)
+    ]
+
+    with count_queries() as many_collaborators:
+        list()
+
+    for extra_collaborator in extra_collaborators:
+        extra_collaborator.delete_instance()
+
+    assert many_collaborators.count == single_collaborator.count
@@ -1,6 +1,8 @@
 import pytest
 from click.exceptions import Exit
 from epicevents.cli.collaborator import login
+from epicevents.data_access_layer import passwords
+from epicevents.data_access_layer.collaborator import Collaborator
 
 
 def test_login_successful(
@@ -53,3 +55,28 @@ def test_login_with_wrong_password(monkey_dotenv, fake_collaborator_management,
     captured = capsys.readouterr()
 
     assert captured.out.strip() == "Nom d'utilisateur ou mot de passe incorrect."
+
+
+def test_login_upgrades_outdated_password_hash(
+    monkeypatch,
+    monkey_dotenv,
+    fake_collaborator_management,
+    fake_department_management,
+    capsys,
+):
+    """
+    GIVEN a management collaborator whose password was hashed with former argon2 parameters
+    WHEN the login function is called with the correct email and password
+    THEN the password should be hashed again with the current parameters.
+    """
+    hasher = passwords.create_password_hasher(
+        time_cost=1, memory_cost=1024, parallelism=1
+    )
+    monkeypatch.setattr(passwords, "get_password_hasher", lambda: hasher)
+
+    login("test@management.fr", "testpass")
+
+    updated_collaborator = Collaborator.get_by_id(fake_collaborator_management.id)
+
+    assert not hasher.check_needs_rehash(updated_collaborator.password)
+    assert hasher.verify(updated_collaborator.password, "testpass")
@@ -0,0 +1,79 @@
+import pytest
+from typer import Exit
+from epicevents.cli.collaborator import delete, offboard
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.event import Event
+
+
+def test_offboard_hands_the_events_over(
+    monkey_capture_message_collaborator,
+    monkey_token_check_management,
+    fake_event,
+    fake_collaborator_support,
+    fake_collaborator_support2,
+    capsys,
+):
+    """
+    GIVEN a management collaborator and a support collaborator in charge of an event
+    WHEN the offboard() function is called with another support collaborator as successor
+    THEN the event should be handed over and the departing collaborator deleted
+    """
+    offboard(fake_collaborator_support.id, [fake_collaborator_support2.id])
+
+    captured = capsys.readouterr()
+
+    assert Event.get_by_id(fake_event.id).support_id == fake_collaborator_support2.id
+    assert (
+        Collaborator.get_or_none(Collaborator.id == fake_collaborator_support.id)
+        is None
+    )
+    assert "0 client(s), 0 contrat(s) et 1" in captured.out
+
+
+def test_offboard_fails_with_an_unknown_successor(
+    monkey_token_check_management, fake_collaborator_support, capsys
+):
+    """
+    GIVEN a management collaborator and a support collaborator
+    WHEN the offboard() function is called with an unknown successor
+    THEN an error message should be displayed
+    """
+    with pytest.raises(Exit):
+        offboard(fake_collaborator_support.id, [-50])
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez entrer des numéros de successeurs valides." in captured.out
+
+
+def test_offboard_not_authorized(
+    monkey_token_check_correct_sales, fake_collaborator_support, capsys
+):
+    """
+    GIVEN a sales collaborator
+    WHEN the offboard() function is called
+    THEN the action should be restricted
+    """
+    with pytest.raises(Exit):
+        offboard(fake_collaborator_support.id, [])
+
+    captured = capsys.readouterr()
+
+    assert "Action restreinte." in captured.out
+
+
+def test_delete_refuses_a_collaborator_with_a_portfolio(
+    monkey_token_check_management, fake_event, fake_collaborator_support, capsys
+):
+    """
+    GIVEN a management collaborator and a support collaborator in charge of an event
+    WHEN the delete() function is called on the support collaborator
+    THEN the deletion should be refused in favour of the offboard command
+    """
+    with pytest.raises(Exit):
+        delete(fake_collaborator_support.id)
+
+    captured = capsys.readouterr()
+
+    assert "commande offboard" in captured.out
+    assert Event.get_by_id(fake_event.id).support_id == fake_collaborator_support.id
@@ -0,0 +1,78 @@
+import pytest
+from typer import Exit
+from epicevents.cli.contract import bulk_update
+from epicevents.data_access_layer.contract import Contract
+
+
+def test_bulk_update_marks_the_contracts_of_a_client_as_paid(
+    monkey_capture_message_contract,
+    monkey_token_check_correct_sales,
+    fake_client,
+    fake_contract,
+    fake_contract2,
+    capsys,
+):
+    """
+    GIVEN a sales collaborator and signed contracts of one of their clients
+    WHEN the bulk_update() function sets the amount due of the client's signed contracts to zero
+    THEN both contracts should be paid
+    """
+    bulk_update([f"client={fake_client.id}", "signed=true"], ["amount_due=0"])
+
+    captured = capsys.readouterr()
+
+    assert Contract.get_by_id(fake_contract.id).amount_due == 0
+    assert Contract.get_by_id(fake_contract2.id).amount_due == 0
+    assert "2 contrat(s) modifié(s)." in captured.out
+
+
+def test_bulk_update_skips_the_contracts_of_other_sales_collaborators(
+    monkey_capture_message_contract,
+    monkey_token_check_fake_sales,
+    fake_client,
+    fake_contract,
+    capsys,
+):
+    """
+    GIVEN a sales collaborator and a contract of a client they do not own
+    WHEN the bulk_update() function is called on the contracts of that client
+    THEN no contract should be updated
+    """
+    bulk_update([f"client={fake_client.id}"], ["amount_due=0"], dry_run=True)
+
+    captured = capsys.readouterr()
+
+    assert "0 contrat(s) seraient modifié(s)." in captured.out
+
+
+def test_bulk_update_rejects_an_unknown_signature(
+    monkey_capture_message_contract,
+    monkey_token_check_management,
+    fake_client,
+    fake_contract,
+):
+    """
+    GIVEN a collaborator with management privileges and a signed contract
+    WHEN the bulk_update() function sets a signature which is neither true nor false
+    THEN an error should be raised and the contract should stay signed
+    """
+    with pytest.raises(ValueError, match="Le champ signed doit être rempli avec True"):
+        bulk_update([f"id={fake_contract.id}"], ["signed=maybe"])
+
+    assert Contract.get_by_id(fake_contract.id).signed == True
+
+
+def test_bulk_update_rejects_an_unknown_signature_condition(
+    monkey_token_check_management, fake_contract, capsys
+):
+    """
+    GIVEN a collaborator with management privileges
+    WHEN the bulk_update() function filters on a signature which is neither true nor false
+    THEN it should exit with an error message
+    """
+    with pytest.raises(Exit):
+        bulk_update(["signed=maybe"], ["amount_due=0"])
+
+    captured = capsys.readouterr()
+
+    assert "Le champ 'Signé' doit être filtré avec True ou False." in captured.out
@@ -0,0 +1,80 @@
+import csv
+import gzip
+import json
+import pytest
+from typer import Exit
+from epicevents.cli.contract import export
+
+
+def test_export_csv_with_conditions_and_columns(
+    monkey_token_check_management, fake_contract, fake_contract2, capsys
+):
+    """
+    Given a valid management collaborator token and two contracts,
+    When the contracts are exported as CSV with a condition and a column selection,
+    Then only the matching contract should be written with the selected columns.
+    """
+    export(
+        columns="id,total_sum,client_name",
+        where=[f"id>={fake_contract.id}", "total_sum<13000"],
+        output_format="csv",
+    )
+
+    captured = capsys.readouterr()
+    rows = [*csv.reader(captured.out.splitlines())]
+
+    assert rows == [
+        ["id", "total_sum", "client_name"],
+        [str(fake_contract2.id), "12000.0", "Hermite"],
+    ]
+
+
+def test_export_jsonl_gzip_file(
+    monkey_token_check_management, fake_contract, fake_contract_unsigned, tmp_path
+):
+    """
+    Given a valid management collaborator token and a signed and an unsigned contract,
+    When the unsigned contracts are exported as JSONL to a .gz file,
+    Then the file should be compressed and contain the unsigned contract only.
+    """
+    path = str(tmp_path / "contracts.jsonl.gz")
+
+    export(
+        columns="id,signed",
+        where=["signed=false", f"id>={fake_contract.id}"],
+        output_format="jsonl",
+        output=path,
+    )
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+
+    assert rows == [{"id": fake_contract_unsigned.id, "signed": False}]
+
+
+def test_export_unknown_column(monkey_token_check_management, capsys):
+    """
+    Given a valid management collaborator token,
+    When the contracts are exported with an unknown column,
+    Then an error message listing the available columns should be displayed.
+    """
+    with pytest.raises(Exit):
+        export(columns="id,password")
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez choisir des colonnes parmi" in captured.out
+
+
+def test_export_invalid_condition(monkey_token_check_management, capsys):
+    """
+    Given a valid management collaborator token,
+    When the contracts are exported with a malformed condition,
+    Then an error message should be displayed.
+    """
+    with pytest.raises(Exit):
+        export(where=["total_sum"])
+
+    captured = capsys.readouterr()
+
+    assert "Condition invalide" in captured.out
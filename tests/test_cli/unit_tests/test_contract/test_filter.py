@@ -1,3 +1,4 @@
+import json
 import pytest
 from typer import Exit
 from epicevents.cli.contract import filter
@@ -82,6 +83,31 @@ def test_filter_unpaid_fails_with_null_queryset(
     assert "Tous les contrats sont payés !" in captured.out.strip()
 
 
+def test_filter_unsigned_or_unpaid_json_format(
+    monkey_token_check_correct_sales,
+    fake_contract,
+    fake_contract2,
+    fake_contract3,
+    fake_contract_unsigned,
+    capsys,
+):
+    """
+    GIVEN a sales collaborator with the correct token and a set of contracts, one of them both unsigned and unpaid
+    WHEN the filter() function is called with both filters and the json format
+    THEN a single JSON document should list once every contract unsigned or unpaid
+    """
+    filter(ns=True, u=True, output_format="json")
+
+    captured = capsys.readouterr()
+    contracts = json.loads(captured.out)
+
+    assert [contract["id"] for contract in contracts] == [
+        fake_contract.id,
+        fake_contract2.id,
+        fake_contract_unsigned.id,
+    ]
+
+
 def test_filter_fails_without_attribute(
     monkey_token_check_correct_sales,
     fake_contract,
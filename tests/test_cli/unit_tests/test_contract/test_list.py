@@ -1,5 +1,8 @@
+import json
 import pytest
 from typer import Exit
+from playhouse.test_utils import count_queries
+from epicevents.data_access_layer.contract import Contract
 from epicevents.cli.contract import list
 
 
@@ -42,3 +45,104 @@ def test_list_token_fails(monkey_token_check_false, fake_contract, capsys):
     captured = capsys.readouterr()
 
     assert "Veuillez vous authentifier et réessayer." in captured.out.strip()
+
+
+def test_list_query_count_does_not_depend_on_rows(
+    monkey_token_check_management,
+    fake_contract,
+    fake_client,
+    fake_collaborator_sales,
+    capsys,
+):
+    """
+    GIVEN a user with management access and a growing number of contracts in the database
+    WHEN the list() function is called
+    THEN the number of executed queries should not depend on the number of contracts
+    """
+    with count_queries() as single_contract:
+        list()
+
+    extra_contracts = [
+        Contract.create(
+            client=fake_client.id,
+            collaborator=fake_collaborator_sales.id,
+            total_sum=1000 + index,
+        )
+        for index in range(5)
+    ]
+
+    with count_queries() as many_contracts:
+        list()
+
+    for extra_contract in extra_contracts:
+        extra_contract.delete_instance()
+
+    assert many_contracts.count == single_contract.count
+
+
+def test_list_csv_format(monkey_token_check_management, fake_contract, capsys):
+    """
+    GIVEN a user with management access and an existing contract in the database
+    WHEN the list() function is called with the csv format
+    THEN the contract should be written as a CSV row below a header row
+    """
+    list(output_format="csv")
+
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+
+    assert lines[0].startswith("id,client_id,client_first_name,client_name")
+    assert lines[1].startswith(f"{fake_contract.id},{fake_contract.client.id},Gérard")
+    assert len(lines) == 2
+
+
+def test_list_jsonl_format(monkey_token_check_management, fake_contract, capsys):
+    """
+    GIVEN a user with management access and an existing contract in the database
+    WHEN the list() function is called with the jsonl format
+    THEN the contract should be written as a JSON object on its own line
+    """
+    list(output_format="jsonl")
+
+    captured = capsys.readouterr()
+    contracts = [json.loads(line) for line in captured.out.splitlines()]
+
+    assert contracts[0]["id"] == fake_contract.id
+    assert contracts[0]["total_sum"] == 15000
+    assert contracts[0]["amount_due"] is None
+    assert contracts[0]["signed"] is True
+
+
+def test_list_fails_with_unknown_format(
+    monkey_token_check_management, fake_contract, capsys
+):
+    """
+    GIVEN a user with management access and an existing contract in the database
+    WHEN the list() function is called with an unknown output format
+    THEN it should raise an Exit exception, and an error message should list the available formats
+    """
+    with pytest.raises(Exit):
+        list(output_format="xml")
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez choisir un format parmi" in captured.out
+
+
+def test_list_mine_shows_the_contracts_of_owned_clients(
+    monkey_token_check_correct_sales, fake_contract, capsys
+):
+    """
+    GIVEN a sales collaborator following the client of an existing contract
+    WHEN the list() function is called with the --mine option
+    THEN only the contracts of their clients should be written
+    """
+    list(output_format="jsonl", mine=True)
+
+    captured = capsys.readouterr()
+    contracts = [json.loads(line) for line in captured.out.splitlines()]
+
+    assert fake_contract.id in [contract["id"] for contract in contracts]
+    assert {contract["client_id"] for contract in contracts} == {
+        fake_contract.client_id
+    }
@@ -298,3 +298,45 @@ def test_contract_update_with_correct_salesman_succesful(
         f"Le champ 'Client' du contrat n°{fake_contract.id} a été mis à jour avec succès."
         in captured.out.strip()
     )
+
+
+def test_set_updates_amounts_and_signature_together(
+    monkey_capture_message_contract,
+    monkey_token_check_management,
+    fake_contract,
+    capsys,
+):
+    """
+    GIVEN a collaborator with the correct management token and a contract
+    WHEN the update() function is called with --set pairs for the amounts and the signature
+    THEN all the fields should be updated, "false" being read as unsigned
+    """
+    update(
+        fake_contract.id,
+        assignments=["total_sum=5000", "amount_due=2500", "signed=false"],
+    )
+
+    updated_contract = Contract.get(Contract.id == fake_contract.id)
+    captured = capsys.readouterr()
+
+    assert updated_contract.total_sum == 5000
+    assert updated_contract.amount_due == 2500
+    assert updated_contract.signed == False
+    assert (
+        f"Les champs 'Montant total', 'Montant dû', 'Signé' du contrat n°{fake_contract.id}"
+        in captured.out
+    )
+
+
+def test_set_rejects_an_unknown_signature(
+    monkey_capture_message_contract, monkey_token_check_management, fake_contract
+):
+    """
+    GIVEN a collaborator with the correct management token and a signed contract
+    WHEN the update() function is called with a signature which is neither true nor false
+    THEN an error should be raised and the contract should stay signed
+    """
+    with pytest.raises(ValueError, match="Le champ signed doit être rempli avec True"):
+        update(fake_contract.id, assignments=["signed=maybe"])
+
+    assert Contract.get(Contract.id == fake_contract.id).signed == True
@@ -0,0 +1,151 @@
+import pytest
+from typer import Exit
+from epicevents.cli import event as clievent
+from epicevents.cli.event import bulk_update
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.instrumentation import QueryRecorder
+
+
+@pytest.fixture()
+def audit_records(monkeypatch):
+    records = []
+    monkeypatch.setattr(clievent.audit, "record", records.append)
+    return records
+
+
+def test_bulk_update_reassigns_events_in_one_statement(
+    monkey_token_check_management,
+    fake_event,
+    fake_event2,
+    fake_collaborator_support,
+    fake_collaborator_support2,
+    audit_records,
+    capsys,
+):
+    """
+    GIVEN a collaborator with management privileges and two events of a support collaborator
+    WHEN the bulk_update() function reassigns the events of that collaborator to another one
+    THEN both events should be updated by a single UPDATE and a single audit entry recorded
+    """
+    with QueryRecorder(database.psql_db) as recorder:
+        bulk_update(
+            [f"support={fake_collaborator_support.id}"],
+            [f"support={fake_collaborator_support2.id}"],
+        )
+
+    captured = capsys.readouterr()
+    statements = [
+        record.sql for record in recorder.records if record.sql.startswith("UPDATE")
+    ]
+
+    assert len(statements) == 1
+    assert {
+        event.support_id
+        for event in Event.select().where(Event.id.in_([fake_event.id, fake_event2.id]))
+    } == {fake_collaborator_support2.id}
+    assert "2 évènement(s) modifié(s)." in captured.out
+    assert len(audit_records) == 1
+    assert audit_records[0].startswith("[MAJ GROUPÉE DE 2 ÉVÈNEMENT(S)")
+
+
+def test_bulk_update_dry_run_only_counts(
+    monkey_token_check_management,
+    fake_event,
+    fake_event2,
+    fake_collaborator_support,
+    audit_records,
+    capsys,
+):
+    """
+    GIVEN a collaborator with management privileges and two events
+    WHEN the bulk_update() function is called with --dry-run
+    THEN the number of matching events should be displayed and nothing changed
+    """
+    bulk_update(
+        [f"support={fake_collaborator_support.id}"],
+        ["support=null"],
+        dry_run=True,
+    )
+
+    captured = capsys.readouterr()
+
+    assert "2 évènement(s) seraient modifié(s)." in captured.out
+    assert Event.get_by_id(fake_event.id).support_id == fake_collaborator_support.id
+    assert audit_records == []
+
+
+def test_bulk_update_commits_batches(
+    monkey_token_check_management,
+    fake_event,
+    fake_event2,
+    fake_collaborator_support,
+    audit_records,
+    capsys,
+):
+    """
+    GIVEN a collaborator with management privileges and two events
+    WHEN the bulk_update() function is called with a batch size of one row
+    THEN the events should be updated by one statement per row
+    """
+    with QueryRecorder(database.psql_db) as recorder:
+        bulk_update(
+            [f"support={fake_collaborator_support.id}"],
+            ["location=Lyon"],
+            batch_size=1,
+        )
+
+    statements = [
+        record.sql for record in recorder.records if record.sql.startswith("UPDATE")
+    ]
+
+    assert len(statements) == 2
+    assert Event.get_by_id(fake_event2.id).location == "Lyon"
+
+
+def test_bulk_update_is_limited_to_the_events_of_a_support(
+    monkey_token_check_support_gargamel,
+    fake_event,
+    fake_collaborator_support,
+    audit_records,
+    capsys,
+):
+    """
+    GIVEN a support collaborator and an event assigned to another support collaborator
+    WHEN the bulk_update() function is called on the events of the other collaborator
+    THEN no event should be updated
+    """
+    bulk_update([f"support={fake_collaborator_support.id}"], ["location=Lyon"])
+
+    captured = capsys.readouterr()
+
+    assert "Aucune ligne ne correspond aux conditions." in captured.out
+    assert Event.get_by_id(fake_event.id).location == fake_event.location
+
+
+def test_bulk_update_validates_the_new_values(
+    monkey_token_check_management, fake_event, fake_collaborator_support
+):
+    """
+    GIVEN a collaborator with management privileges and an event
+    WHEN the bulk_update() function is called with an invalid number of attendees
+    THEN a validation error should be raised before any row is written
+    """
+    with pytest.raises(ValueError):
+        bulk_update([f"id={fake_event.id}"], ["attendees=1"])
+
+    assert Event.get_by_id(fake_event.id).attendees == fake_event.attendees
+
+
+def test_bulk_update_requires_a_condition(monkey_token_check_management, capsys):
+    """
+    GIVEN a collaborator with management privileges
+    WHEN the bulk_update() function is called without any --where condition
+    THEN the function should exit without updating the whole table
+    """
+    with pytest.raises(Exit):
+        bulk_update([], ["location=Lyon"])
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez préciser les lignes à modifier avec --where." in captured.out
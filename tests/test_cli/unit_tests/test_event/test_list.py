@@ -1,5 +1,9 @@
+import json
 import pytest
 from typer import Exit
+from playhouse.test_utils import count_queries
+from epicevents.data_access_layer.event import Event
+from epicevents.cli import listing
 from epicevents.cli.event import list
 
 
@@ -44,3 +48,105 @@ def test_list_token_fails(monkey_token_check_false, capsys):
     captured = capsys.readouterr()
 
     assert "Veuillez vous authentifier et réessayer." in captured.out.strip()
+
+
+def test_list_query_count_does_not_depend_on_rows(
+    monkey_token_check_management,
+    fake_event,
+    fake_contract,
+    fake_collaborator_support,
+    capsys,
+):
+    """
+    GIVEN a collaborator with management privileges and a growing number of events, with and without support
+    WHEN the list() function is called
+    THEN the number of executed queries should not depend on the number of events
+    """
+    with count_queries() as single_event:
+        list()
+
+    extra_events = [
+        Event.create(
+            contract=fake_contract,
+            start_date="2024-10-01 10:00",
+            end_date="2024-10-01 18:00",
+            location=f"Salle n°{index}",
+            attendees=10,
+            support=fake_collaborator_support.id if index % 2 else None,
+        )
+        for index in range(6)
+    ]
+
+    with count_queries() as many_events:
+        list()
+
+    for extra_event in extra_events:
+        extra_event.delete_instance()
+
+    assert many_events.count == single_event.count
+
+
+def test_list_streamed(
+    monkeypatch, monkey_token_check_management, fake_event, fake_contract, capsys
+):
+    """
+    GIVEN a collaborator with management privileges and more events than fit in one streamed batch
+    WHEN the list() function is called in streaming mode
+    THEN the events should be printed in several tables, the header being printed only once
+    """
+    monkeypatch.setattr(listing, "STREAM_TABLE_ROWS", 2)
+    extra_events = [
+        Event.create(
+            contract=fake_contract,
+            start_date="2024-10-01 10:00",
+            end_date="2024-10-01 18:00",
+            location=f"Salle n°{index}",
+            attendees=10,
+        )
+        for index in range(3)
+    ]
+
+    list(stream=True)
+
+    for extra_event in extra_events:
+        extra_event.delete_instance()
+
+    captured = capsys.readouterr()
+
+    assert captured.out.count("Tableau des évènements") == 1
+    assert captured.out.count("┏") == 1
+    assert captured.out.count("└") == 2
+
+
+def test_list_json_format_with_empty_database(monkey_token_check_management, capsys):
+    """
+    GIVEN a collaborator with management privileges and an empty dataset of events
+    WHEN the list() function is called with the json format
+    THEN an empty JSON list should be written instead of the empty database message
+    """
+    list(output_format="json")
+
+    captured = capsys.readouterr()
+
+    assert json.loads(captured.out) == []
+
+
+def test_list_tsv_format_without_support(
+    monkey_token_check_management, fake_event_no_support, capsys
+):
+    """
+    GIVEN a collaborator with management privileges and an event without support
+    WHEN the list() function is called with the tsv format
+    THEN the event should be written with empty support columns
+    """
+    list(output_format="tsv")
+
+    captured = capsys.readouterr()
+    header, row = captured.out.splitlines()
+
+    assert header.split("\t")[-3:] == [
+        "support_id",
+        "support_first_name",
+        "support_name",
+    ]
+    assert row.split("\t")[-3:] == ["", "", ""]
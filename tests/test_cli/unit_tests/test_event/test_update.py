@@ -1,6 +1,8 @@
 import pytest
 from typer import Exit
+from epicevents.data_access_layer import database
 from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.instrumentation import QueryRecorder
 from epicevents.cli.event import update
 
 
@@ -257,3 +259,70 @@ def test_update_fails_without_authentication(
     captured = capsys.readouterr()
 
     assert "Veuillez vous authentifier et réessayer." in captured.out.strip()
+
+
+def test_set_updates_several_fields_in_one_statement(
+    monkey_token_check_management, fake_event, fake_collaborator_support2, capsys
+):
+    """
+    GIVEN a collaborator with management privileges and an event
+    WHEN the update() function is called with several --set pairs to reschedule the event
+    THEN the fields should be written by a single UPDATE of the changed columns only
+    """
+    with QueryRecorder(database.psql_db) as recorder:
+        update(
+            fake_event.id,
+            assignments=[
+                "start_date=2024-06-20 18:00",
+                "end_date=2024-06-21 02:00",
+                "location=Lyon",
+                f"support={fake_collaborator_support2.id}",
+            ],
+        )
+
+    updated_event = Event.get(Event.id == fake_event.id)
+    captured = capsys.readouterr()
+    [statement] = [
+        record.sql for record in recorder.records if record.sql.startswith("UPDATE")
+    ]
+
+    assert str(updated_event.start_date).startswith("2024-06-20 18:00")
+    assert str(updated_event.end_date).startswith("2024-06-21 02:00")
+    assert updated_event.location == "Lyon"
+    assert updated_event.support.id == fake_collaborator_support2.id
+    assert '"notes"' not in statement and '"attendees"' not in statement
+    assert (
+        "Les champs 'Date de début', 'Date de fin', 'Localisation', 'Assistant en charge'"
+        in captured.out
+    )
+    assert "penser à modifier la date de fin" not in captured.out
+
+
+def test_set_validates_all_fields_before_writing(
+    monkey_token_check_management, fake_event
+):
+    """
+    GIVEN a collaborator with management privileges and an event
+    WHEN the update() function is called with a valid location and an invalid date
+    THEN nothing should be written
+    """
+    with pytest.raises(ValueError):
+        update(fake_event.id, assignments=["location=Lyon", "end_date=demain"])
+
+    assert Event.get(Event.id == fake_event.id).location == fake_event.location
+
+
+def test_set_rejects_an_unknown_field(
+    monkey_token_check_management, fake_event, capsys
+):
+    """
+    GIVEN a collaborator with management privileges and an event
+    WHEN the update() function is called with a --set pair naming an unknown field
+    THEN the function should exit with the list of the fields that can be set
+    """
+    with pytest.raises(Exit):
+        update(fake_event.id, assignments=["place=Lyon"])
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez choisir un champ parmi : contract, support" in captured.out
@@ -0,0 +1,63 @@
+import runpy
+import dotenv
+import pytest
+from playhouse.migrate import SqliteMigrator
+from epicevents.data_access_layer import database, migrations
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.department import Department
+
+ADMIN_EMAIL = "admin@epicevents.com"
+
+
+@pytest.fixture()
+def environment(monkeypatch):
+    migrator = SqliteMigrator(database.psql_db)
+    monkeypatch.setattr(migrations, "get_migrator", lambda: migrator)
+    monkeypatch.setattr(
+        dotenv,
+        "get_key",
+        lambda path, key: {"ADMIN_EMAIL": ADMIN_EMAIL, "ADMIN_PASSWORD": "secret"}[key],
+    )
+
+    yield
+
+    Collaborator.delete().where(Collaborator.email == ADMIN_EMAIL).execute()
+    Company.delete().execute()
+    Department.delete().execute()
+    database.psql_db.execute_sql("DROP TABLE IF EXISTS schema_migration")
+
+
+def test_create_db_runs_as_a_module(environment):
+    """
+    GIVEN an empty database
+    WHEN create_db is run with "python -m epicevents.create_db"
+    THEN the departments, companies and admin user should be created, and the database left open
+    """
+    runpy.run_module("epicevents.create_db", run_name="__main__")
+
+    assert [department.name for department in Department.select()] == [
+        "Management",
+        "Sales",
+        "Support",
+    ]
+    assert Company.select().count() == 3
+    assert Collaborator.get(Collaborator.email == ADMIN_EMAIL).first_name == "Admin"
+    assert not database.psql_db.is_closed()
+
+
+def test_create_db_can_be_run_again(environment):
+    """
+    GIVEN a database created by create_db
+    WHEN create_db is run a second time
+    THEN it should succeed without duplicating the departments, companies, admin user or migrations
+    """
+    runpy.run_module("epicevents.create_db", run_name="__main__")
+    runpy.run_module("epicevents.create_db", run_name="__main__")
+
+    assert Department.select().count() == 3
+    assert Company.select().count() == 3
+    assert Collaborator.select().where(Collaborator.email == ADMIN_EMAIL).count() == 1
+    migration_status = migrations.status(migrations.get_migrator())
+    assert [name for name, _ in migration_status] == migrations.MIGRATIONS
+    assert all(applied_at is not None for _, applied_at in migration_status)
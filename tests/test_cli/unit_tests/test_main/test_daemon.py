@@ -0,0 +1,84 @@
+import io
+import json
+import socket
+from epicevents import audit, daemon
+from epicevents.__main__ import create_app
+
+
+def _run_in_daemon(args):
+    """Sends a command to the daemon's request handler over a socket pair."""
+    client_connection, daemon_connection = socket.socketpair()
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+
+    with client_connection, daemon_connection:
+        daemon.send_request(client_connection, args)
+        daemon.handle_request(create_app(args), daemon_connection)
+        code = daemon.receive_response(client_connection, stdout, stderr)
+
+    return code, stdout.getvalue().decode("utf-8")
+
+
+def test_forward_without_daemon(tmp_path):
+    """
+    GIVEN no daemon listening on the socket
+    WHEN a command is forwarded
+    THEN it should be handed back to run in-process
+    """
+    assert daemon.forward(["clients", "list"], str(tmp_path / "absent.sock")) is None
+
+
+def test_daemon_runs_commands(monkey_token_check_management, fake_client):
+    """
+    GIVEN a valid management collaborator token and a client
+    WHEN the daemon runs a command listing the clients as JSON
+    THEN the output and a zero exit code should be sent back
+    """
+    code, output = _run_in_daemon(
+        ["clients", "list", "--format", "json", "--after", str(fake_client.id - 1)]
+    )
+
+    clients = json.loads(output)
+
+    assert code == 0
+    assert clients[0]["email"] == fake_client.email
+
+
+def test_daemon_flushes_audit_events_after_each_command(
+    monkey_token_check_management, monkeypatch
+):
+    """
+    GIVEN a daemon which keeps running between commands
+    WHEN it runs two commands
+    THEN the audit events should be flushed after each of them
+    """
+    flushes = []
+    monkeypatch.setattr(audit, "flush_in_background", lambda: flushes.append(True))
+
+    _run_in_daemon(["clients", "list", "--format", "json"])
+    _run_in_daemon(["clients", "list", "--order-by", "unknown"])
+
+    assert len(flushes) == 2
+
+
+def test_daemon_sends_back_exit_codes(monkey_token_check_management):
+    """
+    GIVEN a valid management collaborator token
+    WHEN the daemon runs a command exiting with an error
+    THEN its message and its exit code should be sent back
+    """
+    code, output = _run_in_daemon(["clients", "list", "--order-by", "unknown"])
+
+    assert code == 1
+    assert "Veuillez choisir un champ de tri parmi" in output
+
+
+def test_daemon_hands_back_interactive_commands(monkey_token_check_correct_sales):
+    """
+    GIVEN a valid sales collaborator token
+    WHEN the daemon runs a command prompting for its options
+    THEN the command should be handed back without any output
+    """
+    code, output = _run_in_daemon(["clients", "create"])
+
+    assert code is None
+    assert output == ""
@@ -0,0 +1,33 @@
+import pytest
+from playhouse.migrate import SqliteMigrator
+from epicevents.__main__ import main
+from epicevents.data_access_layer import database, migrations
+
+
+@pytest.fixture()
+def migrator(monkeypatch):
+    migrator = SqliteMigrator(database.psql_db)
+    monkeypatch.setattr(migrations, "get_migrator", lambda: migrator)
+
+    yield migrator
+
+    database.psql_db.execute_sql("DROP TABLE IF EXISTS schema_migration")
+
+
+def test_migrate_applies_the_pending_migrations(migrator, capsys):
+    """
+    GIVEN a database without any applied migration
+    WHEN the migrate command is run twice
+    THEN the migrations should be applied by the first run only
+    """
+    with pytest.raises(SystemExit):
+        main(["migrate"])
+    with pytest.raises(SystemExit):
+        main(["migrate"])
+    with pytest.raises(SystemExit):
+        main(["migrate", "--list"])
+
+    output = capsys.readouterr().out
+    assert "Migration m0001_indexes appliquée." in output
+    assert "Aucune migration en attente." in output
+    assert "m0001_indexes : appliquée le" in output
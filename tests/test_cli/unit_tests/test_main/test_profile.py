@@ -0,0 +1,46 @@
+import pytest
+from epicevents.__main__ import main
+from epicevents.profiling import command_args
+
+
+def test_command_args_skip_the_global_options():
+    """
+    GIVEN arguments starting with the profile options
+    WHEN the command arguments are read
+    THEN the options should be skipped along with their value
+    """
+    assert command_args(
+        ["--profile", "--profile-dump", "profil", "clients", "list"]
+    ) == ["clients", "list"]
+    assert command_args(["--profile-dump=profil", "migrate"]) == ["migrate"]
+
+
+def test_profile_prints_a_summary(
+    monkey_token_check_management, fake_client, capsys, tmp_path
+):
+    """
+    GIVEN a management collaborator and a client
+    WHEN the clients are listed with the profile options
+    THEN a summary of the queries, durations and memory should be printed
+    AND the cProfile and the allocations should be written
+    """
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--profile",
+                "--profile-dump",
+                str(tmp_path),
+                "clients",
+                "list",
+                "--format",
+                "json",
+            ]
+        )
+
+    captured = capsys.readouterr()
+    assert '"email": "' in captured.out
+    assert "Requêtes SQL : 1 " in captured.err
+    assert "Pic de mémoire" in captured.err
+    assert "epicevents/cli/listing.py" in captured.err
+    assert (tmp_path / "profile.pstats").exists()
+    assert (tmp_path / "tracemalloc.txt").exists()
@@ -0,0 +1,86 @@
+from epicevents import audit
+from epicevents.__main__ import create_app
+from epicevents.cli import collaborator as clicollaborator
+from epicevents.cli.shell import run_shell
+
+
+def _read_lines(lines):
+    """Returns an input function reading the given lines, then the end of the input."""
+    remaining_lines = iter(lines)
+
+    def read_line(prompt):
+        try:
+            return next(remaining_lines)
+        except StopIteration:
+            raise EOFError
+
+    return read_line
+
+
+def test_shell_reuses_the_verified_principal(monkeypatch, valid_token, capsys):
+    """
+    GIVEN a valid token and a shell running two commands
+    WHEN the commands are run
+    THEN the token should be read and verified for the first command only
+    AND the session should be forgotten when the shell ends
+    """
+    token_reads = []
+
+    def read_token():
+        token_reads.append(valid_token)
+        return valid_token
+
+    monkeypatch.setattr(clicollaborator, "_read_token", read_token)
+
+    run_shell(
+        create_app([]),
+        _read_lines(["clients list --format json", "events list --format json"]),
+    )
+
+    assert len(token_reads) == 1
+    assert clicollaborator.shell_session is None
+
+
+def test_shell_survives_failing_commands(monkey_token_check_management, capsys):
+    """
+    GIVEN a shell running an unknown command, a command exiting with an error and an exit command
+    WHEN the commands are run
+    THEN the shell should go on after each failure and stop on the exit command
+    """
+    run_shell(
+        create_app([]),
+        _read_lines(
+            [
+                "unknown",
+                "clients list --order-by unknown",
+                "shell",
+                "exit",
+                "clients list",
+            ]
+        ),
+    )
+
+    captured = capsys.readouterr()
+
+    assert "Veuillez choisir un champ de tri parmi" in captured.out
+    assert "Vous êtes déjà dans le shell." in captured.out
+    assert "Tableau des clients" not in captured.out
+
+
+def test_shell_flushes_audit_events_after_each_command(
+    monkey_token_check_management, monkeypatch, capsys
+):
+    """
+    GIVEN a shell running two commands, the second one failing
+    WHEN the commands are run
+    THEN the audit events should be flushed after each of them
+    """
+    flushes = []
+    monkeypatch.setattr(audit, "flush_in_background", lambda: flushes.append(True))
+
+    run_shell(
+        create_app([]),
+        _read_lines(["clients list --format json", "clients list --order-by unknown"]),
+    )
+
+    assert len(flushes) == 2
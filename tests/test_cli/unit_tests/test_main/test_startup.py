@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import pytest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from epicevents.__main__ import _runs_a_command, create_app, main
+from epicevents.data_access_layer import database, seed
+from epicevents.settings import get_settings
+
+LAZY_MODULES = (
+    "argon2",
+    "sentry_sdk",
+    "playhouse.migrate",
+    "epicevents.cli.contract",
+    "epicevents.cli.event",
+)
+
+
+def test_create_app_only_imports_the_invoked_group():
+    """
+    GIVEN a fresh interpreter
+    WHEN the application is created for the "clients list" command
+    THEN argon2, Sentry, the migrator and the other command groups should not be imported
+    """
+    script = (
+        "import sys; from epicevents.__main__ import create_app; "
+        "create_app(['clients', 'list']); "
+        f"print([module for module in {LAZY_MODULES!r} if module in sys.modules])"
+    )
+
+    completed_process = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+
+    assert completed_process.stdout.strip() == "[]"
+
+
+def test_create_app_registers_every_group_for_help():
+    """
+    GIVEN no invoked command group
+    WHEN the application is created
+    THEN every command group should be registered
+    """
+    app = create_app(["--help"])
+
+    assert {group.name for group in app.registered_groups} == {
+        "collaborators",
+        "clients",
+        "contracts",
+        "events",
+        "audit",
+        "admin",
+    }
+
+
+def test_settings_are_read_once():
+    """
+    GIVEN the settings of the software
+    WHEN they are requested twice
+    THEN the same object should be returned
+    """
+    assert get_settings() is get_settings()
+
+
+class StandInSeeder:
+    """Stands for the seeder, generating no row."""
+
+    def __init__(self, scale, random_seed, password):
+        pass
+
+    def run(self, on_progress=None):
+        return SimpleNamespace(
+            collaborators=0, companies=0, clients=0, contracts=0, events=0
+        )
+
+
+def test_command_without_options_runs_in_command_context(monkeypatch, capsys):
+    """
+    GIVEN the seed command, invoked without any option
+    WHEN it is run from the command line
+    THEN it should run inside command_context(), under its own name
+    """
+    contexts = []
+
+    @contextmanager
+    def recording_command_context(database=None, command=None):
+        contexts.append(command)
+        yield
+
+    monkeypatch.setattr(database, "command_context", recording_command_context)
+    monkeypatch.setattr(seed, "Seeder", StandInSeeder)
+
+    with pytest.raises(SystemExit):
+        main(["seed"])
+
+    assert contexts == ["seed"]
+
+
+def test_groups_and_help_do_not_run_a_command():
+    """
+    GIVEN arguments naming a command group alone, or asking for help
+    WHEN they are resolved against the application
+    THEN they should not be taken for a command, unlike a command of a group
+    """
+    app = create_app(["clients"])
+
+    assert not _runs_a_command(app, ["clients"])
+    assert not _runs_a_command(app, ["clients", "list", "--help"])
+    assert _runs_a_command(app, ["clients", "list"])
+    assert _runs_a_command(create_app(["seed"]), ["--profile", "seed"])
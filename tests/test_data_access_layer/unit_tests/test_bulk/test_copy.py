@@ -0,0 +1,82 @@
+from contextlib import nullcontext
+from datetime import date
+from peewee import PostgresqlDatabase
+from epicevents.data_access_layer import bulk, row_security
+from epicevents.data_access_layer.client import Client
+
+
+class RecordingCursor:
+    """Keeps the statements and payloads sent with copy_expert()."""
+
+    def __init__(self, copies):
+        self.copies = copies
+
+    def copy_expert(self, sql, file):
+        self.copies.append((sql, file.read()))
+
+
+class RecordingDatabase(PostgresqlDatabase):
+    """A PostgreSQL database recording its COPY and other statements instead of running them."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.copies = []
+        self.statements = []
+
+    def atomic(self, *args, **kwargs):
+        return nullcontext()
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self.copies)
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.statements.append(sql)
+        return RecordingCursor(self.copies)
+
+
+def test_copy_writes_null_as_an_unquoted_empty_field():
+    """
+    GIVEN client rows with a missing phone, an empty name and a quoted first name
+    WHEN they are loaded with a COPY
+    THEN NULL should be an unquoted empty field, and the other values quoted
+    """
+    recording_database = RecordingDatabase()
+    fields = [
+        Client.id,
+        Client.first_name,
+        Client.name,
+        Client.phone,
+        Client.creation_date,
+    ]
+
+    bulk._copy_rows(
+        recording_database,
+        Client,
+        fields,
+        [[1, 'Jean "Jo"', "", None, date(2024, 1, 2)]],
+    )
+
+    [(sql, payload)] = recording_database.copies
+    assert sql == (
+        'COPY "client" ("id", "first_name", "name", "phone", "creation_date") '
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    assert payload == '"1","Jean ""Jo""","",,"2024-01-02"\n'
+
+
+def test_row_level_security_mode_loads_rows_with_insert(monkeypatch):
+    """
+    GIVEN a PostgreSQL database in the row-level security mode
+    WHEN client rows are loaded
+    THEN they should be inserted with INSERT statements, as COPY FROM is refused under the policies
+    """
+    recording_database = RecordingDatabase()
+    monkeypatch.setattr(row_security, "ENABLED", True)
+    monkeypatch.setattr(Client._meta, "database", recording_database)
+
+    bulk.load_rows(Client, [Client.id, Client.name], [[1, "Hermite"], [2, "Dupont"]])
+
+    assert recording_database.copies == []
+    assert [
+        statement.split(" (")[0] for statement in recording_database.statements
+    ] == ['INSERT INTO "client"']
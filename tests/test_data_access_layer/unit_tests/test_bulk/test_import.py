@@ -0,0 +1,191 @@
+import csv
+import json
+import os
+import pytest
+from epicevents.data_access_layer.bulk import (
+    BulkImporter,
+    ClientImporter,
+    ContractImporter,
+    EventImporter,
+)
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.event import Event
+
+
+def _write_csv(path, headers, rows):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def _read_rejects(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [*csv.DictReader(file)]
+
+
+@pytest.fixture()
+def imported_clients():
+    clients = []
+
+    yield clients
+
+    Client.delete().where(Client.email.in_(clients)).execute()
+
+
+def test_client_import_loads_valid_rows_and_reports_rejects(
+    tmp_path, fake_company, fake_collaborator_sales, imported_clients
+):
+    """
+    GIVEN a CSV file with valid rows, a duplicate email and an unknown company
+    WHEN it is imported in batches of two rows
+    THEN the valid rows should be loaded and the others reported with their line
+    """
+    path = str(tmp_path / "clients.csv")
+    _write_csv(
+        path,
+        ["first_name", "name", "email", "phone", "company"],
+        [
+            ["Bob", "Eponge", "bob@import.fr", "0600000001", fake_company.id],
+            ["Patrick", "Etoile", "patrick@import.fr", "0600000002", fake_company.id],
+            ["Carlo", "Tentacule", "bob@import.fr", "0600000003", fake_company.id],
+            ["Sandy", "Ecureuil", "sandy@import.fr", "0600000004", 9999],
+        ],
+    )
+    imported_clients.extend(["bob@import.fr", "patrick@import.fr"])
+
+    report = ClientImporter(fake_collaborator_sales.id, batch_size=2).import_file(path)
+
+    clients = Client.select().where(Client.email.in_(imported_clients))
+    rejects = _read_rejects(report.rejects_path)
+
+    assert report.imported == 2
+    assert report.rejected == 2
+    assert {client.collaborator_id for client in clients} == {
+        fake_collaborator_sales.id
+    }
+    assert [reject["line"] for reject in rejects] == ["4", "5"]
+    assert "email" in rejects[0]["reason"]
+    assert not os.path.exists(f"{path}.checkpoint")
+
+
+def test_client_import_resumes_after_checkpoint(
+    tmp_path, fake_company, fake_collaborator_sales, imported_clients
+):
+    """
+    GIVEN a checkpoint recording that the first batch of a file was imported
+    WHEN the import is resumed
+    THEN only the rows located after the checkpoint should be imported
+    """
+    path = str(tmp_path / "clients.csv")
+    _write_csv(
+        path,
+        ["first_name", "name", "email", "phone", "company"],
+        [
+            ["Bob", "Eponge", "bob@import.fr", "0600000001", fake_company.id],
+            ["Patrick", "Etoile", "patrick@import.fr", "0600000002", fake_company.id],
+        ],
+    )
+    with open(f"{path}.checkpoint", "w", encoding="utf-8") as checkpoint_file:
+        json.dump({"imported": 1, "rejected": 0, "last_line": 2}, checkpoint_file)
+    imported_clients.extend(["bob@import.fr", "patrick@import.fr"])
+
+    report = ClientImporter(fake_collaborator_sales.id).import_file(path, resume=True)
+
+    assert report.imported == 2
+    assert Client.get_or_none(Client.email == "bob@import.fr") is None
+    assert Client.get_or_none(Client.email == "patrick@import.fr") is not None
+    assert not os.path.exists(f"{path}.checkpoint")
+
+
+def test_contract_import_reads_jsonl(tmp_path, fake_client, fake_collaborator_sales):
+    """
+    GIVEN a JSONL file with a valid contract, an unreadable line and a negative sum
+    WHEN it is imported
+    THEN the contract should be assigned to the collaborator of its client
+    AND the two other lines should be rejected
+    """
+    path = str(tmp_path / "contracts.jsonl")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(
+            json.dumps({"client": fake_client.id, "total_sum": 4200, "signed": "oui"})
+        )
+        file.write("\n{not json\n")
+        file.write(json.dumps({"client": fake_client.id, "total_sum": -1}))
+        file.write("\n")
+
+    report = ContractImporter().import_file(path)
+
+    created_contracts = [*Contract.select().where(Contract.total_sum == 4200)]
+
+    assert report.imported == 1
+    assert report.rejected == 2
+    assert created_contracts[0].collaborator_id == fake_collaborator_sales.id
+    assert created_contracts[0].signed is True
+
+    for created_contract in created_contracts:
+        created_contract.delete_instance()
+
+
+def test_event_import_rejects_unsigned_contracts(
+    tmp_path,
+    fake_contract,
+    fake_contract_unsigned,
+    fake_collaborator_sales,
+    fake_collaborator_support,
+):
+    """
+    GIVEN a CSV file with an event for a signed contract and one for an unsigned contract
+    WHEN it is imported by the sales collaborator of the client
+    THEN only the event of the signed contract should be imported
+    """
+    path = str(tmp_path / "events.csv")
+    _write_csv(
+        path,
+        ["contract", "support", "start_date", "end_date", "location", "attendees"],
+        [
+            [
+                fake_contract.id,
+                fake_collaborator_support.id,
+                "2030-01-01 10:00",
+                "2030-01-02 18:00",
+                "Bikini Bottom",
+                50,
+            ],
+            [
+                fake_contract_unsigned.id,
+                "",
+                "2030-01-01 10:00",
+                "2030-01-02 18:00",
+                "Bikini Bottom",
+                50,
+            ],
+        ],
+    )
+
+    report = EventImporter(fake_collaborator_sales.id).import_file(path)
+
+    created_events = [*Event.select().where(Event.contract == fake_contract.id)]
+    rejects = _read_rejects(report.rejects_path)
+
+    assert report.imported == 1
+    assert created_events[0].support_id == fake_collaborator_support.id
+    assert "signé" in rejects[0]["reason"]
+
+    for created_event in created_events:
+        created_event.delete_instance()
+
+
+def test_importer_needs_a_row_builder():
+    """
+    GIVEN an importer which does not build instances from rows
+    WHEN it is created
+    THEN it should be refused
+    """
+
+    class IncompleteImporter(BulkImporter):
+        model = Client
+
+    with pytest.raises(TypeError):
+        IncompleteImporter()
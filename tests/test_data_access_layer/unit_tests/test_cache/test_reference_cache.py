@@ -0,0 +1,101 @@
+import time
+from epicevents.data_access_layer import cache
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+
+
+def _refuse_queries(*args, **kwargs):
+    raise AssertionError("The database should not be queried.")
+
+
+def test_get_cached_reads_through(fake_company, monkeypatch):
+    """
+    GIVEN a company already looked up once
+    WHEN it is looked up again
+    THEN it should be returned from the cache without a query
+    """
+    Company.get_cached(fake_company.id)
+    monkeypatch.setattr(Company, "get_or_none", _refuse_queries)
+
+    cached_company = Company.get_cached(fake_company.id)
+
+    assert cached_company.id == fake_company.id
+    assert cached_company.name == "Total"
+    assert not cached_company.is_dirty()
+
+
+def test_save_invalidates_the_cache(fake_company):
+    """
+    GIVEN a company already looked up once
+    WHEN it is renamed
+    THEN the next lookup should return the new name
+    """
+    Company.get_cached(fake_company.id)
+    fake_company.name = "Totalenergies"
+    fake_company.save()
+
+    assert Company.get_cached(fake_company.id).name == "Totalenergies"
+
+
+def test_delete_invalidates_the_cache(fake_company2):
+    """
+    GIVEN a company already looked up once
+    WHEN it is deleted
+    THEN the next lookup should find nothing
+    """
+    company_id = fake_company2.id
+    Company.get_cached(company_id)
+    Company.get_by_id(company_id).delete_instance()
+
+    assert Company.get_cached(company_id) is None
+
+
+def test_passwords_are_not_cached(fake_collaborator_sales, reference_cache):
+    """
+    GIVEN a collaborator already looked up once
+    WHEN the cache is inspected
+    THEN the password hash should not be in it
+    """
+    Collaborator.get_cached(fake_collaborator_sales.id)
+
+    cached_data = reference_cache.get(
+        Collaborator._cache_namespace(), fake_collaborator_sales.id
+    )
+
+    assert cached_data["email"] == fake_collaborator_sales.email
+    assert "password" not in cached_data
+
+
+def test_entries_expire(monkeypatch):
+    """
+    GIVEN an entry cached for 10 seconds
+    WHEN it is read 11 seconds later
+    THEN it should be missing
+    """
+    reference_cache = cache.ReferenceCache(ttl=10)
+    reference_cache.set("test.company", 1, {"id": 1, "name": "Total"})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+
+    assert reference_cache.get("test.company", 1) is None
+
+
+def test_entries_persist_across_invocations(tmp_path):
+    """
+    GIVEN an entry cached in a cache file
+    WHEN another cache reads the same file
+    THEN the entry should be found until it is invalidated
+    """
+    path = str(tmp_path / "reference_cache.sqlite3")
+    cache.ReferenceCache(ttl=300, path=path).set(
+        "test.company", 1, {"id": 1, "name": "Total"}
+    )
+
+    assert cache.ReferenceCache(ttl=300, path=path).get("test.company", 1) == {
+        "id": 1,
+        "name": "Total",
+    }
+
+    cache.ReferenceCache(ttl=300, path=path).invalidate("test.company", 1)
+
+    assert cache.ReferenceCache(ttl=300, path=path).get("test.company", 1) is None
@@ -2,6 +2,7 @@ import pytest
 from datetime import datetime, timedelta, timezone
 from peewee import IntegrityError
 from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.passwords import get_password_hasher
 from epicevents.cli.collaborator import MANAGEMENT_DEPARTMENT_ID
 
 
@@ -160,3 +161,37 @@ def test_collaborator_get_data(fake_department_sales):
     }
 
     assert collaborator_data == expected_result
+
+
+def test_collaborator_update_keeps_password_hash(fake_collaborator_management):
+    """
+    GIVEN a collaborator loaded from the database
+    WHEN another field than the password is updated and saved
+    THEN the stored password hash should be kept and still match the password
+    """
+    collaborator = Collaborator.get_by_id(fake_collaborator_management.id)
+    password_hash = collaborator.password
+
+    collaborator.first_name = "Gerard"
+    collaborator.save()
+
+    updated_collaborator = Collaborator.get_by_id(collaborator.id)
+
+    assert updated_collaborator.password == password_hash
+    assert get_password_hasher().verify(updated_collaborator.password, "testpass")
+
+
+def test_collaborator_password_update_is_hashed(fake_collaborator_management):
+    """
+    GIVEN a collaborator loaded from the database
+    WHEN a new plain text password is set and saved
+    THEN the new password should be hashed once
+    """
+    collaborator = Collaborator.get_by_id(fake_collaborator_management.id)
+
+    collaborator.password = "newpass"
+    collaborator.save()
+
+    updated_collaborator = Collaborator.get_by_id(collaborator.id)
+
+    assert get_password_hasher().verify(updated_collaborator.password, "newpass")
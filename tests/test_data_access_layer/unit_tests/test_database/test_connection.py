@@ -0,0 +1,138 @@
+import pytest
+from peewee import SqliteDatabase, OperationalError
+from epicevents import audit
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.department import Department
+
+
+class FailingConnectionMixin:
+    """Fails to connect a given number of times before connecting."""
+
+    def __init__(self, *args, failures=0, **kwargs):
+        self.failures = failures
+        self.connection_attempts = 0
+        super().__init__(*args, **kwargs)
+
+    def _connect(self):
+        self.connection_attempts += 1
+        if self.connection_attempts <= self.failures:
+            raise OperationalError("Connexion refusée.")
+        return super()._connect()
+
+
+class FlakySqliteDatabase(database.RetryMixin, FailingConnectionMixin, SqliteDatabase):
+    """A SQLite database retrying its failing connections."""
+
+
+def test_connect_retries_on_transient_errors():
+    """
+    GIVEN a database whose first two connection attempts fail
+    WHEN a connection is opened
+    THEN the connection should be retried until it succeeds
+    """
+    flaky_db = FlakySqliteDatabase(":memory:", failures=2, retry_backoff=0)
+
+    flaky_db.connect()
+
+    assert flaky_db.connection_attempts == 3
+    assert not flaky_db.is_closed()
+
+    flaky_db.close()
+
+
+def test_connect_gives_up_after_retries():
+    """
+    GIVEN a database whose connection attempts keep failing
+    WHEN a connection is opened
+    THEN the error should be raised once the retries are exhausted
+    """
+    flaky_db = FlakySqliteDatabase(":memory:", failures=10, retries=2, retry_backoff=0)
+
+    with pytest.raises(OperationalError):
+        flaky_db.connect()
+
+    assert flaky_db.connection_attempts == 3
+
+
+def test_command_context_commits_on_success():
+    """
+    GIVEN a command creating a row and exiting with a zero code
+    WHEN it runs inside command_context()
+    THEN the row should be committed
+    """
+    with pytest.raises(SystemExit):
+        with database.command_context():
+            Department.create(name="Finance")
+            raise SystemExit(0)
+
+    created_department = Department.get_or_none(Department.name == "Finance")
+
+    assert created_department is not None
+
+    created_department.delete_instance()
+
+
+def test_command_context_rolls_back_on_failure():
+    """
+    GIVEN a command creating a row and exiting with an error code
+    WHEN it runs inside command_context()
+    THEN the row should be rolled back and the connection should stay open
+    """
+    with pytest.raises(SystemExit):
+        with database.command_context():
+            Department.create(name="Finance")
+            raise SystemExit(1)
+
+    assert Department.get_or_none(Department.name == "Finance") is None
+    assert not database.psql_db.is_closed()
+
+
+def test_command_context_spools_audit_events_after_commit(audit_spool, monkeypatch):
+    """
+    GIVEN a command recording an audit event with a configured Sentry DSN
+    WHEN it runs inside command_context() and succeeds
+    THEN the event should only be spooled once the transaction is committed
+    """
+    monkeypatch.setattr(audit, "DSN", "http://public@127.0.0.1/42")
+
+    with database.command_context():
+        audit.record("[SIGNATURE CONTRAT N°1 PAR COLLABORATEUR N°2]")
+        spooled_before_commit = audit_spool.count()
+
+    assert spooled_before_commit == 0
+    assert audit_spool.count() == 1
+
+
+def test_command_context_drops_audit_events_on_rollback(audit_spool, monkeypatch):
+    """
+    GIVEN a command recording an audit event with a configured Sentry DSN
+    WHEN it runs inside command_context() and exits with an error code
+    THEN the event should not be spooled, and later events should be spooled at once
+    """
+    monkeypatch.setattr(audit, "DSN", "http://public@127.0.0.1/42")
+
+    with pytest.raises(SystemExit):
+        with database.command_context():
+            audit.record("[SIGNATURE CONTRAT N°1 PAR COLLABORATEUR N°2]")
+            raise SystemExit(1)
+
+    assert audit_spool.count() == 0
+
+    audit.record("[SIGNATURE CONTRAT N°3 PAR COLLABORATEUR N°2]")
+
+    assert audit_spool.count() == 1
+
+
+def test_pooled_database_is_selected_by_environment(monkeypatch):
+    """
+    GIVEN the DB_POOL flag enabled in the environment configuration
+    WHEN the database is created
+    THEN a pooled database with the configured limits should be returned
+    """
+    monkeypatch.setattr(database, "DB_POOL", True)
+    monkeypatch.setattr(database, "DB_POOL_MAX_CONNECTIONS", 4)
+
+    pooled_db = database._create_database()
+
+    assert isinstance(pooled_db, database.ReliablePooledPostgresqlDatabase)
+    assert pooled_db._max_connections == 4
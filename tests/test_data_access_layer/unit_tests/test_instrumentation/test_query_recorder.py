@@ -0,0 +1,36 @@
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.instrumentation import QueryRecorder
+
+
+def test_recorder_records_statements_and_call_sites(fake_company):
+    """
+    GIVEN a query recorder installed on the database
+    WHEN a company is looked up twice
+    THEN both statements should be recorded with the line that ran them
+    """
+    with QueryRecorder(database.psql_db) as recorder:
+        for _ in range(2):
+            Company.get_or_none(Company.id == fake_company.id)
+
+    assert recorder.count == 2
+    assert recorder.records[0].sql.startswith('SELECT "t1"."id", "t1"."name"')
+    assert recorder.records[0].params[0] == fake_company.id
+    [(call_site, count, duration)] = recorder.by_call_site()
+    assert call_site.startswith("tests/test_data_access_layer/")
+    assert count == 2
+    assert duration == recorder.duration
+
+
+def test_recorder_puts_the_database_back():
+    """
+    GIVEN a query recorder installed on the database
+    WHEN it is uninstalled
+    THEN statements should no longer be recorded
+    """
+    with QueryRecorder(database.psql_db) as recorder:
+        pass
+    database.psql_db.execute_sql("SELECT 1")
+
+    assert recorder.count == 0
+    assert "execute_sql" not in database.psql_db.__dict__
@@ -0,0 +1,127 @@
+import pytest
+from peewee import SqliteDatabase
+from playhouse.migrate import SqliteMigrator
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.department import Department
+from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.migrations import m0001_indexes
+from epicevents.data_access_layer.pagination import paginate
+
+MODELS = [Department, Collaborator, Company, Client, Contract, Event]
+FILTER_INDEXES = {
+    "client_collaborator_id_id",
+    "contract_unsigned_id",
+    "contract_unpaid_id",
+    "event_support_id_id",
+    "event_unassigned_id",
+}
+SERIES = (
+    "WITH RECURSIVE series(i) AS "
+    "(SELECT 1 UNION ALL SELECT i + 1 FROM series WHERE i < {rows}) "
+)
+SEED_STATEMENTS = [
+    "INSERT INTO department (name) VALUES ('Management'), ('Sales'), ('Support')",
+    SERIES.format(rows=100)
+    + "INSERT INTO collaborator (first_name, name, email, password, department_id) "
+    "SELECT 'Bench', 'Bench', 'bench-' || i || '@bench.fr', 'x', 2 + i % 2 FROM series",
+    "INSERT INTO company (name) VALUES ('Bench')",
+    SERIES.format(rows=2000) + "INSERT INTO client "
+    "(first_name, name, email, phone, company_id, creation_date, collaborator_id) "
+    "SELECT 'Bench', 'Bench', 'client-' || i || '@bench.fr', 'phone-' || i, 1, "
+    "'2023-01-01', 2 + 2 * (i % 50) FROM series",
+    SERIES.format(rows=20000) + "INSERT INTO contract "
+    "(client_id, collaborator_id, total_sum, amount_due, creation_date, signed) "
+    "SELECT 1 + i % 2000, 2, 1000, CASE WHEN i % 100 = 0 THEN 1000 ELSE 0 END, "
+    "'2023-01-01', i % 100 <> 1 FROM series",
+    SERIES.format(rows=20000) + "INSERT INTO event "
+    "(contract_id, start_date, end_date, location, attendees, support_id) "
+    "SELECT i, '2023-01-01', '2023-01-01', 'Bench', 10, "
+    "CASE WHEN i % 100 = 0 THEN NULL ELSE 1 + 2 * (i % 50) END FROM series",
+]
+
+
+@pytest.fixture()
+def large_database():
+    large_database = SqliteDatabase(":memory:")
+
+    with large_database.bind_ctx(MODELS):
+        large_database.create_tables(MODELS)
+        for statement in SEED_STATEMENTS:
+            large_database.execute_sql(statement)
+        large_database.execute_sql("ANALYZE")
+
+        yield large_database
+
+    large_database.close()
+
+
+def _query_plan(query):
+    """Returns the steps of the SQLite query plan of a query."""
+    sql, params = query.sql()
+    cursor = query.model._meta.database.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def test_index_migration_is_idempotent():
+    """
+    GIVEN a database whose tables already exist
+    WHEN the index migration is applied twice
+    THEN the indexes of the filter commands should exist
+    """
+    migrator = SqliteMigrator(database.psql_db)
+    m0001_indexes.upgrade(migrator)
+    m0001_indexes.upgrade(migrator)
+
+    index_names = {
+        row[0]
+        for row in database.psql_db.execute_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).fetchall()
+    }
+
+    assert FILTER_INDEXES <= index_names
+
+
+@pytest.mark.parametrize(
+    "query_function",
+    [
+        lambda: Contract.select_with_relations().where(Contract.signed == False),
+        lambda: Event.select_with_relations().where(Event.support == None),
+        lambda: Event.select_with_relations().where(Event.support == 3),
+        lambda: Client.select().where(Client.collaborator == 2),
+    ],
+    ids=[
+        "contracts filter -ns",
+        "events filter -s (management)",
+        "events filter -s (support)",
+        "clients of a sales collaborator",
+    ],
+)
+def test_filter_commands_use_an_index(large_database, query_function):
+    """
+    GIVEN 20,000 contracts and events, 1% of them unsigned or unassigned
+    WHEN the query plan of a filter command is read
+    THEN the filtered table should be read through an index
+    """
+    plan = _query_plan(paginate(query_function(), limit=50))
+
+    assert "INDEX" in plan[0]
+
+
+def test_unsigned_contracts_use_their_partial_index(large_database):
+    """
+    GIVEN 20,000 contracts, 1% of them unsigned
+    WHEN the query plan of the "contracts filter -ns" command is read
+    THEN the partial index of the unsigned contracts should be used
+    """
+    plan = _query_plan(
+        paginate(
+            Contract.select_with_relations().where(Contract.signed == False), limit=50
+        )
+    )
+
+    assert "contract_unsigned_id" in plan[0]
@@ -0,0 +1,145 @@
+import pytest
+from peewee import PostgresqlDatabase
+from playhouse.migrate import PostgresqlMigrator, SqliteMigrator
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.migrations import MigrationError, operations
+
+
+class RecordedCursor:
+    """Answers the catalog queries of the operations with no row."""
+
+    def fetchone(self):
+        return None
+
+
+class RecordingDatabase(PostgresqlDatabase):
+    """A PostgreSQL database recording its statements instead of running them."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.statements = []
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.statements.append(sql)
+        return RecordedCursor()
+
+    def in_transaction(self):
+        return False
+
+
+def test_create_index_builds_concurrently_on_postgresql():
+    """
+    GIVEN a PostgreSQL database
+    WHEN the partial index of the unsigned contracts is created
+    THEN it should be built concurrently and only when missing
+    """
+    recording_database = RecordingDatabase()
+    index = next(
+        index
+        for index in Contract._meta.fields_to_index()
+        if index._name == "contract_unsigned_id"
+    )
+
+    operations.create_index(PostgresqlMigrator(recording_database), index)
+
+    assert recording_database.statements[-1].startswith(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "contract_unsigned_id"'
+    )
+
+
+def test_constraints_are_added_not_valid_then_validated():
+    """
+    GIVEN a PostgreSQL database
+    WHEN a check constraint is added, then validated
+    THEN it should be added NOT VALID and validated by a separate statement
+    """
+    recording_database = RecordingDatabase()
+    migrator = PostgresqlMigrator(recording_database)
+
+    operations.add_constraint(
+        migrator, "contract", "contract_amount_due_check", "CHECK (amount_due >= 0)"
+    )
+    operations.validate_constraint(migrator, "contract", "contract_amount_due_check")
+
+    assert recording_database.statements[1:] == [
+        'ALTER TABLE "contract" ADD CONSTRAINT "contract_amount_due_check" '
+        "CHECK (amount_due >= 0) NOT VALID",
+        'ALTER TABLE "contract" VALIDATE CONSTRAINT "contract_amount_due_check"',
+    ]
+
+
+def test_constraints_need_postgresql():
+    """
+    GIVEN a SQLite database
+    WHEN a constraint is added
+    THEN it should be refused
+    """
+    with pytest.raises(MigrationError):
+        operations.add_constraint(
+            SqliteMigrator(database.psql_db),
+            "contract",
+            "contract_amount_due_check",
+            "CHECK (amount_due >= 0)",
+        )
+
+
+def test_backfill_updates_in_batches(fake_contract, fake_contract2, monkeypatch):
+    """
+    GIVEN two contracts, one of them without an amount due
+    WHEN the missing and unpaid amounts are backfilled one row per batch
+    THEN both should be updated, with a pause after each batch
+    """
+    pauses = []
+    monkeypatch.setattr(operations.time, "sleep", pauses.append)
+    contract_ids = [fake_contract.id, fake_contract2.id]
+
+    updated = operations.backfill(
+        SqliteMigrator(database.psql_db),
+        Contract,
+        {Contract.amount_due: 0},
+        Contract.id.in_(contract_ids)
+        & ((Contract.amount_due != 0) | (Contract.amount_due == None)),
+        batch_size=1,
+        pause=0.5,
+    )
+
+    assert updated == 2
+    assert pauses == [0.5, 0.5]
+    assert [
+        contract.amount_due
+        for contract in Contract.select().where(Contract.id.in_(contract_ids))
+    ] == [0, 0]
+
+
+def test_policies_are_created_then_enabled_on_postgresql():
+    """
+    GIVEN a PostgreSQL database without the policy
+    WHEN a row-level security policy is created, then enabled
+    THEN the policy should be created, then row-level security enabled on the table
+    """
+    recording_database = RecordingDatabase()
+    migrator = PostgresqlMigrator(recording_database)
+
+    operations.create_policy(migrator, "event", "event_read", "FOR SELECT USING (true)")
+    operations.enable_row_level_security(migrator, "event")
+
+    assert recording_database.statements[1:] == [
+        'CREATE POLICY "event_read" ON "event" FOR SELECT USING (true)',
+        'ALTER TABLE "event" ENABLE ROW LEVEL SECURITY',
+    ]
+
+
+def test_policies_need_postgresql():
+    """
+    GIVEN a SQLite database
+    WHEN a row-level security policy is created
+    THEN it should be refused
+    """
+    with pytest.raises(MigrationError):
+        operations.create_policy(
+            SqliteMigrator(database.psql_db),
+            "event",
+            "event_read",
+            "FOR SELECT USING (true)",
+        )
@@ -0,0 +1,81 @@
+import pytest
+from peewee import SqliteDatabase
+from playhouse.migrate import PostgresqlMigrator, SqliteMigrator
+from epicevents.data_access_layer import row_security
+from epicevents.data_access_layer.migrations import m0002_row_level_security
+from .test_operations import RecordingDatabase
+
+
+def test_migration_creates_functions_then_policies():
+    """
+    GIVEN a PostgreSQL database
+    WHEN the row-level security migration is applied
+    THEN the setting functions, then the policies should be created without being enabled
+    """
+    recording_database = RecordingDatabase()
+
+    m0002_row_level_security.upgrade(PostgresqlMigrator(recording_database))
+
+    statements = recording_database.statements
+    policies = [
+        statement for statement in statements if statement.startswith("CREATE POLICY")
+    ]
+    assert statements[0].startswith(
+        "CREATE OR REPLACE FUNCTION epicevents_collaborator_id() RETURNS integer"
+    )
+    assert "current_setting('epicevents.department_id', true)" in statements[1]
+    assert len(policies) == 9
+    assert (
+        'CREATE POLICY "event_change" ON "event" FOR UPDATE USING '
+        "(epicevents_department_id() = 1 OR (epicevents_department_id() = 3 "
+        'AND "support_id" = epicevents_collaborator_id())) WITH CHECK (true)'
+    ) in policies
+    assert (
+        'CREATE POLICY "client_change" ON "client" FOR UPDATE USING '
+        '((epicevents_department_id() = 2 AND "collaborator_id" = epicevents_collaborator_id()) '
+        'OR (epicevents_department_id() = 1 AND "collaborator_id" = epicevents_handover_id())) '
+        "WITH CHECK (true)"
+    ) in policies
+    assert not any("ROW LEVEL SECURITY" in statement for statement in statements)
+
+
+@pytest.mark.parametrize("enabled, action", [(True, "ENABLE"), (False, "DISABLE")])
+def test_synchronize_follows_the_setting(enabled, action, monkeypatch):
+    """
+    GIVEN a PostgreSQL database and DB_ROW_LEVEL_SECURITY enabled or not
+    WHEN the row-level security migration is synchronized
+    THEN row-level security should be enabled or disabled on each table accordingly
+    """
+    monkeypatch.setattr(row_security, "ENABLED", enabled)
+    recording_database = RecordingDatabase()
+
+    m0002_row_level_security.synchronize(PostgresqlMigrator(recording_database))
+
+    assert recording_database.statements == [
+        f'ALTER TABLE "{table}" {action} ROW LEVEL SECURITY'
+        for table in ("client", "contract", "event")
+    ]
+
+
+class RecordingSqliteDatabase(SqliteDatabase):
+    """A SQLite database recording its statements instead of running them."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.statements = []
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.statements.append(sql)
+
+
+def test_migration_does_nothing_without_postgresql():
+    """
+    GIVEN a SQLite database, which has no row-level security
+    WHEN the row-level security migration is applied
+    THEN no statement should be run
+    """
+    recording_database = RecordingSqliteDatabase()
+
+    m0002_row_level_security.upgrade(SqliteMigrator(recording_database))
+
+    assert recording_database.statements == []
@@ -0,0 +1,81 @@
+import pytest
+from playhouse.migrate import SqliteMigrator
+from epicevents.data_access_layer import database, migrations
+from epicevents.data_access_layer.migrations import (
+    m0001_indexes,
+    m0002_row_level_security,
+)
+
+
+@pytest.fixture()
+def migrator():
+    migrator = SqliteMigrator(database.psql_db)
+
+    yield migrator
+
+    database.psql_db.execute_sql("DROP TABLE IF EXISTS schema_migration")
+
+
+def test_run_applies_each_migration_once(migrator, monkeypatch):
+    """
+    GIVEN a database without any applied migration
+    WHEN the migrations are run twice
+    THEN each migration should be applied and recorded by the first run only
+    """
+    upgrades = []
+    monkeypatch.setattr(m0001_indexes, "upgrade", upgrades.append)
+
+    first_run = migrations.run(migrator)
+    second_run = migrations.run(migrator)
+
+    assert first_run == ["m0001_indexes", "m0002_row_level_security"]
+    assert second_run == []
+    assert upgrades == [migrator]
+    assert migrations.status(migrator)[0][1] is not None
+
+
+def test_run_synchronizes_the_applied_migrations(migrator, monkeypatch):
+    """
+    GIVEN a migration depending on the settings
+    WHEN the migrations are run twice
+    THEN the migration should be synchronized by both runs, even with nothing pending
+    """
+    synchronized = []
+    monkeypatch.setattr(m0002_row_level_security, "synchronize", synchronized.append)
+
+    migrations.run(migrator)
+    migrations.run(migrator)
+
+    assert synchronized == [migrator, migrator]
+
+
+def test_failing_migration_stays_pending(migrator, monkeypatch):
+    """
+    GIVEN a migration failing halfway
+    WHEN the migrations are run
+    THEN the error should be raised and the migration left pending
+    """
+
+    def failing_upgrade(migrator):
+        raise RuntimeError("Migration interrompue.")
+
+    monkeypatch.setattr(m0001_indexes, "upgrade", failing_upgrade)
+
+    with pytest.raises(RuntimeError):
+        migrations.run(migrator)
+
+    assert migrations.status(migrator) == [
+        ("m0001_indexes", None),
+        ("m0002_row_level_security", None),
+    ]
+
+
+def test_run_refuses_an_open_transaction(migrator):
+    """
+    GIVEN an open transaction
+    WHEN the migrations are run
+    THEN they should be refused, as concurrent index builds cannot run in one
+    """
+    with database.psql_db.atomic():
+        with pytest.raises(migrations.MigrationError):
+            migrations.run(migrator)
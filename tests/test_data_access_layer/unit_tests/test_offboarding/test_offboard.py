@@ -0,0 +1,108 @@
+import pytest
+from epicevents.data_access_layer import database
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.instrumentation import QueryRecorder
+from epicevents.data_access_layer.offboarding import _quotas, offboard
+from epicevents.cli.collaborator import SALES_DEPARTMENT_ID
+
+
+@pytest.fixture()
+def departing_sales(fake_company):
+    departing = Collaborator.create(
+        first_name="Bob",
+        name="Depart",
+        email="bob@depart.fr",
+        password="testpass",
+        department=SALES_DEPARTMENT_ID,
+    )
+    clients = [
+        Client.create(
+            first_name="Client",
+            name="Portefeuille",
+            email=f"client{number}@portefeuille.fr",
+            phone=f"07000000{number:02}",
+            company=fake_company,
+            collaborator=departing,
+        )
+        for number in range(5)
+    ]
+    contracts = [
+        Contract.create(client=client, collaborator=departing, total_sum=1000)
+        for client in clients
+    ]
+
+    yield departing, clients
+
+    for contract in contracts:
+        contract.delete_instance()
+    for client in clients:
+        client.delete_instance()
+    departing.delete_instance()
+
+
+def test_quotas_even_out_the_loads():
+    """
+    GIVEN successors with uneven loads
+    WHEN rows are shared among them
+    THEN the least loaded successors should receive the most rows
+    """
+    assert _quotas({1: 10, 2: 4, 3: 0}, 8) == {1: 0, 2: 2, 3: 6}
+
+
+def test_offboard_shares_the_portfolio_by_load(
+    departing_sales, fake_client, fake_collaborator_sales, fake_collaborator_sales2
+):
+    """
+    GIVEN a departing sales collaborator with five clients and their contracts,
+    and two successors, one of them already owning a client
+    WHEN the collaborator is offboarded
+    THEN the clients should be shared so that both successors own three clients,
+    the contracts should follow their client and the collaborator should be deleted
+    """
+    departing, clients = departing_sales
+
+    with QueryRecorder(database.psql_db) as recorder:
+        report = offboard(
+            departing, [fake_collaborator_sales, fake_collaborator_sales2]
+        )
+
+    owners = [
+        client.collaborator_id
+        for client in Client.select().where(Client.id.in_([c.id for c in clients]))
+    ]
+    updates = [record for record in recorder.records if record.sql.startswith("UPDATE")]
+
+    assert report.clients == 5 and report.events == 0
+    assert report.received == {
+        fake_collaborator_sales.id: 2,
+        fake_collaborator_sales2.id: 3,
+    }
+    assert owners.count(fake_collaborator_sales.id) == 2
+    assert owners.count(fake_collaborator_sales2.id) == 3
+    assert all(
+        contract.collaborator_id == contract.client.collaborator_id
+        for contract in Contract.select().where(
+            Contract.client.in_([c.id for c in clients])
+        )
+    )
+    assert len(updates) == 3
+    assert Collaborator.get_or_none(Collaborator.id == departing.id) is None
+
+
+def test_offboard_rejects_successors_of_another_department(
+    departing_sales, fake_collaborator_support
+):
+    """
+    GIVEN a departing sales collaborator with clients
+    WHEN a support collaborator is given as successor
+    THEN the offboarding should be refused and nothing changed
+    """
+    departing, clients = departing_sales
+
+    with pytest.raises(ValueError):
+        offboard(departing, [fake_collaborator_support])
+
+    assert Client.get_by_id(clients[0].id).collaborator_id == departing.id
+    assert Collaborator.get_or_none(Collaborator.id == departing.id) is not None
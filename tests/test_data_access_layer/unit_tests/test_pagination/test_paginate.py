@@ -0,0 +1,77 @@
+import pytest
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.pagination import paginate
+
+
+def _select_companies(companies):
+    return Company.select().where(Company.id.in_([company.id for company in companies]))
+
+
+@pytest.fixture()
+def companies():
+    names = ["Gamma", "Alpha", "Delta", "Beta", "Epsilon"]
+    created_companies = [Company.create(name=name) for name in names]
+
+    yield created_companies
+
+    for company in created_companies:
+        company.delete_instance()
+
+
+def test_paginate_by_primary_key(companies):
+    """
+    GIVEN a set of companies
+    WHEN paginate() is called with a limit and the ID of the last company of the previous page
+    THEN the next companies should be returned in primary key order
+    """
+    first_page = [
+        company.id for company in paginate(_select_companies(companies), limit=2)
+    ]
+    second_page = [
+        company.id
+        for company in paginate(
+            _select_companies(companies), after=first_page[-1], limit=2
+        )
+    ]
+
+    assert first_page == [companies[0].id, companies[1].id]
+    assert second_page == [companies[2].id, companies[3].id]
+
+
+def test_paginate_by_field(companies):
+    """
+    GIVEN a set of companies
+    WHEN paginate() is called with an ordering field and the ID of the last company of the previous page
+    THEN the companies following that company in the field order should be returned
+    """
+    first_page = [
+        company.name
+        for company in paginate(_select_companies(companies), Company.name, limit=2)
+    ]
+    last_company = Company.get(Company.name == first_page[-1])
+    second_page = [
+        company.name
+        for company in paginate(
+            _select_companies(companies), Company.name, after=last_company.id, limit=2
+        )
+    ]
+
+    assert first_page == ["Alpha", "Beta"]
+    assert second_page == ["Delta", "Epsilon"]
+
+
+def test_paginate_descending(companies):
+    """
+    GIVEN a set of companies
+    WHEN paginate() is called in descending order after a given company
+    THEN the companies preceding that company in the field order should be returned
+    """
+    delta = Company.get(Company.name == "Delta")
+    page = [
+        company.name
+        for company in paginate(
+            _select_companies(companies), Company.name, after=delta.id, descending=True
+        )
+    ]
+
+    assert page == ["Beta", "Alpha"]
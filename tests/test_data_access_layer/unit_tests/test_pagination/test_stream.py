@@ -0,0 +1,80 @@
+from contextlib import nullcontext
+from playhouse.postgres_ext import PostgresqlExtDatabase
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.instrumentation import QueryRecorder
+from epicevents.data_access_layer.pagination import stream
+
+
+class RecordingCursor:
+    """A named cursor returning two company rows."""
+
+    description = [("id",), ("name",)]
+
+    def __init__(self):
+        self.executed = []
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def __iter__(self):
+        return iter([(1, "Alpha"), (2, "Beta")])
+
+    def close(self):
+        self.closed = True
+
+
+class RecordingDatabase(PostgresqlExtDatabase):
+    """A PostgreSQL database recording the cursors it is asked for."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.cursors = []
+
+    def transaction(self):
+        return nullcontext()
+
+    def cursor(self, commit=None, named_cursor=None):
+        cursor = RecordingCursor()
+        self.cursors.append((named_cursor, cursor))
+        return cursor
+
+
+def test_stream_reads_postgresql_rows_through_a_named_cursor():
+    """
+    GIVEN a PostgreSQL database
+    WHEN the companies are streamed by batches of 100
+    THEN a named cursor fetching 100 rows per round trip should be used, then closed
+    """
+    recording_database = RecordingDatabase()
+    query = Company.select(Company.id, Company.name).bind(recording_database)
+
+    companies = [*stream(query, batch_size=100)]
+
+    [(named_cursor, cursor)] = recording_database.cursors
+    assert named_cursor is True
+    assert cursor.itersize == 100
+    assert cursor.closed
+    assert [(company.id, company.name) for company in companies] == [
+        (1, "Alpha"),
+        (2, "Beta"),
+    ]
+
+
+def test_streamed_queries_are_recorded():
+    """
+    GIVEN a query recorder installed on a PostgreSQL database
+    WHEN the companies are streamed
+    THEN the query of the named cursor should be recorded, and the database put back
+    """
+    recording_database = RecordingDatabase()
+    query = Company.select(Company.id, Company.name).bind(recording_database)
+
+    with QueryRecorder(recording_database) as recorder:
+        [*stream(query)]
+
+    [(named_cursor, cursor)] = recording_database.cursors
+    assert recorder.count == 1
+    assert recorder.records[0].sql.startswith('SELECT "t1"."id", "t1"."name"')
+    assert cursor.executed[0][0] == recorder.records[0].sql
+    assert "cursor" not in recording_database.__dict__
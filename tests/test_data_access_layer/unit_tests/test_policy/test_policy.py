@@ -0,0 +1,73 @@
+import pytest
+from playhouse.test_utils import count_queries
+from epicevents.data_access_layer import policy
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer.policy import (
+    MANAGEMENT_DEPARTMENT_ID,
+    SALES_DEPARTMENT_ID,
+    SUPPORT_DEPARTMENT_ID,
+    Principal,
+)
+
+
+def test_sales_own_the_contracts_of_their_clients(
+    fake_contract, fake_collaborator_sales, fake_collaborator_sales2
+):
+    """
+    GIVEN a contract of a client followed by a sales collaborator
+    WHEN the contracts owned by them and by another sales collaborator are selected
+    THEN only the first one should get the contract
+    """
+    owner = Principal(fake_collaborator_sales.id, SALES_DEPARTMENT_ID)
+    other = Principal(fake_collaborator_sales2.id, SALES_DEPARTMENT_ID)
+
+    assert fake_contract.id in [
+        contract.id
+        for contract in Contract.select().where(policy.owned(Contract, owner))
+    ]
+    assert not Contract.select().where(policy.owned(Contract, other)).exists()
+
+
+def test_get_editable_checks_ownership_in_one_query(
+    fake_event, fake_collaborator_support, fake_collaborator_support2
+):
+    """
+    GIVEN an event assigned to a support collaborator
+    WHEN it is fetched for change by them, then by another support collaborator
+    THEN each fetch should take a single query, and only the first one find the event
+    """
+    owner = Principal(fake_collaborator_support.id, SUPPORT_DEPARTMENT_ID)
+    other = Principal(fake_collaborator_support2.id, SUPPORT_DEPARTMENT_ID)
+
+    with count_queries() as counter:
+        event = policy.get_editable(Event, fake_event.id, owner)
+        missing = policy.get_editable(Event, fake_event.id, other)
+
+    assert event.id == fake_event.id
+    assert missing is None
+    assert counter.count == 2
+
+
+def test_management_may_change_every_event(fake_event):
+    """
+    GIVEN a management collaborator
+    WHEN the condition of the events they may change is computed
+    THEN it should be unrestricted
+    """
+    principal = Principal(1, MANAGEMENT_DEPARTMENT_ID)
+
+    assert policy.editable(Event, principal) is None
+    assert policy.get_editable(Event, fake_event.id, principal).id == fake_event.id
+
+
+def test_editable_denies_departments_without_rights():
+    """
+    GIVEN a support and a management collaborator
+    WHEN the conditions of the clients they may change are computed
+    THEN a permission error should be raised
+    """
+    for department_id in (SUPPORT_DEPARTMENT_ID, MANAGEMENT_DEPARTMENT_ID):
+        with pytest.raises(PermissionError):
+            policy.editable(Client, Principal(1, department_id))
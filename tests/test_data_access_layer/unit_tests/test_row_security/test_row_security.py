@@ -0,0 +1,92 @@
+import pytest
+from peewee import PostgresqlDatabase
+from epicevents.data_access_layer import database, row_security
+from epicevents.cli.collaborator import SALES_DEPARTMENT_ID
+
+
+class RecordingDatabase(PostgresqlDatabase):
+    """A PostgreSQL database recording its statements and parameters instead of running them."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.statements = []
+
+    def execute_sql(self, sql, params=None, commit=None):
+        self.statements.append((sql, params))
+
+
+@pytest.fixture()
+def enabled(monkeypatch):
+    monkeypatch.setattr(row_security, "ENABLED", True)
+    yield
+    row_security.forget()
+
+
+def test_identify_sets_the_principal_on_the_transaction(enabled):
+    """
+    GIVEN the row-level security mode and a PostgreSQL database
+    WHEN a collaborator is identified from their token payload
+    THEN their identifier and department should be set locally to the transaction
+    """
+    recording_database = RecordingDatabase()
+
+    row_security.identify(
+        {"collaborator_id": 4, "department_id": f"{SALES_DEPARTMENT_ID}"},
+        recording_database,
+    )
+
+    [(sql, params)] = recording_database.statements
+    assert sql == "SELECT set_config(%s, %s, true), set_config(%s, %s, true)"
+    assert params == (
+        "epicevents.collaborator_id",
+        "4",
+        "epicevents.department_id",
+        f"{SALES_DEPARTMENT_ID}",
+    )
+
+
+def test_disabled_mode_sets_nothing():
+    """
+    GIVEN the row-level security mode disabled
+    WHEN a collaborator is identified
+    THEN no statement should be run
+    """
+    recording_database = RecordingDatabase()
+
+    row_security.identify(
+        {"collaborator_id": 4, "department_id": SALES_DEPARTMENT_ID},
+        recording_database,
+    )
+
+    assert recording_database.statements == []
+    assert row_security.context["principal"] is None
+
+
+def test_command_context_forgets_the_previous_collaborator(enabled):
+    """
+    GIVEN a collaborator identified by a previous command
+    WHEN a new command starts
+    THEN the collaborator should be forgotten
+    """
+    row_security.identify({"collaborator_id": 4, "department_id": SALES_DEPARTMENT_ID})
+
+    with database.command_context(command="clients list"):
+        assert row_security.context["principal"] is None
+
+
+def test_handover_lets_management_change_the_clients_within_the_block(enabled):
+    """
+    GIVEN the row-level security mode and a PostgreSQL database
+    WHEN the clients of a departing collaborator are handed over
+    THEN the handover setting should be set for the block, then cleared
+    """
+    recording_database = RecordingDatabase()
+
+    with row_security.handover(7, recording_database):
+        recording_database.execute_sql("UPDATE client")
+
+    assert recording_database.statements == [
+        ("SELECT set_config(%s, %s, true)", ("epicevents.handover_id", "7")),
+        ("UPDATE client", None),
+        ("SELECT set_config(%s, '', true)", ("epicevents.handover_id",)),
+    ]
@@ -0,0 +1,128 @@
+import pytest
+from peewee import SqliteDatabase, fn
+from epicevents.data_access_layer.client import Client
+from epicevents.data_access_layer.collaborator import Collaborator
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.contract import Contract
+from epicevents.data_access_layer.department import Department
+from epicevents.data_access_layer.event import Event
+from epicevents.data_access_layer import bulk, seed
+from epicevents.data_access_layer.seed import Seeder
+from ..test_bulk.test_copy import RecordingDatabase
+
+MODELS = [Department, Collaborator, Company, Client, Contract, Event]
+
+
+@pytest.fixture()
+def seed_database():
+    seed_database = SqliteDatabase(":memory:")
+
+    with seed_database.bind_ctx(MODELS):
+        seed_database.create_tables(MODELS)
+
+        yield seed_database
+
+    seed_database.close()
+
+
+def _rows(model):
+    """Returns every row of a table, in primary key order."""
+    return [*model.select().order_by(model._meta.primary_key).tuples()]
+
+
+def test_seed_generates_consistent_data(seed_database):
+    """
+    GIVEN an empty database
+    WHEN a dataset of 2,000 clients is generated
+    THEN contracts should belong to the owner of their client
+    AND only signed contracts should have events, starting after their creation
+    """
+    report = Seeder(scale=2).run(batch_size=500)
+
+    assert Client.select().count() == report.clients == 2000
+    assert Contract.select().count() == report.contracts > report.clients
+    assert Event.select().count() == report.events > 0
+    assert (
+        not Contract.select()
+        .join(Client)
+        .where(Contract.collaborator != Client.collaborator)
+        .exists()
+    )
+    assert (
+        not Event.select()
+        .join(Contract)
+        .where(~Contract.signed | (Event.start_date <= Contract.creation_date))
+        .exists()
+    )
+
+
+def test_seed_skews_the_data(seed_database):
+    """
+    GIVEN an empty database
+    WHEN a dataset is generated
+    THEN the first sales collaborator should own far more clients than the average
+    AND many contracts should be unsigned
+    """
+    report = Seeder(scale=2).run()
+
+    largest_portfolio = (
+        Client.select(fn.COUNT(Client.id))
+        .group_by(Client.collaborator)
+        .order_by(fn.COUNT(Client.id).desc())
+        .scalar()
+    )
+    sales_collaborators = Client.select(Client.collaborator).distinct().count()
+
+    assert largest_portfolio > 3 * report.clients / sales_collaborators
+    assert Contract.select().where(Contract.signed == False).count() > (
+        report.contracts / 4
+    )
+
+
+def test_seed_is_reproducible(seed_database):
+    """
+    GIVEN two empty databases
+    WHEN a dataset is generated in each with the same seed
+    THEN both should hold the same rows
+    """
+    Seeder(scale=0.2, random_seed=7).run()
+    first_rows = [_rows(model) for model in (Client, Contract, Event)]
+
+    other_database = SqliteDatabase(":memory:")
+    with other_database.bind_ctx(MODELS):
+        other_database.create_tables(MODELS)
+        Seeder(scale=0.2, random_seed=7).run()
+        other_rows = [_rows(model) for model in (Client, Contract, Event)]
+    other_database.close()
+
+    assert first_rows == other_rows
+
+
+def test_seed_copies_unassigned_events_with_a_null_support(seed_database, monkeypatch):
+    """
+    GIVEN an empty database
+    WHEN a dataset is generated, its rows being also written as COPY payloads
+    THEN the unassigned events should have an unquoted empty support, which COPY reads as NULL
+    """
+    recording_database = RecordingDatabase()
+    load_rows = seed.load_rows
+
+    def load_and_copy_rows(model, fields, rows):
+        load_rows(model, fields, rows)
+        if rows:
+            bulk._copy_rows(recording_database, model, fields, rows)
+
+    monkeypatch.setattr(seed, "load_rows", load_and_copy_rows)
+
+    Seeder(scale=1).run(batch_size=500)
+
+    event_lines = [
+        line
+        for sql, payload in recording_database.copies
+        if sql.startswith('COPY "event"')
+        for line in payload.splitlines()
+    ]
+    unassigned = Event.select().where(Event.support.is_null()).count()
+    assert unassigned > 0
+    assert sum(line.endswith(",") for line in event_lines) == unassigned
+    assert not any('""' in line for line in event_lines)
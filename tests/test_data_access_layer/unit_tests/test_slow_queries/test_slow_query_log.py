@@ -0,0 +1,112 @@
+import sqlite3
+import pytest
+from epicevents.data_access_layer import database, slow_queries
+from epicevents.data_access_layer.company import Company
+from epicevents.data_access_layer.instrumentation import QueryRecord
+
+
+def _record(sql, duration, call_site="epicevents/cli/client.py:10 (list)"):
+    return QueryRecord(sql, [1, 2], duration, call_site)
+
+
+def test_normalize_collapses_literals_and_lists():
+    """
+    GIVEN statements differing by their values and the length of their IN lists
+    WHEN they are normalised
+    THEN they should have the same shape
+    """
+    first = slow_queries.normalize(
+        'SELECT * FROM "client" WHERE ("id" IN (?, ?, ?)) AND "name" = \'Dupont\''
+    )
+    second = slow_queries.normalize(
+        'SELECT *\n  FROM "client" WHERE ("id" IN (%s, %s)) AND "name" = \'Martin\''
+    )
+
+    assert first == second
+    assert first == 'SELECT * FROM "client" WHERE ("id" IN (?, ...)) AND "name" = ?'
+
+
+def test_params_shape_keeps_types_only():
+    """
+    GIVEN the parameters of a statement
+    WHEN their shape is computed
+    THEN only their types should remain, repeated types being counted
+    """
+    shape = slow_queries.params_shape([4, 5, 6, "secret@mail.fr", None])
+
+    assert shape == "int×3, str, NoneType"
+    assert "secret" not in shape
+
+
+def test_log_keeps_the_most_recent_entries(slow_query_log):
+    """
+    GIVEN a slow-query log bounded to three entries
+    WHEN five statements are logged
+    THEN only the three most recent should be kept
+    """
+    log = slow_queries.SlowQueryLog(max_entries=3)
+    for duration in (1, 2, 3, 4, 5):
+        log.append(_record("SELECT 1", duration), "clients list", 1)
+
+    assert sorted(entry[3] for entry in log.entries()) == [3, 4, 5]
+
+
+def test_report_orders_by_total_or_p95(slow_query_log):
+    """
+    GIVEN a frequent fast statement and a rare slow one in the log
+    WHEN the report is ordered by total duration, then by p95
+    THEN the frequent one should come first, then the slow one
+    """
+    for _ in range(20):
+        slow_query_log.append(_record('SELECT * FROM "client"', 0.2), "clients list", 1)
+    slow_query_log.append(_record('SELECT * FROM "event"', 1.5), "events filter", 2)
+
+    by_total = slow_query_log.report("total")
+    by_p95 = slow_query_log.report("p95")
+
+    assert by_total[0]["sql"] == 'SELECT * FROM "client"'
+    assert by_total[0]["count"] == 20
+    assert by_total[0]["total"] == pytest.approx(20 * 0.2)
+    assert by_p95[0]["command"] == "events filter"
+    assert by_p95[0]["p95"] == 1.5
+    assert slow_query_log.report("total", command="events filter") == by_p95[:1]
+
+
+def test_command_context_logs_slow_statements(
+    fake_company, slow_query_log, monkeypatch
+):
+    """
+    GIVEN a threshold below the duration of any statement
+    WHEN a command authenticated as a collaborator looks a company up
+    THEN the statement should be logged with the command and the collaborator
+    """
+    monkeypatch.setattr(slow_queries, "THRESHOLD", 1e-9)
+
+    with database.command_context(command="companies get"):
+        slow_queries.identify(7)
+        Company.get_or_none(Company.id == fake_company.id)
+
+    [row] = [row for row in slow_query_log.report() if row["sql"].startswith("SELECT")]
+    assert row["sql"].startswith('SELECT "t1"."id", "t1"."name"')
+    assert row["command"] == "companies get"
+    assert row["call_site"].startswith("tests/test_data_access_layer/")
+    with sqlite3.connect(slow_query_log.path) as connection:
+        assert connection.execute(
+            "SELECT params_shape, collaborator_id FROM slow_query "
+            "WHERE sql LIKE 'SELECT%'"
+        ).fetchall() == [("int×3", 7)]
+    assert "execute_sql" not in database.psql_db.__dict__
+
+
+def test_disabled_threshold_logs_nothing(fake_company, slow_query_log, monkeypatch):
+    """
+    GIVEN a threshold of zero
+    WHEN a command runs a statement
+    THEN nothing should be logged
+    """
+    monkeypatch.setattr(slow_queries, "THRESHOLD", 0)
+
+    with database.command_context(command="companies get"):
+        Company.get_or_none(Company.id == fake_company.id)
+
+    assert slow_query_log.report() == []